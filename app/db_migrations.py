@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import datetime
+
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine
 
@@ -10,6 +12,27 @@ async def _sqlite_has_column(conn, table: str, column: str) -> bool:
     return any(r[1] == column for r in rows)
 
 
+async def _sqlite_has_table(conn, table: str) -> bool:
+    result = await conn.execute(text(f"PRAGMA table_info({table});"))
+    return bool(result.fetchall())
+
+
+async def _postgres_has_table(conn, table: str, schema: str = "public") -> bool:
+    result = await conn.execute(
+        text(
+            """
+            SELECT 1
+            FROM information_schema.tables
+            WHERE table_schema = :schema
+              AND table_name = :table
+            LIMIT 1
+            """
+        ),
+        {"schema": schema, "table": table},
+    )
+    return result.first() is not None
+
+
 async def _postgres_has_column(conn, table: str, column: str, schema: str = "public") -> bool:
     result = await conn.execute(
         text(
@@ -27,6 +50,27 @@ async def _postgres_has_column(conn, table: str, column: str, schema: str = "pub
     return result.first() is not None
 
 
+# v2: colonnes ajoutées après coup (table, colonne, type SQL).
+# Si la table n'existe pas encore, create_all la créera complète.
+_V2_ADDED_COLUMNS: list[tuple[str, str, str]] = [
+    ("audit_logs", "diff", "JSON"),
+    ("alerts", "workflow_status", "VARCHAR"),
+    ("alerts", "assigned_to", "VARCHAR"),
+    ("alerts", "fingerprint", "VARCHAR"),
+    ("alerts", "muted", "BOOLEAN DEFAULT FALSE"),
+    ("alerts", "muted_by", "VARCHAR"),
+    ("projects", "gitlab_project", "VARCHAR"),
+    ("pipeline_events", "pipeline_id", "VARCHAR"),
+    ("pipeline_events", "gitlab_project", "VARCHAR"),
+    ("pipeline_events", "duration_seconds", "FLOAT"),
+    ("pipeline_events", "finished_at", "TIMESTAMP"),
+    ("pipeline_events", "updated_at", "TIMESTAMP"),
+    ("alerts", "compacted_at", "TIMESTAMP"),
+    ("pipeline_events", "compacted_at", "TIMESTAMP"),
+    ("tasks", "rank", "VARCHAR"),
+]
+
+
 async def apply_best_effort_migrations(engine: AsyncEngine) -> None:
     """Applique des migrations légères (ajout de colonnes) sans Alembic.
 
@@ -49,6 +93,11 @@ async def apply_best_effort_migrations(engine: AsyncEngine) -> None:
                 if await _sqlite_has_column(conn, "events", "group_id") is False:
                     await conn.execute(text("ALTER TABLE events ADD COLUMN group_id VARCHAR"))
 
+                # v2
+                for table, column, ddl_type in _V2_ADDED_COLUMNS:
+                    if await _sqlite_has_table(conn, table) and not await _sqlite_has_column(conn, table, column):
+                        await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_type}"))
+
             elif dialect.startswith("postgres"):
                 # users
                 if await _postgres_has_column(conn, "users", "email_verified") is False:
@@ -61,7 +110,103 @@ async def apply_best_effort_migrations(engine: AsyncEngine) -> None:
                 # events
                 if await _postgres_has_column(conn, "events", "group_id") is False:
                     await conn.execute(text("ALTER TABLE public.events ADD COLUMN group_id VARCHAR"))
+
+                # v2
+                for table, column, ddl_type in _V2_ADDED_COLUMNS:
+                    if await _postgres_has_table(conn, table) and not await _postgres_has_column(conn, table, column):
+                        await conn.execute(text(f"ALTER TABLE public.{table} ADD COLUMN {column} {ddl_type}"))
     except Exception:
         # Best-effort: ne pas bloquer le démarrage. Les nouveaux champs
         # seront disponibles après reset DB/migration manuelle.
         return
+
+
+async def ensure_indexes(engine: AsyncEngine) -> None:
+    """Crée les index déclarés dans les modèles s'ils manquent (tables existantes).
+
+    `create_all` ne touche pas aux tables déjà présentes: un index ajouté au
+    modèle après coup ne serait jamais créé sans cette passe.
+    """
+    from app.database import Base
+
+    def _create(sync_conn) -> None:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                try:
+                    with sync_conn.begin_nested():
+                        index.create(sync_conn, checkfirst=True)
+                except Exception:
+                    # Best-effort: un index impossible ne doit pas bloquer les autres.
+                    continue
+
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(_create)
+    except Exception:
+        return
+
+
+async def backfill_ticket_columns(engine: AsyncEngine, batch_size: int = 500) -> int:
+    """Déplace workflow_status/assigned_to/history de Alert.payload vers les colonnes
+    dédiées et la table ticket_events. Idempotent: les clés sont retirées du payload.
+    """
+    from sqlalchemy import String, cast, or_, select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.models import Alert, TicketEvent
+
+    payload_text = cast(Alert.payload, String)
+    moved = 0
+    last_id = ""
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            while True:
+                res = await db.execute(
+                    select(Alert)
+                    .where(Alert.id > last_id)
+                    .where(
+                        or_(
+                            payload_text.like('%"history"%'),
+                            payload_text.like('%"workflow_status"%'),
+                            payload_text.like('%"assigned_to"%'),
+                        )
+                    )
+                    .order_by(Alert.id.asc())
+                    .limit(batch_size)
+                )
+                rows = list(res.scalars().all())
+                if not rows:
+                    break
+                for alert in rows:
+                    meta = dict(alert.payload or {})
+                    if "workflow_status" in meta:
+                        value = meta.pop("workflow_status")
+                        if alert.workflow_status is None:
+                            alert.workflow_status = value
+                    if "assigned_to" in meta:
+                        value = meta.pop("assigned_to")
+                        if alert.assigned_to is None:
+                            alert.assigned_to = value
+                    for h in meta.pop("history", None) or []:
+                        try:
+                            at = datetime.fromisoformat(h.get("at")) if h.get("at") else alert.created_at
+                        except (TypeError, ValueError):
+                            at = alert.created_at
+                        db.add(
+                            TicketEvent(
+                                ticket_id=alert.id,
+                                actor_id=h.get("actor_id"),
+                                action=h.get("action") or "ticket.update",
+                                note=h.get("note"),
+                                changes=h.get("changes"),
+                                created_at=at,
+                            )
+                        )
+                    alert.payload = meta or None
+                    moved += 1
+                await db.commit()
+                last_id = rows[-1].id
+    except Exception:
+        # Best-effort (comme les migrations de colonnes)
+        return moved
+    return moved
@@ -18,7 +18,23 @@ from app.v2.routers import projects as v2_projects
 from app.v2.routers import sprints as v2_sprints
 from app.v2.routers import tasks as v2_tasks
 from app.v2.routers import tickets as v2_tickets
-from app.db_migrations import apply_best_effort_migrations
+from app.v2.routers import outbox as v2_outbox
+from app.v2.routers import audit as v2_audit
+from app.v2.routers import stream as v2_stream
+from app.v2.routers import dashboard as v2_dashboard
+from app.v2.routers import board as v2_board
+from app.v2.services.outbox import dispatcher as outbox_dispatcher
+from app.v2.services.http import close_http_client, get_http_client
+from app.v2.services.slack import coalescer as slack_coalescer
+from app.v2.services.audit import audit_buffer
+from app.v2.services.retention import retention_worker
+from app.v2.services.events import bus as event_bus
+from app.v2.services.pipeline_ingest import warm_latest as warm_pipeline_status, writer as pipeline_writer
+from app.v2.services.pipeline_stats import rebuild_pipeline_stats
+from app.v2.services.maintenance import maintenance_index
+from app.v2.services.alert_stats import rebuild_alert_stats
+from app.v2.services.ranking import backfill_task_ranks, rebalancer as rank_rebalancer
+from app.db_migrations import apply_best_effort_migrations, backfill_ticket_columns, ensure_indexes
 from app.seed_groups import ensure_default_groups
 from app.seed_admin import create_initial_admin
 from app.v2.seed_demo import ensure_demo_v2_data
@@ -29,16 +45,42 @@ async def lifespan(app: FastAPI):
     await apply_best_effort_migrations(engine)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await ensure_indexes(engine)
+    await backfill_ticket_columns(engine)
 
     # Groupes métiers par défaut
     from app.database import SessionLocal
     async with SessionLocal() as db:
         await ensure_default_groups(db)
         await ensure_demo_v2_data(db)
+        await backfill_task_ranks(db)
+        await rebuild_alert_stats(db)
+        await warm_pipeline_status(db)
+        await rebuild_pipeline_stats(db)
+        await maintenance_index.load(db)
 
     # Admin par défaut (utile en dev / demo). Ne recrée pas si déjà présent.
     await create_initial_admin()
-    yield
+
+    # Client HTTP partagé (webhooks) puis envoi des notifications (outbox) en tâche de fond
+    get_http_client()
+    audit_buffer.start()
+    outbox_dispatcher.start()
+    retention_worker.start()
+    event_bus.start()
+    pipeline_writer.start()
+    rank_rebalancer.start()
+    try:
+        yield
+    finally:
+        await rank_rebalancer.stop()
+        await pipeline_writer.stop()
+        await event_bus.stop()
+        await retention_worker.stop()
+        await outbox_dispatcher.stop()
+        await audit_buffer.stop()
+        await slack_coalescer.drain()
+        await close_http_client()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -126,6 +168,11 @@ app.include_router(v2_calendar.router)
 app.include_router(v2_projects.router)
 app.include_router(v2_sprints.router)
 app.include_router(v2_tickets.router)
+app.include_router(v2_outbox.router)
+app.include_router(v2_audit.router)
+app.include_router(v2_stream.router)
+app.include_router(v2_dashboard.router)
+app.include_router(v2_board.router)
 
 @app.get("/", include_in_schema=False)
 def root():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, JSON, Boolean, ForeignKey, Integer, Enum as SQLEnum, Float
+from sqlalchemy import Column, String, DateTime, JSON, Boolean, ForeignKey, Integer, Enum as SQLEnum, Float, Index, func, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import uuid
@@ -50,6 +50,11 @@ class User(Base):
     events = relationship("Event", back_populates="owner", lazy="dynamic")
 
 
+# Résolution des @mentions (insensible à la casse): @email et @prenom.nom
+Index("ix_users_email_lower", func.lower(User.email))
+Index("ix_users_name_lower", func.lower(User.first_name), func.lower(User.last_name))
+
+
 class Event(Base):
     __tablename__ = "events"
     
@@ -130,6 +135,7 @@ class Project(Base):
     name = Column(String, nullable=False)
     description = Column(String)
     grafana_embed_url = Column(String)
+    gitlab_project = Column(String, index=True)  # path_with_namespace (webhook pipelines)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     sprints = relationship("Sprint", back_populates="project")
@@ -154,6 +160,8 @@ class Sprint(Base):
 
 class TaskAssignee(Base):
     __tablename__ = "task_assignees"
+    # La PK (task_id, user_id) sert les tâches -> assignés; "mes tâches" part de user_id
+    __table_args__ = (Index("ix_task_assignees_user_task", "user_id", "task_id"),)
 
     task_id = Column(String, ForeignKey("tasks.id"), primary_key=True)
     user_id = Column(String, ForeignKey("users.id"), primary_key=True)
@@ -165,6 +173,11 @@ class TaskAssignee(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_project_status_rank", "project_id", "status", "rank"),
+        # Passe périodique de renumérotation: seules les tâches modifiées depuis la précédente
+        Index("ix_tasks_updated_at", "updated_at"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = Column(String, ForeignKey("projects.id"), nullable=False, index=True)
@@ -175,7 +188,9 @@ class Task(Base):
     priority = Column(SQLEnum(Priority), nullable=False, default=Priority.P3)
     estimate_hours = Column(Float)
     due_at = Column(DateTime)
-    position = Column(Integer, default=0)  # ordering within a column
+    position = Column(Integer, default=0)  # legacy: remplacé par `rank`
+    # Ordre dans une colonne Kanban: rang fractionnaire base 36 (voir services.ranking)
+    rank = Column(String)
     gitlab_mr_url = Column(String)
     gitlab_job_url = Column(String)
     created_by = Column(String, ForeignKey("users.id"), nullable=True)
@@ -188,8 +203,22 @@ class Task(Base):
     comments = relationship("TaskComment", back_populates="task", cascade="all, delete-orphan")
 
 
+class TaskDependency(Base):
+    """`task_id` est bloquée par `depends_on_id` (arête depends_on -> task du DAG projet)."""
+
+    __tablename__ = "task_dependencies"
+    __table_args__ = (Index("ix_task_dependencies_depends_on", "depends_on_id"),)
+
+    task_id = Column(String, ForeignKey("tasks.id"), primary_key=True)
+    depends_on_id = Column(String, ForeignKey("tasks.id"), primary_key=True)
+    # Dénormalisé: le graphe d'un projet se charge en une requête
+    project_id = Column(String, ForeignKey("projects.id"), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class TaskComment(Base):
     __tablename__ = "task_comments"
+    __table_args__ = (Index("ix_task_comments_task_created", "task_id", "created_at", "id"),)
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     task_id = Column(String, ForeignKey("tasks.id"), nullable=False, index=True)
@@ -204,14 +233,21 @@ class TaskComment(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_entity_created", "entity_type", "entity_id", "created_at"),
+        Index("ix_audit_logs_action_created", "action", "created_at"),
+        Index("ix_audit_logs_created_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     actor_id = Column(String, ForeignKey("users.id"), index=True)
     action = Column(String, nullable=False)  # ex: task.create, task.update
     entity_type = Column(String, nullable=False)  # ex: task
     entity_id = Column(String, nullable=False)
+    # Lignes historiques: instantanés complets. Nouvelles lignes: diff réversible (audit_diff).
     before = Column(JSON)
     after = Column(JSON)
+    diff = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     actor = relationship("User")
@@ -219,6 +255,21 @@ class AuditLog(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    __table_args__ = (
+        Index("ix_alerts_assigned_status", "assigned_to", "status"),
+        Index("ux_alerts_fingerprint", "fingerprint", unique=True),
+        Index("ix_alerts_status_severity", "status", "severity"),
+        # Vue projets: alertes ouvertes par sévérité, groupées par projet
+        Index("ix_alerts_project_status_severity", "project_id", "status", "severity"),
+        Index("ix_alerts_created_at", "created_at"),
+        # Rétention: lignes pas encore compactées (index partiel, reste petit)
+        Index(
+            "ix_alerts_uncompacted_created",
+            "created_at",
+            sqlite_where=text("compacted_at IS NULL"),
+            postgresql_where=text("compacted_at IS NULL"),
+        ),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = Column(String, ForeignKey("projects.id"), nullable=True, index=True)
@@ -230,12 +281,55 @@ class Alert(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     resolved_at = Column(DateTime)
     resolved_by = Column(String, ForeignKey("users.id"))
+    # Ticketing (anciennement dans payload JSON)
+    workflow_status = Column(String, index=True)  # OPEN / IN_PROGRESS
+    assigned_to = Column(String)  # email ou user id
+    # Empreinte Alertmanager (dédoublonnage à l'ingestion); NULL pour les tickets manuels
+    fingerprint = Column(String)
+    # Alerte reçue pendant une maintenance planifiée (CalendarEntry MAINTENANCE)
+    muted = Column(Boolean, default=False)
+    muted_by = Column(String)
+    # Payload compressé par la rétention ({"$z": ...}, voir services.audit_diff.expand_json)
+    compacted_at = Column(DateTime)
 
     project = relationship("Project", back_populates="alerts")
+    events = relationship("TicketEvent", back_populates="ticket", order_by="TicketEvent.created_at")
+
+
+class TicketEvent(Base):
+    """Historique append-only d'un ticket (une ligne par mise à jour)."""
+
+    __tablename__ = "ticket_events"
+    __table_args__ = (Index("ix_ticket_events_ticket_created", "ticket_id", "created_at"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    ticket_id = Column(String, ForeignKey("alerts.id"), nullable=False)
+    actor_id = Column(String, ForeignKey("users.id"), nullable=True)
+    action = Column(String, nullable=False)  # ex: ticket.update
+    note = Column(String)
+    changes = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    ticket = relationship("Alert", back_populates="events")
 
 
 class PipelineEvent(Base):
+    """Une ligne par pipeline GitLab (upsert par `pipeline_id` depuis le webhook)."""
+
     __tablename__ = "pipeline_events"
+    __table_args__ = (
+        Index("ux_pipeline_events_pipeline_id", "pipeline_id", unique=True),
+        Index("ix_pipeline_events_project_ref_created", "project_id", "ref", "created_at"),
+        # Dernier pipeline d'un projet (toutes refs): vue projets
+        Index("ix_pipeline_events_project_created", "project_id", "created_at"),
+        Index("ix_pipeline_events_created_at", "created_at"),
+        Index(
+            "ix_pipeline_events_uncompacted_created",
+            "created_at",
+            sqlite_where=text("compacted_at IS NULL"),
+            postgresql_where=text("compacted_at IS NULL"),
+        ),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     project_id = Column(String, ForeignKey("projects.id"), nullable=True, index=True)
@@ -243,8 +337,77 @@ class PipelineEvent(Base):
     status = Column(String, nullable=False)  # success/failed/running
     ref = Column(String)
     url = Column(String)
-    payload = Column(JSON)
+    payload = Column(JSON)  # {"sha", "source", "jobs": {job_id: {...}}}
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Webhook GitLab
+    pipeline_id = Column(String)
+    gitlab_project = Column(String)  # path_with_namespace
+    duration_seconds = Column(Float)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    compacted_at = Column(DateTime)
+
+
+class PipelineStatsDaily(Base):
+    """Rollup journalier des pipelines terminés par (projet GitLab, ref).
+
+    Maintenu incrémentalement par le writer du webhook; les durées ne
+    concernent que les pipelines en succès.
+    """
+
+    __tablename__ = "pipeline_stats_daily"
+
+    day = Column(DateTime, primary_key=True)
+    gitlab_project = Column(String, primary_key=True)
+    ref = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    success = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    canceled = Column(Integer, nullable=False, default=0)
+    duration_sum = Column(Float, nullable=False, default=0.0)
+    duration_count = Column(Integer, nullable=False, default=0)
+
+
+class PipelineDurationHistDaily(Base):
+    """Histogramme journalier des durées (buckets logarithmiques, voir services.pipeline_stats)."""
+
+    __tablename__ = "pipeline_duration_hist_daily"
+
+    day = Column(DateTime, primary_key=True)
+    gitlab_project = Column(String, primary_key=True)
+    ref = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class PipelineJobStatsDaily(Base):
+    """Rollup journalier par job: exécutions, échecs finaux, et succès après échec (flaky)."""
+
+    __tablename__ = "pipeline_job_stats_daily"
+
+    day = Column(DateTime, primary_key=True)
+    gitlab_project = Column(String, primary_key=True)
+    job_name = Column(String, primary_key=True)
+    runs = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    flaky = Column(Integer, nullable=False, default=0)
+
+
+class SprintSnapshotDaily(Base):
+    """État d'un sprint en fin de journée (burndown), maintenu incrémentalement.
+
+    Une ligne n'existe que pour les jours où une tâche du sprint a changé
+    (création, statut, estimation); les jours sans ligne reprennent la veille.
+    """
+
+    __tablename__ = "sprint_snapshots_daily"
+
+    sprint_id = Column(String, ForeignKey("sprints.id"), primary_key=True)
+    day = Column(DateTime, primary_key=True)
+    scope_hours = Column(Float, nullable=False, default=0.0)
+    scope_tasks = Column(Integer, nullable=False, default=0)
+    remaining_hours = Column(Float, nullable=False, default=0.0)
+    remaining_tasks = Column(Integer, nullable=False, default=0)
 
 
 class CalendarEntry(Base):
@@ -268,6 +431,46 @@ class CalendarEntry(Base):
     owner = relationship("User")
 
 
+class AlertStatsHourly(Base):
+    """Rollup horaire des alertes/tickets, maintenu incrémentalement (création/résolution).
+
+    Les résolutions sont comptées dans l'heure de résolution, avec la somme des
+    durées d'ouverture (MTTR = resolve_seconds / resolved).
+    """
+
+    __tablename__ = "alert_stats_hourly"
+
+    bucket = Column(DateTime, primary_key=True)  # début d'heure (UTC naïf)
+    source = Column(String, primary_key=True)
+    severity = Column(String, primary_key=True)
+    opened = Column(Integer, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0)
+    resolve_seconds = Column(Float, nullable=False, default=0.0)
+
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    SENT = "SENT"
+    DEAD = "DEAD"
+
+
+class OutboxMessage(Base):
+    """Notification à envoyer, écrite dans la même transaction que le changement métier."""
+
+    __tablename__ = "outbox"
+    __table_args__ = (Index("ix_outbox_status_next_attempt", "status", "next_attempt_at"),)
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    channel = Column(String, nullable=False)  # slack / email
+    payload = Column(JSON, nullable=False)
+    status = Column(SQLEnum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+
+
 class MonitoredServer(Base):
     __tablename__ = "monitored_servers"
 
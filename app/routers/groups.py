@@ -7,7 +7,7 @@ from app.models import User
 from app.dependencies import get_current_user, require_admin
 from app.schemas_groups import GroupCreate, GroupRead, GroupUpdate
 import app.crud_groups as crud_groups
-from app.v2.services.audit import write_audit
+from app.v2.services.audit import enqueue_audit
 
 
 router = APIRouter(prefix="/groups", tags=["groups"])
@@ -28,7 +28,7 @@ async def create_group(
     current_user: User = Depends(require_admin),
 ):
     created = await crud_groups.create_group(group, db)
-    await write_audit(db, current_user, "admin.group.create", "group", created.id, before=None, after={"name": created.name, "slug": created.slug})
+    await enqueue_audit(current_user, "admin.group.create", "group", created.id, before=None, after={"name": created.name, "slug": created.slug})
     return created
 
 
@@ -43,7 +43,7 @@ async def update_group(
     before = {"name": existing.name, "slug": existing.slug}
     updated = await crud_groups.update_group(group_id, group, db)
     after = {"name": updated.name, "slug": updated.slug}
-    await write_audit(db, current_user, "admin.group.update", "group", group_id, before=before, after=after)
+    await enqueue_audit(current_user, "admin.group.update", "group", group_id, before=before, after=after)
     return updated
 
 
@@ -56,5 +56,5 @@ async def delete_group(
     existing = await crud_groups.get_group(group_id, db)
     before = {"name": existing.name, "slug": existing.slug}
     await crud_groups.delete_group(group_id, db)
-    await write_audit(db, current_user, "admin.group.delete", "group", group_id, before=before, after=None)
+    await enqueue_audit(current_user, "admin.group.delete", "group", group_id, before=before, after=None)
     return None
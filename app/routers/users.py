@@ -6,7 +6,7 @@ from app.models import User, UserRole
 from app.schemas_user import UserCreateAdmin, UserRead, UserUpdate, AdminSetPassword
 import app.crud_user as crud_user
 from app.dependencies import get_current_user, require_admin
-from app.v2.services.audit import write_audit
+from app.v2.services.audit import enqueue_audit
 
 
 router = APIRouter(prefix="/users", tags=["users"])
@@ -22,8 +22,7 @@ async def create_user(
     Créer un nouvel utilisateur (ADMIN seulement).
     """
     created = await crud_user.create_user_admin(user, db)
-    await write_audit(
-        db,
+    await enqueue_audit(
         current_user,
         "admin.user.create",
         "user",
@@ -89,7 +88,7 @@ async def update_user(
         "email_verified": getattr(updated, "email_verified", True),
         "group_id": getattr(updated, "group_id", None),
     }
-    await write_audit(db, current_user, "admin.user.update", "user", updated.id, before=before, after=after)
+    await enqueue_audit(current_user, "admin.user.update", "user", updated.id, before=before, after=after)
     return updated
 
 
@@ -117,7 +116,7 @@ async def delete_user(
     
     before = {"email": user_to_delete.email, "role": user_to_delete.role.value}
     await crud_user.delete_user(user_id, db)
-    await write_audit(db, current_user, "admin.user.delete", "user", user_id, before=before, after=None)
+    await enqueue_audit(current_user, "admin.user.delete", "user", user_id, before=before, after=None)
     return None
 
 
@@ -130,8 +129,7 @@ async def admin_set_password(
 ):
     """Changer le mot de passe d'un utilisateur (ADMIN seulement)."""
     updated = await crud_user.set_user_password(user_id, payload.new_password, db)
-    await write_audit(
-        db,
+    await enqueue_audit(
         current_user,
         "admin.user.set_password",
         "user",
@@ -1,14 +1,24 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import hmac
+import os
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import require_viewer, require_editor
-from app.models import Alert, AlertStatus, Priority, AlertSource, User
-from app.v2.schemas.alerts import AlertRead, AlertResolve
+from app.models import Alert, AlertStatus, Priority, AlertSource, User, UserRole
+from app.v2.schemas.alerts import AlertRead, AlertResolve, AlertStats
+from app.v2.services.alert_grouping import grouper
+from app.v2.services.alert_ingest import parse_alertmanager, upsert_alerts
+from app.v2.services.alert_stats import alert_stats, apply_delta, default_range, ingest_delta, record_resolved
 from app.v2.services.audit import write_audit
+from app.v2.services.events import bus
+from app.v2.services.maintenance import apply_silences, maintenance_index
+from app.v2.services.notify import notify_escalation
 
 router = APIRouter(prefix="/v2/alerts", tags=["v2-alerts"])
 
@@ -17,16 +27,99 @@ router = APIRouter(prefix="/v2/alerts", tags=["v2-alerts"])
 async def list_alerts(
     limit: int = 20,
     status_: str | None = None,
+    muted: bool | None = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_viewer),
 ):
     q = select(Alert).order_by(Alert.created_at.desc()).limit(limit)
     if status_:
         q = q.where(Alert.status == AlertStatus(status_))
+    if muted is not None:
+        q = q.where(Alert.muted.is_(True) if muted else Alert.muted.isnot(True))
     res = await db.execute(q)
     return list(res.scalars().all())
 
 
+@router.get("/stats", response_model=AlertStats)
+async def get_alert_stats(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """MTTR, alertes ouvertes par sévérité et volume par source/jour (7 derniers jours par défaut).
+
+    Servi par les rollups horaires `alert_stats_hourly`: le coût dépend de la
+    plage demandée, pas du nombre d'alertes.
+    """
+    start, end = default_range(start, end)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start must be before end")
+    return await alert_stats(db, start, end)
+
+
+def _check_ingest_token(authorization: str | None) -> None:
+    expected = os.getenv("ALERTMANAGER_WEBHOOK_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Alert ingestion not configured")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid ingestion token")
+
+
+@router.post("/ingest", status_code=status.HTTP_202_ACCEPTED, response_model=dict)
+async def ingest_alertmanager(
+    body: dict,
+    authorization: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_db),
+):
+    """Webhook Alertmanager (payload groupé, version 4).
+
+    Authentification: `Authorization: Bearer $ALERTMANAGER_WEBHOOK_TOKEN`
+    (http_config.authorization côté Alertmanager). Tout le lot est upserté
+    par empreinte dans une seule transaction; les notifications sont émises
+    par groupe (ouverture / escalade / résolution), pas par alerte.
+
+    Les alertes dont l'hôte/instance est couvert par une maintenance active
+    (CalendarEntry MAINTENANCE sur la ressource) sont enregistrées `muted`
+    et ne déclenchent aucune notification.
+    """
+    _check_ingest_token(authorization)
+    rows = parse_alertmanager(body)
+    await maintenance_index.ensure_fresh(db)
+    muted = apply_silences(rows, maintenance_index)
+    delta = await ingest_delta(db, rows)
+    await upsert_alerts(db, rows)
+    await apply_delta(db, delta)
+
+    transitions = grouper.observe(r for r in rows if not (r["muted"] and r["status"] == AlertStatus.OPEN))
+    admin_emails: list[str] = []
+    if any(t.group.severity == Priority.P0 and t.kind != "resolved" for t in transitions):
+        admins = await db.execute(select(User.email).where(User.role == UserRole.ADMIN, User.is_active.is_(True)))
+        admin_emails = list(admins.scalars().all())
+    for t in transitions:
+        await notify_escalation(db, t.group.severity.value, [], admin_emails, t.message())
+    await db.commit()
+
+    firing = sum(1 for r in rows if r["status"] == AlertStatus.OPEN)
+    if rows:
+        # Un seul événement par lot (pas un par alerte)
+        bus.publish("tickets", {"action": "ingested", "firing": firing, "resolved": len(rows) - firing})
+    return {
+        "received": len(rows),
+        "firing": firing,
+        "resolved": len(rows) - firing,
+        "muted": muted,
+        "notifications": len(transitions),
+    }
+
+
+@router.get("/groups", response_model=list[dict])
+async def list_alert_groups(current_user: User = Depends(require_viewer)):
+    """Groupes d'alertes ouverts (moteur de regroupement en mémoire)."""
+    return grouper.groups()
+
+
 @router.post("/{alert_id}/resolve", response_model=AlertRead)
 async def resolve_alert(
     alert_id: str,
@@ -47,8 +140,10 @@ async def resolve_alert(
     alert.resolved_at = __import__("datetime").datetime.utcnow()
     alert.resolved_by = current_user.id
     db.add(alert)
+    await record_resolved(db, alert)
+    await write_audit(db, current_user, "alert.resolve", "alert", alert.id, before=before, after={"status": alert.status.value})
     await db.commit()
     await db.refresh(alert)
-    await write_audit(db, current_user, "alert.resolve", "alert", alert.id, before=before, after={"status": alert.status.value})
+    bus.publish("tickets", {"action": "resolved", "id": alert.id, "project_id": alert.project_id})
 
     return alert
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import require_admin
+from app.models import AuditLog, User
+from app.v2.schemas.audit import AuditEntityState, AuditLogPage, AuditLogRead
+from app.v2.services.audit import entity_states, entry_diff
+from app.v2.services.retention import retention_worker
+
+router = APIRouter(prefix="/v2/audit", tags=["v2-audit"])
+
+
+def _encode_cursor(created_at: datetime, entry_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{entry_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        ts, entry_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), entry_id
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor")
+
+
+@router.get("", response_model=AuditLogPage)
+async def list_audit(
+    entity_type: str | None = None,
+    entity_id: str | None = None,
+    action: str | None = None,
+    actor_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    # Pagination keyset sur (created_at, id) décroissants: coût constant quelle que soit la page.
+    q = select(AuditLog).order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit + 1)
+    if entity_type:
+        q = q.where(AuditLog.entity_type == entity_type)
+    if entity_id:
+        q = q.where(AuditLog.entity_id == entity_id)
+    if action:
+        q = q.where(AuditLog.action == action)
+    if actor_id:
+        q = q.where(AuditLog.actor_id == actor_id)
+    if since:
+        q = q.where(AuditLog.created_at >= since)
+    if until:
+        q = q.where(AuditLog.created_at < until)
+    if cursor:
+        c_at, c_id = _decode_cursor(cursor)
+        q = q.where(or_(AuditLog.created_at < c_at, and_(AuditLog.created_at == c_at, AuditLog.id < c_id)))
+
+    res = await db.execute(q)
+    rows = list(res.scalars().all())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    items = [
+        AuditLogRead(
+            id=e.id,
+            actor_id=e.actor_id,
+            action=e.action,
+            entity_type=e.entity_type,
+            entity_id=e.entity_id,
+            before=e.before,
+            after=e.after,
+            diff=entry_diff(e),
+            created_at=e.created_at,
+        )
+        for e in rows
+    ]
+    return AuditLogPage(items=items, next_cursor=next_cursor)
+
+
+@router.get("/{entity_type}/{entity_id}/states", response_model=list[AuditEntityState])
+async def audit_entity_states(
+    entity_type: str,
+    entity_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    """États successifs d'une entité, reconstruits à partir des diffs d'audit."""
+    return await entity_states(db, entity_type, entity_id)
+
+
+@router.post("/retention/run", response_model=dict)
+async def run_retention(current_user: User = Depends(require_admin)):
+    """Déclenche immédiatement les jobs de rétention (archives NDJSON.gz)."""
+    return {"archived": await retention_worker.run_once()}
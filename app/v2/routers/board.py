@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import require_viewer
+from app.models import TaskStatus, User
+from app.v2.schemas.tasks import BoardColumnPage, BoardRead
+from app.v2.services.board import board, column_page
+
+router = APIRouter(prefix="/v2/board", tags=["v2-board"])
+
+
+@router.get("", response_model=BoardRead)
+async def get_board(
+    project_id: str,
+    sprint_id: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Tableau Kanban: compteurs exacts par colonne et première page de chaque colonne."""
+    return await board(db, project_id, sprint_id, limit)
+
+
+@router.get("/column", response_model=BoardColumnPage)
+async def get_board_column(
+    project_id: str,
+    status_: str = Query(..., alias="status"),
+    sprint_id: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Page suivante d'une colonne (`next_cursor` de la réponse précédente)."""
+    try:
+        col = TaskStatus(status_)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Unknown status")
+    try:
+        return await column_page(db, project_id, sprint_id, col, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor")
@@ -12,6 +12,8 @@ from app.dependencies import require_viewer, require_editor
 from app.models import CalendarEntry, CalendarEventType, Priority, User
 from app.v2.schemas.calendar import CalendarEventRead, CalendarEventCreate, CalendarEventPatch
 from app.v2.services.audit import write_audit
+from app.v2.services.events import bus
+from app.v2.services.maintenance import maintenance_index
 
 router = APIRouter(prefix="/v2/calendar", tags=["v2-calendar"])
 
@@ -93,9 +95,12 @@ async def create_calendar_event(
         updated_at=datetime.utcnow(),
     )
     db.add(entry)
+    await db.flush()
+    await write_audit(db, current_user, "calendar.create", "calendar_entry", entry.id, after={"title": entry.title})
     await db.commit()
     await db.refresh(entry)
-    await write_audit(db, current_user, "calendar.create", "calendar_entry", entry.id, after={"title": entry.title})
+    maintenance_index.upsert(entry)
+    bus.publish("calendar", {"action": "created", "id": entry.id})
     return entry
 
 
@@ -138,10 +143,12 @@ async def patch_calendar_event(
 
     entry.updated_at = datetime.utcnow()
     db.add(entry)
-    await db.commit()
-    await db.refresh(entry)
 
     after = {"start": entry.start.isoformat(), "end": (entry.end.isoformat() if entry.end else None)}
     await write_audit(db, current_user, "calendar.update", "calendar_entry", entry.id, before=before, after=after)
+    await db.commit()
+    await db.refresh(entry)
+    maintenance_index.upsert(entry)
+    bus.publish("calendar", {"action": "updated", "id": entry.id})
 
     return entry
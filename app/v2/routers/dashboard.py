@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends
+
+from app.dependencies import require_viewer
+from app.models import User
+from app.v2.schemas.dashboard import DashboardRead
+from app.v2.services.dashboard import dashboard_for
+
+router = APIRouter(prefix="/v2/dashboard", tags=["v2-dashboard"])
+
+
+@router.get("", response_model=DashboardRead)
+async def get_dashboard(current_user: User = Depends(require_viewer)):
+    """Tickets récents, tâches du jour et statut pipeline en un seul appel.
+
+    Les trois requêtes tournent en parallèle (une session chacune). Le
+    résultat est mis en cache `DASHBOARD_CACHE_SECONDS` par périmètre de
+    visibilité, invalidé par les événements de changement, et les appels
+    simultanés partagent une seule évaluation.
+    """
+    return await dashboard_for(current_user)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.dependencies import require_admin
+from app.models import OutboxMessage, OutboxStatus, User
+from app.v2.services.outbox import dispatcher, queue_depth
+
+router = APIRouter(prefix="/v2/outbox", tags=["v2-outbox"])
+
+
+@router.get("/metrics", response_model=dict)
+async def outbox_metrics(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+):
+    depth = await queue_depth(db)
+    oldest = await db.execute(
+        select(func.min(OutboxMessage.created_at)).where(OutboxMessage.status == OutboxStatus.PENDING)
+    )
+    oldest_pending = oldest.scalar_one_or_none()
+    return {
+        "depth": depth,
+        "oldest_pending_age_seconds": (
+            (datetime.utcnow() - oldest_pending).total_seconds() if oldest_pending else None
+        ),
+        "sent_total": dict(dispatcher.sent_total),
+        "failed_total": dict(dispatcher.failed_total),
+        "dead_total": dict(dispatcher.dead_total),
+        "latency": dispatcher.latency_stats(),
+    }
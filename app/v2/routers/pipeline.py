@@ -1,26 +1,103 @@
 from __future__ import annotations
 
+import hmac
 import os
-from datetime import datetime
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import require_viewer
-from app.models import PipelineEvent, User
-from app.v2.schemas.pipeline import PipelineStatus
+from app.models import PipelineEvent, Project, User
+from app.v2.schemas.pipeline import PipelineStats, PipelineStatus
+from app.v2.services.dashboard import latest_pipeline_status
+from app.v2.services.pipeline_ingest import latest_status, parse_gitlab_hook, writer
+from app.v2.services.pipeline_stats import default_window, pipeline_stats
 
 router = APIRouter(prefix="/v2/pipeline", tags=["v2-pipeline"])
 
 
 @router.get("/status", response_model=PipelineStatus)
 async def pipeline_status(
+    project: str | None = None,
+    ref: str | None = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_viewer),
 ):
-    res = await db.execute(select(PipelineEvent).order_by(PipelineEvent.created_at.desc()).limit(1))
-    ev = res.scalar_one_or_none()
+    """Dernier statut connu, global ou pour un projet GitLab (path_with_namespace) et/ou une ref.
+
+    Lu dans la carte en mémoire alimentée par le webhook; repli sur la DB.
+    """
+    if project is None and ref is None:
+        return await latest_pipeline_status(db)
+    hit = latest_status.get(project, ref) if project is not None and ref is not None else None
+    if hit is None and ref is None:
+        hit = latest_status.newest(project)
+    if hit is not None:
+        return PipelineStatus(status=hit["status"], ref=hit["ref"], url=hit["url"], updated_at=hit["updated_at"])
+
+    q = select(PipelineEvent).order_by(PipelineEvent.created_at.desc()).limit(1)
+    if project is not None:
+        q = q.where(PipelineEvent.gitlab_project == project)
+    if ref is not None:
+        q = q.where(PipelineEvent.ref == ref)
+    ev = (await db.execute(q)).scalar_one_or_none()
     if not ev:
         return PipelineStatus(status="unknown")
-    return PipelineStatus(status=ev.status, ref=ev.ref, url=ev.url, updated_at=ev.created_at)
+    return PipelineStatus(status=ev.status, ref=ev.ref, url=ev.url, updated_at=ev.updated_at or ev.created_at)
+
+
+@router.get("/stats", response_model=PipelineStats)
+async def get_pipeline_stats(
+    days: int = Query(default=30, ge=1, le=366),
+    project: str | None = None,
+    project_id: str | None = None,
+    ref: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Durées p50/p95, taux d'échec par ref et jobs flaky sur les `days` derniers jours.
+
+    `project` = projet GitLab (path_with_namespace), ou `project_id` = projet
+    interne (via Project.gitlab_project). Servi par les rollups journaliers.
+    """
+    if project is None and project_id is not None:
+        res = await db.execute(select(Project.gitlab_project).where(Project.id == project_id))
+        project = res.scalar_one_or_none()
+        if project is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not linked to GitLab")
+    start, end = default_window(days)
+    return await pipeline_stats(db, start, end, project=project, ref=ref)
+
+
+@router.get("/latest", response_model=list[dict])
+async def pipeline_latest(current_user: User = Depends(require_viewer)):
+    """Dernier statut par (projet GitLab, ref), depuis la mémoire."""
+    return latest_status.all()
+
+
+def _check_gitlab_token(token: str | None) -> None:
+    expected = os.getenv("GITLAB_WEBHOOK_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="GitLab webhook not configured")
+    if not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid GitLab token")
+
+
+@router.post("/webhook", status_code=status.HTTP_202_ACCEPTED, response_model=dict)
+async def gitlab_webhook(
+    body: dict,
+    x_gitlab_token: str | None = Header(default=None),
+):
+    """Webhook GitLab (Pipeline Hook et Job Hook), secret dans `X-Gitlab-Token`.
+
+    La livraison met à jour la carte des derniers statuts puis est fusionnée
+    par pipeline et écrite en différé par lot (une ligne par pipeline id).
+    """
+    _check_gitlab_token(x_gitlab_token)
+    record = parse_gitlab_hook(body)
+    if record is None:
+        return {"accepted": False}
+    latest_status.observe(record)
+    await writer.submit(record)
+    return {"accepted": True, "pipeline_id": record["pipeline_id"]}
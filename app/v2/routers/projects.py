@@ -2,33 +2,38 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import require_viewer, require_editor
 from app.models import Project, User
+from app.v2.schemas.burndown import Velocity
+from app.v2.schemas.tasks import CriticalPath
+from app.v2.schemas.timeline import Timeline
 from app.v2.services.audit import write_audit
+from app.v2.services.burndown import project_velocity
+from app.v2.services.dependencies import graphs
+from app.v2.services.events import bus
+from app.v2.services.project_overview import projects_overview
+from app.v2.services.timeline import GROUPS, project_timeline
 
 router = APIRouter(prefix="/v2/projects", tags=["v2-projects"])
 
 
 @router.get("", response_model=list[dict])
 async def list_projects(
-    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_viewer),
 ):
-    res = await db.execute(select(Project).order_by(Project.created_at.desc()))
-    return [
-        {
-            "id": p.id,
-            "name": p.name,
-            "description": p.description,
-            "created_at": p.created_at,
-        }
-        for p in res.scalars().all()
-    ]
+    """Projets avec tâches ouvertes par statut, alertes ouvertes par sévérité,
+    sprint actif et dernier pipeline.
+
+    Une seule requête (sous-requêtes agrégées par projet), mise en cache
+    `PROJECTS_CACHE_SECONDS` et invalidée par les événements projets, tâches,
+    tickets et pipeline.
+    """
+    return await projects_overview()
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=dict)
@@ -41,16 +46,76 @@ async def create_project(
     if not name:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="name is required")
 
-    project = Project(name=name, description=payload.get("description"), created_at=datetime.utcnow(), updated_at=datetime.utcnow())
+    key = (payload.get("key") or name).strip().upper().replace(" ", "-")[:20]
+    exists = await db.execute(select(Project.id).where(Project.key == key))
+    if exists.scalar_one_or_none():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Project key already exists")
+
+    project = Project(
+        key=key,
+        name=name,
+        description=payload.get("description"),
+        gitlab_project=payload.get("gitlab_project"),
+        created_at=datetime.utcnow(),
+    )
     db.add(project)
+    await db.flush()
+    await write_audit(db, current_user, "project.create", "project", project.id, after={"name": project.name})
     await db.commit()
     await db.refresh(project)
-
-    await write_audit(db, current_user, "project.create", "project", project.id, after={"name": project.name})
+    bus.publish("projects", {"action": "created", "id": project.id})
 
     return {
         "id": project.id,
         "name": project.name,
         "description": project.description,
+        "gitlab_project": project.gitlab_project,
         "created_at": project.created_at,
     }
+
+
+async def _get_project_or_404(db: AsyncSession, project_id: str) -> Project:
+    res = await db.execute(select(Project).where(Project.id == project_id))
+    project = res.scalar_one_or_none()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    return project
+
+
+@router.get("/{project_id}/critical-path", response_model=CriticalPath)
+async def project_critical_path(
+    project_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Chemin critique et marges (estimate_hours restants) sur le graphe de dépendances en cache."""
+    await _get_project_or_404(db, project_id)
+    graph = await graphs.get(db, project_id)
+    return {"project_id": project_id, **graph.critical_path()}
+
+
+@router.get("/{project_id}/timeline", response_model=Timeline, response_model_by_alias=True)
+async def get_project_timeline(
+    project_id: str,
+    group_by: str = Query(default="sprint"),
+    sprint_id: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Gantt calculé côté serveur: couloirs (sprint ou assigné), lignes et barres en tableaux parallèles."""
+    if group_by not in GROUPS:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="group_by must be sprint or assignee")
+    await _get_project_or_404(db, project_id)
+    return await project_timeline(db, project_id, group_by=group_by, sprint_id=sprint_id)
+
+
+@router.get("/{project_id}/velocity", response_model=Velocity)
+async def get_project_velocity(
+    project_id: str,
+    limit: int = Query(default=6, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Vélocité des `limit` derniers sprints clos, lue dans les snapshots quotidiens (une requête)."""
+    await _get_project_or_404(db, project_id)
+    return await project_velocity(db, project_id, limit)
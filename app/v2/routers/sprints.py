@@ -9,7 +9,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.dependencies import require_viewer, require_editor
 from app.models import Sprint, User
+from app.v2.schemas.burndown import Burndown, Capacity
 from app.v2.services.audit import write_audit
+from app.v2.services.burndown import sprint_burndown
+from app.v2.services.capacity import capacity_for
+from app.v2.services.events import bus
 
 router = APIRouter(prefix="/v2/sprints", tags=["v2-sprints"])
 
@@ -67,19 +71,23 @@ async def create_sprint(
     else:
         end_date = start_date + timedelta(days=14)
 
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="end_date must be after start_date")
+
+    # Colonnes DateTime: minuit du jour de début, fin de journée du jour de fin
     sprint = Sprint(
         project_id=project_id,
         name=name,
-        start_date=start_date,
-        end_date=end_date,
+        start_date=datetime.combine(start_date, datetime.min.time()),
+        end_date=datetime.combine(end_date, datetime.max.time().replace(microsecond=0)),
         created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
     )
     db.add(sprint)
+    await db.flush()
+    await write_audit(db, current_user, "sprint.create", "sprint", sprint.id, after={"name": sprint.name})
     await db.commit()
     await db.refresh(sprint)
-
-    await write_audit(db, current_user, "sprint.create", "sprint", sprint.id, after={"name": sprint.name})
+    bus.publish("projects", {"action": "sprint_created", "id": sprint.id, "project_id": sprint.project_id})
 
     return {
         "id": sprint.id,
@@ -89,3 +97,33 @@ async def create_sprint(
         "end_date": sprint.end_date,
         "created_at": sprint.created_at,
     }
+
+
+@router.get("/{sprint_id}/burndown", response_model=Burndown)
+async def get_sprint_burndown(
+    sprint_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Burndown quotidien (restant, périmètre, idéal), lu dans sprint_snapshots_daily par une requête de plage."""
+    res = await db.execute(select(Sprint).where(Sprint.id == sprint_id))
+    sprint = res.scalar_one_or_none()
+    if sprint is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sprint not found")
+    return await sprint_burndown(db, sprint)
+
+
+@router.get("/{sprint_id}/capacity", response_model=Capacity)
+async def get_sprint_capacity(
+    sprint_id: str,
+    current_user: User = Depends(require_viewer),
+):
+    """Charge (estimate_hours) et disponibilité (jours ouvrés moins absences) par assigné et par jour.
+
+    Résultat mis en cache par sprint (`CAPACITY_CACHE_SECONDS`), invalidé par
+    les événements tâches et calendrier.
+    """
+    capacity = await capacity_for(sprint_id)
+    if capacity is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sprint not found")
+    return capacity
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.dependencies import require_viewer
+from app.models import User
+from app.v2.services.events import TOPICS, bus, sse_stream
+
+router = APIRouter(prefix="/v2/events", tags=["v2-events"])
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    topics: str | None = None,
+    current_user: User = Depends(require_viewer),
+):
+    """Flux Server-Sent Events des changements (remplace le polling du dashboard).
+
+    `topics`: liste séparée par des virgules parmi tickets, tasks, pipeline,
+    calendar, projects (tous par défaut). Chaque événement porte un `data` JSON minimal
+    ({"action", "id", ...}); le client recharge ce qui le concerne. Un
+    commentaire `: ping` est envoyé toutes les `EVENTS_HEARTBEAT_SECONDS`,
+    et un événement `resync` si le client a pris trop de retard.
+    """
+    wanted = [t.strip() for t in (topics or "").split(",") if t.strip()] or list(TOPICS)
+    unknown = [t for t in wanted if t not in TOPICS]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown topics: {', '.join(unknown)}")
+
+    return StreamingResponse(
+        sse_stream(bus, wanted, request.is_disconnected, float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,15 +1,38 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import require_editor, require_viewer
-from app.models import Task, TaskStatus, Priority, User
-from app.v2.schemas.tasks import TaskRead, TaskCreate, TaskPatch
-from app.v2.services.audit import write_audit
+from app.models import Task, TaskComment, TaskDependency, TaskStatus, Priority, User
+from app.v2.schemas.tasks import (
+    TaskAssigneeRead,
+    TaskAssigneesUpdate,
+    TaskBatchMove,
+    TaskBatchMoveResult,
+    TaskCommentCreate,
+    TaskCommentPage,
+    TaskCommentRead,
+    TaskCreate,
+    TaskDependencyCreate,
+    TaskDependencyRead,
+    TaskDetail,
+    TaskPage,
+    TaskPatch,
+    TaskRead,
+)
+from app.v2.services.audit import write_audit, write_audit_many
+from app.v2.services.burndown import SnapshotDelta, apply_delta, record_task_change, task_state
+from app.v2.services.dashboard import tasks_due_today
+from app.v2.services.dependencies import CycleError, check_edge_in_db, graphs, lock_project_edges
+from app.v2.services.events import bus
+from app.v2.services.mentions import parse_mentions, resolve_mentions
+from app.v2.services.notify import notify_mentions
+from app.v2.services.task_detail import assignees_of, comments_page, my_tasks, set_assignees, task_detail
+from app.v2.services.ranking import last_rank, move_tasks, needs_rebalance, place_rank, rank_between, rebalancer
 
 router = APIRouter(prefix="/v2/tasks", tags=["v2-tasks"])
 
@@ -23,7 +46,7 @@ async def list_tasks(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_viewer),
 ):
-    q = select(Task).order_by(Task.status, Task.position.asc(), Task.created_at.desc()).limit(limit)
+    q = select(Task).order_by(Task.status, Task.rank.asc(), Task.id.asc()).limit(limit)
     if project_id:
         q = q.where(Task.project_id == project_id)
     if sprint_id:
@@ -41,31 +64,207 @@ async def tasks_today(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_viewer),
 ):
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    tomorrow = today_start + timedelta(days=1)
-
-    q = (
-        select(Task)
-        .where(Task.due_at.is_not(None))
-        .where(Task.due_at >= today_start)
-        .where(Task.due_at < tomorrow)
-        .order_by(Task.due_at.asc())
-        .limit(limit)
+    return await tasks_due_today(db, limit)
+
+
+@router.get("/mine", response_model=TaskPage)
+async def list_my_tasks(
+    status_: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Tâches assignées à l'utilisateur courant (pagination keyset)."""
+    try:
+        return await my_tasks(db, current_user.id, TaskStatus(status_) if status_ else None, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid status or cursor")
+
+
+async def _get_task_or_404(db: AsyncSession, task_id: str) -> Task:
+    res = await db.execute(select(Task).where(Task.id == task_id))
+    task = res.scalar_one_or_none()
+    if not task:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return task
+
+
+@router.get("/{task_id}", response_model=TaskDetail)
+async def get_task(
+    task_id: str,
+    comments_limit: int = Query(default=20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    """Détail d'une tâche: assignés et première page de commentaires, en nombre de requêtes fixe."""
+    detail = await task_detail(db, task_id, comments_limit)
+    if detail is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    task = detail["task"]
+    return TaskDetail(
+        **TaskRead.model_validate(task).model_dump(),
+        assignees=[TaskAssigneeRead.model_validate(a) for a in task.assignees],
+        comments=TaskCommentPage(**detail["comments"]),
     )
-    res = await db.execute(q)
-    rows = list(res.scalars().all())
-    if rows:
-        return rows
-
-    # Fallback (démo/dev): si rien n'est dû aujourd'hui, renvoyer des tâches récentes
-    q2 = (
-        select(Task)
-        .where(Task.status != TaskStatus.DONE)
-        .order_by(Task.updated_at.desc(), Task.created_at.desc())
-        .limit(limit)
+
+
+@router.get("/{task_id}/comments", response_model=TaskCommentPage)
+async def list_task_comments(
+    task_id: str,
+    cursor: str | None = None,
+    limit: int = Query(default=20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    try:
+        return await comments_page(db, task_id, cursor, limit)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid cursor")
+
+
+@router.post("/{task_id}/comments", response_model=TaskCommentRead, status_code=status.HTTP_201_CREATED)
+async def create_task_comment(
+    task_id: str,
+    payload: TaskCommentCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    task = await _get_task_or_404(db, task_id)
+    mentioned = await resolve_mentions(db, parse_mentions(payload.body))
+    comment = TaskComment(
+        task_id=task.id,
+        user_id=current_user.id,
+        body=payload.body,
+        mentions=[u.id for u in mentioned],
+        created_at=datetime.utcnow(),
+    )
+    db.add(comment)
+    await db.flush()
+    await write_audit(db, current_user, "task.comment", "task", task.id, before=None, after={"comment_id": comment.id})
+    # Notifications via l'outbox: committées avec le commentaire, envoyées en tâche de fond
+    notify_mentions(
+        db,
+        [u.email for u in mentioned if u.id != current_user.id],
+        f"{current_user.first_name} {current_user.last_name}",
+        task.title,
+        payload.body,
+    )
+    await db.commit()
+    bus.publish("tasks", {"action": "commented", "id": task.id, "project_id": task.project_id})
+    return TaskCommentRead(
+        id=comment.id,
+        task_id=comment.task_id,
+        user_id=comment.user_id,
+        body=comment.body,
+        mentions=comment.mentions or [],
+        created_at=comment.created_at,
+        user=current_user,
     )
-    res2 = await db.execute(q2)
-    return list(res2.scalars().all())
+
+
+@router.post(
+    "/{task_id}/dependencies", response_model=TaskDependencyRead, status_code=status.HTTP_201_CREATED
+)
+async def add_task_dependency(
+    task_id: str,
+    payload: TaskDependencyCreate,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_editor),
+):
+    """Déclare que `task_id` est bloquée par `depends_on_id` (409 si cela ferme un cycle).
+
+    Arête déjà présente: 200 avec la ligne existante.
+    """
+    task = await _get_task_or_404(db, task_id)
+    dep = (await db.execute(select(Task).where(Task.id == payload.depends_on_id))).scalar_one_or_none()
+    if dep is None or dep.project_id != task.project_id:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Dependency must be a task of the same project"
+        )
+
+    # Contrôle de cycle et ajout au graphe sous le même verrou: deux ajouts
+    # croisés concurrents (A bloquée par B, B par A) ne passent pas tous les deux.
+    # Le verrou asyncio couvre ce processus, le verrou base les autres instances.
+    async with graphs.lock(task.project_id):
+        await lock_project_edges(db, task.project_id)
+        existing = await db.execute(
+            select(TaskDependency).where(TaskDependency.task_id == task.id, TaskDependency.depends_on_id == dep.id)
+        )
+        row = existing.scalar_one_or_none()
+        if row is not None:
+            response.status_code = status.HTTP_200_OK
+            return row
+
+        graph = await graphs.get(db, task.project_id)
+        try:
+            graph.check_edge(task.id, dep.id)
+        except CycleError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        try:
+            await check_edge_in_db(db, task.id, dep.id)
+        except CycleError as e:
+            # Arête posée par une autre instance, absente du cache: recharger au prochain accès
+            graphs.invalidate(task.project_id)
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+        row = TaskDependency(
+            task_id=task.id, depends_on_id=dep.id, project_id=task.project_id, created_at=datetime.utcnow()
+        )
+        db.add(row)
+        await write_audit(db, current_user, "task.depend", "task", task.id, before=None, after={"depends_on": dep.id})
+        await db.commit()
+        graph.add_edge(task.id, dep.id)
+    bus.publish("tasks", {"action": "dependency", "id": task.id, "project_id": task.project_id})
+    return row
+
+
+@router.delete("/{task_id}/dependencies/{depends_on_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_task_dependency(
+    task_id: str,
+    depends_on_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_editor),
+):
+    res = await db.execute(
+        select(TaskDependency).where(TaskDependency.task_id == task_id, TaskDependency.depends_on_id == depends_on_id)
+    )
+    row = res.scalar_one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dependency not found")
+    project_id = row.project_id
+    await db.delete(row)
+    await write_audit(db, current_user, "task.undepend", "task", task_id, before={"depends_on": depends_on_id}, after=None)
+    await db.commit()
+    graph = graphs.peek(project_id)
+    if graph is not None:
+        graph.remove_edge(task_id, depends_on_id)
+    bus.publish("tasks", {"action": "dependency", "id": task_id, "project_id": project_id})
+
+
+@router.put("/{task_id}/assignees", response_model=list[TaskAssigneeRead])
+async def update_task_assignees(
+    task_id: str,
+    payload: TaskAssigneesUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_editor),
+):
+    """Remplace la liste des assignés (ajouts/retraits en deux requêtes groupées)."""
+    task = await _get_task_or_404(db, task_id)
+    try:
+        before, after = await set_assignees(db, task.id, payload.user_ids)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    if before != after:
+        await write_audit(
+            db, current_user, "task.assign", "task", task.id, before={"assignees": before}, after={"assignees": after}
+        )
+    await db.commit()
+    if before != after:
+        bus.publish("tasks", {"action": "assigned", "id": task.id, "project_id": task.project_id})
+
+    return await assignees_of(db, task.id)
 
 
 @router.post("", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
@@ -74,9 +273,8 @@ async def create_task(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_editor),
 ):
-    # position = max(position)+1 within status
-    max_pos = await db.execute(select(func.max(Task.position)).where(Task.project_id == payload.project_id))
-    pos = (max_pos.scalar_one_or_none() or 0) + 1
+    # Fin de la colonne TODO: une lecture d'index, pas de scan du projet
+    rank = rank_between(await last_rank(db, payload.project_id, TaskStatus.TODO), None)
 
     task = Task(
         project_id=payload.project_id,
@@ -87,16 +285,22 @@ async def create_task(
         priority=Priority(payload.priority),
         estimate_hours=payload.estimate_hours,
         due_at=payload.due_at,
-        position=pos,
+        rank=rank,
         gitlab_mr_url=payload.gitlab_mr_url,
         gitlab_job_url=payload.gitlab_job_url,
         created_by=current_user.id,
         updated_at=datetime.utcnow(),
     )
     db.add(task)
+    await db.flush()
+    await write_audit(db, current_user, "task.create", "task", task.id, before=None, after={"title": task.title})
+    await record_task_change(db, None, task_state(task))
     await db.commit()
     await db.refresh(task)
-    await write_audit(db, current_user, "task.create", "task", task.id, before=None, after={"title": task.title})
+    bus.publish("tasks", {"action": "created", "id": task.id, "project_id": task.project_id})
+    graphs.update_task(task.project_id, task.id, task.estimate_hours, task.status)
+    if needs_rebalance(task.rank):
+        rebalancer.request(task.project_id, task.status)
     return task
 
 
@@ -112,11 +316,21 @@ async def patch_task(
     if not task:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
 
-    before = {"status": task.status.value, "priority": task.priority.value, "title": task.title}
+    before = {"status": task.status.value, "priority": task.priority.value, "title": task.title, "rank": task.rank}
+    snapshot_before = task_state(task)
 
     data = payload.model_dump(exclude_unset=True)
+    old_status = task.status
     if "status" in data and data["status"] is not None:
         task.status = TaskStatus(data["status"])
+    # Déplacement: seul le rang de cette tâche change, quelle que soit la taille de la colonne
+    if task.status != old_status or data.get("after_id") or data.get("before_id"):
+        try:
+            task.rank = await place_rank(
+                db, task.project_id, task.status, data.get("after_id"), data.get("before_id"), exclude_id=task.id
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
     if "priority" in data and data["priority"] is not None:
         task.priority = Priority(data["priority"])
     for k in ("title", "description", "estimate_hours", "due_at", "position"):
@@ -125,10 +339,67 @@ async def patch_task(
 
     task.updated_at = datetime.utcnow()
     db.add(task)
-    await db.commit()
-    await db.refresh(task)
 
-    after = {"status": task.status.value, "priority": task.priority.value, "title": task.title}
+    after = {"status": task.status.value, "priority": task.priority.value, "title": task.title, "rank": task.rank}
     await write_audit(db, current_user, "task.update", "task", task.id, before=before, after=after)
+    await record_task_change(db, snapshot_before, task_state(task))
+    await db.commit()
+    await db.refresh(task)
+    bus.publish("tasks", {"action": "updated", "id": task.id, "project_id": task.project_id})
+    graphs.update_task(task.project_id, task.id, task.estimate_hours, task.status)
+    if needs_rebalance(task.rank):
+        rebalancer.request(task.project_id, task.status)
 
     return task
+
+
+@router.post("/batch-move", response_model=TaskBatchMoveResult)
+async def batch_move_tasks(
+    payload: TaskBatchMove,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_editor),
+):
+    """N déplacements (statut et/ou rang) en une transaction: UPDATE groupé + un INSERT d'audit."""
+    try:
+        moved = await move_tasks(db, [m.model_dump() for m in payload.moves])
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    await write_audit_many(
+        db,
+        current_user,
+        "task.move",
+        "task",
+        [
+            (
+                m["id"],
+                {"status": m["old_status"].value, "rank": m["old_rank"]},
+                {"status": m["status"].value, "rank": m["rank"]},
+            )
+            for m in moved
+        ],
+    )
+    changed = {m["id"]: m for m in moved if m["status"] != m["old_status"]}
+    if changed:
+        res = await db.execute(
+            select(Task.id, Task.sprint_id, Task.estimate_hours).where(Task.id.in_(changed), Task.sprint_id.is_not(None))
+        )
+        delta = SnapshotDelta()
+        for tid, sprint_id, estimate in res.all():
+            state = {"sprint_id": sprint_id, "estimate_hours": estimate}
+            delta.change({**state, "status": changed[tid]["old_status"]}, {**state, "status": changed[tid]["status"]})
+        if delta:
+            await apply_delta(db, delta)
+    await db.commit()
+
+    # Un événement par projet: les autres instances n'invalident que les graphes concernés
+    by_project: dict[str, list[str]] = {}
+    for m in moved:
+        by_project.setdefault(m["project_id"], []).append(m["id"])
+    for project_id, ids in by_project.items():
+        bus.publish("tasks", {"action": "moved", "ids": ids, "project_id": project_id})
+    for m in moved:
+        graphs.set_status(m["project_id"], m["id"], m["status"])
+    for project_id, col in {(m["project_id"], m["status"]) for m in moved if needs_rebalance(m["rank"])}:
+        rebalancer.request(project_id, col)
+    return {"items": [{"id": m["id"], "status": m["status"].value, "rank": m["rank"]} for m in moved]}
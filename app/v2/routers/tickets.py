@@ -3,29 +3,52 @@ from __future__ import annotations
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.dependencies import require_viewer
-from app.models import Alert, AlertSource, AlertStatus, Priority, User
-from app.v2.schemas.alerts import AlertCreate, AlertRead, AlertResolve, TicketUpdate
+from app.models import Alert, AlertSource, AlertStatus, Priority, TicketEvent, User, UserRole
+from app.v2.schemas.alerts import AlertCreate, AlertRead, AlertResolve, TicketEventRead, TicketUpdate
+from app.v2.services.alert_stats import record_opened, record_resolved
 from app.v2.services.audit import write_audit
+from app.v2.services.events import bus
+from app.v2.services.notify import notify_escalation
 
 # Tickets internes simples: on réutilise le modèle v2 "Alert" comme base.
 router = APIRouter(prefix="/v2/tickets", tags=["v2-tickets"])
 
 
+def _ticket_snapshot(ticket: Alert) -> dict:
+    return {
+        "title": ticket.title,
+        "severity": ticket.severity.value,
+        "status": ticket.status.value,
+        "workflow_status": ticket.workflow_status,
+        "assigned_to": ticket.assigned_to,
+    }
+
+
 @router.get("", response_model=list[AlertRead])
 async def list_tickets(
     limit: int = 20,
     status_: str | None = None,
+    workflow_status: str | None = None,
+    assigned_to: str | None = None,
+    mine: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_viewer),
 ):
     q = select(Alert).order_by(Alert.created_at.desc()).limit(limit)
     if status_:
         q = q.where(Alert.status == AlertStatus(status_))
+    if workflow_status:
+        q = q.where(Alert.workflow_status == workflow_status)
+    if assigned_to:
+        q = q.where(Alert.assigned_to == assigned_to)
+    if mine:
+        # assigned_to contient un email ou un user id (index assigned_to, status)
+        q = q.where(or_(Alert.assigned_to == current_user.id, Alert.assigned_to == current_user.email))
     res = await db.execute(q)
     return list(res.scalars().all())
 
@@ -46,8 +69,19 @@ async def create_ticket(
         created_at=datetime.utcnow(),
     )
     db.add(ticket)
-    await db.commit()
-    await db.refresh(ticket)
+    await db.flush()
+    await record_opened(db, ticket)
+
+    # Escalade (P0 uniquement): notification écrite dans la même transaction que le ticket (outbox)
+    if ticket.severity == Priority.P0:
+        admins = await db.execute(select(User.email).where(User.role == UserRole.ADMIN, User.is_active.is_(True)))
+        await notify_escalation(
+            db,
+            ticket.severity.value,
+            assigned_emails=[],
+            admin_emails=list(admins.scalars().all()),
+            message=f"[{ticket.severity.value}] {ticket.title}",
+        )
 
     await write_audit(
         db,
@@ -56,8 +90,16 @@ async def create_ticket(
         "ticket",
         ticket.id,
         before=None,
-        after={"title": ticket.title, "severity": ticket.severity.value, "status": ticket.status.value},
+        after={
+            "title": ticket.title,
+            "severity": ticket.severity.value,
+            "status": ticket.status.value,
+            "payload": ticket.payload,
+        },
     )
+    await db.commit()
+    await db.refresh(ticket)
+    bus.publish("tickets", {"action": "created", "id": ticket.id, "project_id": ticket.project_id})
 
     return ticket
 
@@ -83,8 +125,7 @@ async def resolve_ticket(
     ticket.resolved_by = current_user.id
 
     db.add(ticket)
-    await db.commit()
-    await db.refresh(ticket)
+    await record_resolved(db, ticket)
 
     await write_audit(
         db,
@@ -95,6 +136,9 @@ async def resolve_ticket(
         before=before,
         after={"status": ticket.status.value, "resolution_note": payload.resolution_note},
     )
+    await db.commit()
+    await db.refresh(ticket)
+    bus.publish("tickets", {"action": "resolved", "id": ticket.id, "project_id": ticket.project_id})
 
     return ticket
 
@@ -111,57 +155,50 @@ async def update_ticket(
     if not ticket:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found")
 
-    before = {
-        "title": ticket.title,
-        "severity": ticket.severity.value,
-        "status": ticket.status.value,
-        "payload": ticket.payload,
-    }
+    before = _ticket_snapshot(ticket)
 
     update = payload.model_dump(exclude_unset=True)
     if "title" in update and update["title"] is not None:
         ticket.title = update["title"]
     if "severity" in update and update["severity"] is not None:
         ticket.severity = Priority(update["severity"])
-
-    # Store ticketing metadata in payload JSON (no DB migration)
-    meta = dict(ticket.payload or {})
     if "workflow_status" in update:
-        meta["workflow_status"] = update.get("workflow_status")
+        ticket.workflow_status = update.get("workflow_status")
     if "assigned_to" in update:
-        meta["assigned_to"] = update.get("assigned_to")
-
-    # Append a lightweight history entry
-    history = list(meta.get("history") or [])
-    history.append(
-        {
-            "at": datetime.utcnow().isoformat(),
-            "actor_id": current_user.id,
-            "action": "ticket.update",
-            "note": update.get("note"),
-            "changes": {k: v for k, v in update.items() if k != "note"},
-        }
+        ticket.assigned_to = update.get("assigned_to")
+
+    # Historique append-only: une petite ligne, le payload n'est plus réécrit
+    db.add(
+        TicketEvent(
+            ticket_id=ticket.id,
+            actor_id=current_user.id,
+            action="ticket.update",
+            note=update.get("note"),
+            changes={k: v for k, v in update.items() if k != "note"},
+            created_at=datetime.utcnow(),
+        )
     )
-    meta["history"] = history[-50:]
-    ticket.payload = meta
-
     db.add(ticket)
+
+    await write_audit(db, current_user, "ticket.update", "ticket", ticket.id, before=before, after=_ticket_snapshot(ticket))
     await db.commit()
     await db.refresh(ticket)
-
-    await write_audit(
-        db,
-        current_user,
-        "ticket.update",
-        "ticket",
-        ticket.id,
-        before=before,
-        after={
-            "title": ticket.title,
-            "severity": ticket.severity.value,
-            "status": ticket.status.value,
-            "payload": ticket.payload,
-        },
-    )
+    bus.publish("tickets", {"action": "updated", "id": ticket.id, "project_id": ticket.project_id})
 
     return ticket
+
+
+@router.get("/{ticket_id}/history", response_model=list[TicketEventRead])
+async def ticket_history(
+    ticket_id: str,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_viewer),
+):
+    res = await db.execute(
+        select(TicketEvent)
+        .where(TicketEvent.ticket_id == ticket_id)
+        .order_by(TicketEvent.created_at.desc())
+        .limit(limit)
+    )
+    return list(res.scalars().all())
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 
@@ -22,6 +22,10 @@ class AlertRead(BaseModel):
     source: str
     created_at: datetime
     resolved_at: Optional[datetime] = None
+    workflow_status: Optional[str] = None
+    assigned_to: Optional[str] = None
+    muted: Optional[bool] = None
+    muted_by: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -34,7 +38,36 @@ class AlertResolve(BaseModel):
 class TicketUpdate(BaseModel):
     title: Optional[str] = Field(default=None, min_length=2, max_length=200)
     severity: Optional[str] = Field(default=None)
-    # Stored inside Alert.payload to avoid schema migrations
     workflow_status: Optional[str] = Field(default=None, max_length=30)  # OPEN/IN_PROGRESS
     assigned_to: Optional[str] = Field(default=None, max_length=200)  # email or user id
     note: Optional[str] = Field(default=None, max_length=2000)
+
+
+class TicketEventRead(BaseModel):
+    id: str
+    ticket_id: str
+    actor_id: Optional[str] = None
+    action: str
+    note: Optional[str] = None
+    changes: Optional[dict] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AlertSourceDay(BaseModel):
+    day: str
+    source: str
+    count: int
+
+
+class AlertStats(BaseModel):
+    start: datetime
+    end: datetime
+    opened: int
+    resolved: int
+    mttr_seconds: Optional[float] = None
+    mttr_by_severity: Dict[str, Optional[float]] = {}
+    open_by_severity: Dict[str, int] = {}
+    per_source_per_day: List[AlertSourceDay] = []
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+
+class AuditLogRead(BaseModel):
+    id: str
+    actor_id: Optional[str] = None
+    action: str
+    entity_type: str
+    entity_id: str
+    before: Any = None
+    after: Any = None
+    diff: List[dict] = []
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AuditLogPage(BaseModel):
+    items: List[AuditLogRead]
+    next_cursor: Optional[str] = None
+
+
+class AuditEntityState(BaseModel):
+    id: str
+    action: str
+    actor_id: Optional[str] = None
+    created_at: datetime
+    state: Any = None
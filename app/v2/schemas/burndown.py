@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class Burndown(BaseModel):
+    """Burndown en colonnes: le jour i est (day[i], remaining_hours[i], ...), du début du sprint à aujourd'hui."""
+
+    sprint_id: str
+    start_date: datetime
+    end_date: datetime
+    day: List[str] = []
+    scope_hours: List[float] = []
+    scope_tasks: List[int] = []
+    remaining_hours: List[float] = []
+    remaining_tasks: List[int] = []
+    ideal_hours: List[float] = []
+
+
+class VelocitySprint(BaseModel):
+    id: str
+    name: str
+    start_date: datetime
+    end_date: datetime
+    committed_hours: float
+    completed_hours: float
+    completed_tasks: int
+
+
+class Velocity(BaseModel):
+    project_id: str
+    sprints: List[VelocitySprint] = []
+    average_completed_hours: Optional[float] = None
+
+
+class CapacityAssignees(BaseModel):
+    user_id: List[str] = []
+    name: List[str] = []
+    assigned_hours: List[float] = []
+    available_hours: List[float] = []
+    balance_hours: List[float] = []
+
+
+class Capacity(BaseModel):
+    """Capacité assigné × jour: available[i][j] = heures libres de assignees.user_id[i] le jour days[j].
+
+    balance_hours < 0: assigné surchargé sur le sprint.
+    """
+
+    sprint_id: str
+    days: List[str] = []
+    hours_per_day: float
+    assignees: CapacityAssignees
+    available: List[List[float]] = []
+    unassigned_hours: float = 0.0
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List
+from pydantic import BaseModel
+
+from app.v2.schemas.alerts import AlertRead
+from app.v2.schemas.pipeline import PipelineStatus
+from app.v2.schemas.tasks import TaskRead
+
+
+class DashboardRead(BaseModel):
+    tickets: List[AlertRead]
+    tasks_today: List[TaskRead]
+    pipeline: PipelineStatus
+    generated_at: datetime
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -10,3 +10,38 @@ class PipelineStatus(BaseModel):
     ref: Optional[str] = None
     url: Optional[str] = None
     updated_at: Optional[datetime] = None
+
+
+class PipelineDurationStats(BaseModel):
+    p50_seconds: Optional[float] = None
+    p95_seconds: Optional[float] = None
+    mean_seconds: Optional[float] = None
+
+
+class PipelineRefStats(BaseModel):
+    ref: Optional[str] = None
+    total: int
+    failed: int
+    failure_rate: Optional[float] = None
+
+
+class FlakyJob(BaseModel):
+    project: str
+    job: str
+    runs: int
+    failed: int
+    flaky: int
+    flaky_rate: Optional[float] = None
+
+
+class PipelineStats(BaseModel):
+    start: datetime
+    end: datetime
+    pipelines: int
+    success: int
+    failed: int
+    canceled: int
+    failure_rate: Optional[float] = None
+    duration: PipelineDurationStats
+    by_ref: List[PipelineRefStats] = []
+    flaky_jobs: List[FlakyJob] = []
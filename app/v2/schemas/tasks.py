@@ -16,6 +16,7 @@ class TaskRead(BaseModel):
     estimate_hours: Optional[float] = None
     due_at: Optional[datetime] = None
     position: int = 0
+    rank: Optional[str] = None
     gitlab_mr_url: Optional[str] = None
     gitlab_job_url: Optional[str] = None
     created_by: Optional[str] = None
@@ -46,6 +47,55 @@ class TaskPatch(BaseModel):
     estimate_hours: Optional[float] = Field(default=None, ge=0)
     due_at: Optional[datetime] = None
     position: Optional[int] = None
+    # Déplacement Kanban: placer la tâche entre deux voisines de la colonne cible
+    # (after_id = carte au-dessus, before_id = carte en dessous; aucune = fin de colonne)
+    after_id: Optional[str] = None
+    before_id: Optional[str] = None
+
+
+class TaskMove(BaseModel):
+    id: str
+    status: Optional[str] = None
+    after_id: Optional[str] = None
+    before_id: Optional[str] = None
+
+
+class TaskBatchMove(BaseModel):
+    # Appliqués dans l'ordre (multi-sélection, report de fin de sprint)
+    moves: List[TaskMove] = Field(..., min_length=1, max_length=2000)
+
+
+class TaskMoveResult(BaseModel):
+    id: str
+    status: str
+    rank: str
+
+
+class TaskBatchMoveResult(BaseModel):
+    items: List[TaskMoveResult]
+
+
+class TaskUserRead(BaseModel):
+    id: str
+    first_name: str
+    last_name: str
+    email: str
+
+    class Config:
+        from_attributes = True
+
+
+class TaskAssigneeRead(BaseModel):
+    user_id: str
+    created_at: Optional[datetime] = None
+    user: Optional[TaskUserRead] = None
+
+    class Config:
+        from_attributes = True
+
+
+class TaskAssigneesUpdate(BaseModel):
+    user_ids: List[str] = Field(default_factory=list, max_length=100)
 
 
 class TaskCommentRead(BaseModel):
@@ -55,10 +105,71 @@ class TaskCommentRead(BaseModel):
     body: str
     mentions: List[str] = []
     created_at: datetime
+    user: Optional[TaskUserRead] = None
 
     class Config:
         from_attributes = True
 
 
+class TaskCommentPage(BaseModel):
+    items: List[TaskCommentRead]
+    next_cursor: Optional[str] = None
+
+
+class TaskDetail(TaskRead):
+    assignees: List[TaskAssigneeRead] = []
+    comments: TaskCommentPage
+
+
+class TaskPage(BaseModel):
+    items: List[TaskRead]
+    next_cursor: Optional[str] = None
+
+
 class TaskCommentCreate(BaseModel):
     body: str = Field(..., min_length=1, max_length=5000)
+
+
+class BoardColumn(BaseModel):
+    status: str
+    count: int
+    tasks: List[TaskRead] = []
+    next_cursor: Optional[str] = None
+
+
+class BoardRead(BaseModel):
+    project_id: str
+    sprint_id: Optional[str] = None
+    columns: List[BoardColumn]
+
+
+class BoardColumnPage(BaseModel):
+    status: str
+    tasks: List[TaskRead] = []
+    next_cursor: Optional[str] = None
+
+
+class TaskDependencyCreate(BaseModel):
+    depends_on_id: str
+
+
+class TaskDependencyRead(BaseModel):
+    task_id: str
+    depends_on_id: str
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CriticalPath(BaseModel):
+    """Heures relatives au début du projet; tableaux parallèles en ordre topologique."""
+
+    project_id: str
+    duration_hours: float
+    path: List[str] = []
+    order: List[str] = []
+    earliest_start: List[float] = []
+    earliest_finish: List[float] = []
+    slack: List[float] = []
+    cycle: List[str] = []
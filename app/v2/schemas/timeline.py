@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class TimelineLanes(BaseModel):
+    key: List[Optional[str]] = []
+    label: List[str] = []
+    rows: List[int] = []
+
+
+class TimelineBars(BaseModel):
+    task_id: List[str] = []
+    title: List[str] = []
+    status: List[str] = []
+    lane: List[int] = []
+    row: List[int] = []
+    start: List[float] = []
+    end: List[float] = []
+    critical: List[int] = []
+
+
+class TimelineEdges(BaseModel):
+    # Indices dans les tableaux de `bars`
+    from_: List[int] = Field(default_factory=list, alias="from")
+    to: List[int] = []
+
+    class Config:
+        populate_by_name = True
+
+
+class Timeline(BaseModel):
+    """Disposition Gantt en colonnes: la barre i est (bars.task_id[i], bars.start[i], ...).
+
+    `start`/`end` en heures depuis `origin`.
+    """
+
+    project_id: str
+    group_by: str
+    origin: datetime
+    unit: str = "hour"
+    lanes: TimelineLanes
+    bars: TimelineBars
+    edges: TimelineEdges
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+
+from app.models import AlertStatus, Priority
+
+
+def _rank(sev: Priority) -> int:
+    return {Priority.P0: 0, Priority.P1: 1, Priority.P2: 2, Priority.P3: 3}.get(sev, 3)
+
+
+@dataclass
+class AlertGroup:
+    key: tuple[str, ...]
+    title: str
+    severity: Priority
+    first_seen: datetime
+    last_seen: datetime
+    count: int = 0  # alertes distinctes repliées dans le groupe
+    firing: set[str] = field(default_factory=set)
+    resolved: bool = False
+
+    def as_dict(self, group_by: tuple[str, ...]) -> dict[str, Any]:
+        return {
+            "key": dict(zip(group_by, self.key)),
+            "title": self.title,
+            "severity": self.severity.value,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "count": self.count,
+            "firing": len(self.firing),
+            "resolved": self.resolved,
+        }
+
+
+@dataclass(frozen=True)
+class GroupTransition:
+    kind: str  # opened / escalated / resolved
+    group: AlertGroup
+
+    def message(self) -> str:
+        g = self.group
+        extra = f" (+{len(g.firing) - 1} similaires)" if len(g.firing) > 1 else ""
+        if self.kind == "resolved":
+            return f"[RESOLVED] {g.title} ({g.count} occurrences)"
+        if self.kind == "escalated":
+            return f"[{g.severity.value}] escalade: {g.title}{extra}"
+        return f"[{g.severity.value}] {g.title}{extra}"
+
+
+class AlertGrouper:
+    """Regroupe en mémoire les alertes ingérées pour limiter les notifications.
+
+    Clé de groupe configurable (`ALERT_GROUP_BY`, ex: "alertname,host"): "title"
+    désigne Alert.title, "host" le payload.host, toute autre clé un label
+    Alertmanager. Une alerte rejoint le groupe ouvert de même clé; un groupe
+    reste ouvert tant qu'il a des membres actifs ou une activité dans la
+    fenêtre `window_seconds`. Une notification n'est émise qu'à l'ouverture,
+    à l'escalade de sévérité et à la résolution complète d'un groupe.
+
+    État par processus: avec plusieurs workers, chacun regroupe ce qu'il reçoit.
+    """
+
+    def __init__(
+        self,
+        group_by: Iterable[str] = ("alertname",),
+        window_seconds: float = 300.0,
+        stale_seconds: float = 86400.0,
+    ) -> None:
+        self.group_by = tuple(group_by)
+        self.window = timedelta(seconds=window_seconds)
+        self.stale = timedelta(seconds=stale_seconds)
+        self._groups: dict[tuple[str, ...], AlertGroup] = {}
+
+    def _field(self, row: dict[str, Any], name: str) -> str:
+        payload = row.get("payload") or {}
+        if name == "title":
+            return str(row.get("title") or "")
+        if name == "host":
+            return str(payload.get("host") or "")
+        return str((payload.get("labels") or {}).get(name) or "")
+
+    def group_key(self, row: dict[str, Any]) -> tuple[str, ...]:
+        return tuple(self._field(row, f) for f in self.group_by)
+
+    def _is_open(self, group: AlertGroup, now: datetime) -> bool:
+        if group.resolved:
+            return False
+        return bool(group.firing) or now - group.last_seen <= self.window
+
+    def observe(self, rows: Iterable[dict[str, Any]], now: Optional[datetime] = None) -> list[GroupTransition]:
+        """Intègre un lot d'alertes (lignes d'ingestion) et retourne les transitions de groupe."""
+        now = now or datetime.utcnow()
+        self.prune(now)
+        touched: dict[tuple[str, ...], Optional[str]] = {}
+
+        for row in rows:
+            key = self.group_key(row)
+            fp = row.get("fingerprint") or row.get("id")
+            firing = row.get("status") == AlertStatus.OPEN
+            sev = row.get("severity") or Priority.P3
+            group = self._groups.get(key)
+
+            if group is None or not self._is_open(group, now):
+                if not firing:
+                    continue
+                group = AlertGroup(key=key, title=row.get("title") or "alert", severity=sev, first_seen=now, last_seen=now)
+                self._groups[key] = group
+                touched[key] = "opened"
+            elif firing and _rank(sev) < _rank(group.severity):
+                group.severity = sev
+                if touched.get(key) != "opened":
+                    touched[key] = "escalated"
+            else:
+                touched.setdefault(key, None)
+
+            group.last_seen = now
+            if firing:
+                if fp not in group.firing:
+                    group.count += 1
+                group.firing.add(fp)
+            else:
+                group.firing.discard(fp)
+
+        transitions: list[GroupTransition] = []
+        for key, kind in touched.items():
+            group = self._groups[key]
+            if not group.firing and group.count:
+                if kind == "opened":
+                    # Ouvert puis résolu dans le même lot: rien à signaler
+                    group.resolved = True
+                    continue
+                group.resolved = True
+                transitions.append(GroupTransition("resolved", group))
+            elif kind:
+                transitions.append(GroupTransition(kind, group))
+        return transitions
+
+    def prune(self, now: Optional[datetime] = None) -> None:
+        now = now or datetime.utcnow()
+        for key in [k for k, g in self._groups.items() if now - g.last_seen > (self.window if not g.firing else self.stale)]:
+            del self._groups[key]
+
+    def groups(self) -> list[dict[str, Any]]:
+        now = datetime.utcnow()
+        return [g.as_dict(self.group_by) for g in self._groups.values() if self._is_open(g, now)]
+
+
+grouper = AlertGrouper(
+    group_by=[f.strip() for f in os.getenv("ALERT_GROUP_BY", "alertname").split(",") if f.strip()],
+    window_seconds=float(os.getenv("ALERT_GROUP_WINDOW_SECONDS", "300")),
+)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import case, null
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Alert, AlertSource, AlertStatus, Priority
+from app.v2.services.upsert import UPSERT_CHUNK, insert_for
+
+_SEVERITY_MAP = {
+    "critical": Priority.P0,
+    "page": Priority.P0,
+    "high": Priority.P1,
+    "error": Priority.P1,
+    "major": Priority.P1,
+    "warning": Priority.P2,
+    "minor": Priority.P2,
+    "info": Priority.P3,
+    "none": Priority.P3,
+}
+
+_FRACTION_RE = re.compile(r"(\.\d{6})\d+")
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    """RFC3339 Alertmanager -> datetime UTC naïf (convention du repo). "0001-..." = non défini."""
+    if not value or value.startswith("0001-"):
+        return None
+    try:
+        raw = _FRACTION_RE.sub(r"\1", value.replace("Z", "+00:00"))
+        dt = datetime.fromisoformat(raw)
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _severity(labels: dict[str, Any]) -> Priority:
+    raw = str(labels.get("severity") or labels.get("priority") or "").strip()
+    if raw.upper() in Priority.__members__:
+        return Priority(raw.upper())
+    return _SEVERITY_MAP.get(raw.lower(), Priority.P3)
+
+
+def _fingerprint(alert: dict[str, Any]) -> str:
+    fp = alert.get("fingerprint")
+    if fp:
+        return str(fp)
+    labels = alert.get("labels") or {}
+    return hashlib.sha256(json.dumps(labels, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def parse_alertmanager(body: dict[str, Any]) -> list[dict[str, Any]]:
+    """Payload webhook Alertmanager (groupé) -> lignes `alerts` prêtes pour l'upsert.
+
+    Dédoublonné par empreinte (la dernière occurrence gagne): un même
+    INSERT ... ON CONFLICT ne peut pas toucher deux fois la même ligne.
+    """
+    common_labels = body.get("commonLabels") or {}
+    common_annotations = body.get("commonAnnotations") or {}
+    now = datetime.utcnow()
+
+    rows: dict[str, dict[str, Any]] = {}
+    for a in body.get("alerts") or []:
+        labels = {**common_labels, **(a.get("labels") or {})}
+        annotations = {**common_annotations, **(a.get("annotations") or {})}
+        firing = (a.get("status") or body.get("status") or "firing") != "resolved"
+        name = labels.get("alertname") or "alert"
+        instance = labels.get("instance") or labels.get("host")
+        title = annotations.get("summary") or (f"{name} on {instance}" if instance else name)
+        starts_at = _parse_ts(a.get("startsAt")) or now
+        fp = _fingerprint(a)
+        rows[fp] = {
+            "id": str(uuid.uuid4()),
+            "fingerprint": fp,
+            "title": str(title)[:200],
+            "severity": _severity(labels),
+            "status": AlertStatus.OPEN if firing else AlertStatus.RESOLVED,
+            "source": AlertSource.PROMETHEUS,
+            "payload": {
+                "labels": labels,
+                "annotations": annotations,
+                "generator_url": a.get("generatorURL"),
+                "starts_at": a.get("startsAt"),
+                "ends_at": a.get("endsAt"),
+                "host": instance,
+            },
+            "created_at": starts_at,
+            "resolved_at": None if firing else (_parse_ts(a.get("endsAt")) or now),
+            "muted": False,
+            "muted_by": None,
+        }
+    return list(rows.values())
+
+
+async def upsert_alerts(db: AsyncSession, rows: list[dict[str, Any]]) -> int:
+    """Upsert firing/resolved par empreinte: un INSERT ... ON CONFLICT par lot de
+    `UPSERT_CHUNK` lignes, le tout dans la transaction de l'appelant (pas de commit).
+    """
+    if not rows:
+        return 0
+    insert = insert_for(db)
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        stmt = insert(Alert).values(rows[i : i + UPSERT_CHUNK])
+        excluded = stmt.excluded
+        reopened = (Alert.status == AlertStatus.RESOLVED) & (excluded.status == AlertStatus.OPEN)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Alert.fingerprint],
+            set_={
+                "title": excluded.title,
+                "severity": excluded.severity,
+                "status": excluded.status,
+                "payload": excluded.payload,
+                "resolved_at": excluded.resolved_at,
+                "muted": excluded.muted,
+                "muted_by": excluded.muted_by,
+                # Payload neuf (non compressé): l'alerte redevient "chaude" pour la rétention
+                "compacted_at": null(),
+                "resolved_by": case((excluded.status == AlertStatus.OPEN, null()), else_=Alert.resolved_by),
+                # Une alerte résolue qui se redéclenche repart d'une nouvelle occurrence
+                "created_at": case((reopened, excluded.created_at), else_=Alert.created_at),
+            },
+        )
+        await db.execute(stmt)
+    return len(rows)
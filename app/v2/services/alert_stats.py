@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Alert, AlertStatsHourly, AlertStatus
+from app.v2.services.upsert import UPSERT_CHUNK, insert_for
+
+_Key = tuple[datetime, str, str]
+
+
+def hour_bucket(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def _value(v: Any) -> str:
+    return str(getattr(v, "value", v))
+
+
+class StatsDelta:
+    """Accumulateur de deltas (opened / resolved / durée) par (heure, source, sévérité)."""
+
+    def __init__(self) -> None:
+        self._acc: dict[_Key, list[float]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._acc)
+
+    def _slot(self, at: datetime, source: Any, severity: Any) -> list[float]:
+        return self._acc.setdefault((hour_bucket(at), _value(source), _value(severity)), [0, 0, 0.0])
+
+    def opened(self, at: Optional[datetime], source: Any, severity: Any) -> None:
+        self._slot(at or datetime.utcnow(), source, severity)[0] += 1
+
+    def resolved(self, created_at: Optional[datetime], resolved_at: Optional[datetime], source: Any, severity: Any) -> None:
+        resolved_at = resolved_at or datetime.utcnow()
+        slot = self._slot(resolved_at, source, severity)
+        slot[1] += 1
+        if created_at:
+            slot[2] += max(0.0, (resolved_at - created_at).total_seconds())
+
+    def rows(self) -> list[dict[str, Any]]:
+        return [
+            {"bucket": b, "source": src, "severity": sev, "opened": int(o), "resolved": int(r), "resolve_seconds": float(s)}
+            for (b, src, sev), (o, r, s) in self._acc.items()
+        ]
+
+
+async def apply_delta(db: AsyncSession, delta: StatsDelta) -> None:
+    """Ajoute les deltas aux rollups (INSERT ... ON CONFLICT additif), sans commit."""
+    rows = delta.rows()
+    if not rows:
+        return
+    insert = insert_for(db)
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        stmt = insert(AlertStatsHourly).values(rows[i : i + UPSERT_CHUNK])
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AlertStatsHourly.bucket, AlertStatsHourly.source, AlertStatsHourly.severity],
+            set_={
+                "opened": AlertStatsHourly.opened + excluded.opened,
+                "resolved": AlertStatsHourly.resolved + excluded.resolved,
+                "resolve_seconds": AlertStatsHourly.resolve_seconds + excluded.resolve_seconds,
+            },
+        )
+        await db.execute(stmt)
+
+
+async def record_opened(db: AsyncSession, alert: Alert) -> None:
+    delta = StatsDelta()
+    delta.opened(alert.created_at, alert.source, alert.severity)
+    await apply_delta(db, delta)
+
+
+async def record_resolved(db: AsyncSession, alert: Alert) -> None:
+    delta = StatsDelta()
+    delta.resolved(alert.created_at, alert.resolved_at, alert.source, alert.severity)
+    await apply_delta(db, delta)
+
+
+async def ingest_delta(db: AsyncSession, rows: list[dict[str, Any]]) -> StatsDelta:
+    """Transitions d'un lot d'ingestion, à calculer AVANT l'upsert.
+
+    Une requête par lot (état courant par empreinte), pas une par alerte:
+    nouvelle alerte -> opened (+ resolved si elle arrive déjà résolue),
+    résolue -> firing -> opened, ouverte -> résolue -> resolved.
+    """
+    delta = StatsDelta()
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        chunk = rows[i : i + UPSERT_CHUNK]
+        res = await db.execute(
+            select(Alert.fingerprint, Alert.status, Alert.created_at).where(
+                Alert.fingerprint.in_([r["fingerprint"] for r in chunk])
+            )
+        )
+        current = {fp: (st, created) for fp, st, created in res.all()}
+        for r in chunk:
+            firing = r["status"] == AlertStatus.OPEN
+            prev = current.get(r["fingerprint"])
+            if prev is None:
+                delta.opened(r["created_at"], r["source"], r["severity"])
+                if not firing:
+                    delta.resolved(r["created_at"], r["resolved_at"], r["source"], r["severity"])
+            elif prev[0] == AlertStatus.RESOLVED and firing:
+                delta.opened(r["created_at"], r["source"], r["severity"])
+            elif prev[0] != AlertStatus.RESOLVED and not firing:
+                delta.resolved(prev[1], r["resolved_at"], r["source"], r["severity"])
+    return delta
+
+
+async def rebuild_alert_stats(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Reconstruit les rollups depuis `alerts` si la table est vide (premier démarrage).
+
+    Basé sur l'état courant: les cycles résolu/ré-ouvert antérieurs ne sont pas
+    connus, seule la dernière occurrence de chaque alerte est comptée.
+    """
+    if (await db.execute(select(AlertStatsHourly.bucket).limit(1))).first() is not None:
+        return 0
+    counted = 0
+    last_id = ""
+    while True:
+        res = await db.execute(
+            select(Alert.id, Alert.created_at, Alert.resolved_at, Alert.status, Alert.source, Alert.severity)
+            .where(Alert.id > last_id)
+            .order_by(Alert.id.asc())
+            .limit(batch_size)
+        )
+        batch = res.all()
+        if not batch:
+            break
+        delta = StatsDelta()
+        for _, created_at, resolved_at, st, source, severity in batch:
+            delta.opened(created_at, source, severity)
+            if st == AlertStatus.RESOLVED:
+                delta.resolved(created_at, resolved_at, source, severity)
+        await apply_delta(db, delta)
+        counted += len(batch)
+        last_id = batch[-1][0]
+    await db.commit()
+    return counted
+
+
+async def alert_stats(db: AsyncSession, start: datetime, end: datetime) -> dict[str, Any]:
+    """Agrégats SQL sur les rollups horaires (granularité: l'heure) + ouverts courants."""
+    start_b = hour_bucket(start)
+    in_range = (AlertStatsHourly.bucket >= start_b) & (AlertStatsHourly.bucket < end)
+
+    by_sev = await db.execute(
+        select(
+            AlertStatsHourly.severity,
+            func.sum(AlertStatsHourly.opened),
+            func.sum(AlertStatsHourly.resolved),
+            func.sum(AlertStatsHourly.resolve_seconds),
+        )
+        .where(in_range)
+        .group_by(AlertStatsHourly.severity)
+    )
+    opened = resolved = 0
+    seconds = 0.0
+    mttr_by_severity: dict[str, Optional[float]] = {}
+    for sev, o, r, s in by_sev.all():
+        opened += int(o or 0)
+        resolved += int(r or 0)
+        seconds += float(s or 0.0)
+        mttr_by_severity[sev] = (float(s or 0.0) / r) if r else None
+
+    day = func.date(AlertStatsHourly.bucket)
+    per_day = await db.execute(
+        select(day, AlertStatsHourly.source, func.sum(AlertStatsHourly.opened))
+        .where(in_range)
+        .group_by(day, AlertStatsHourly.source)
+        .order_by(day, AlertStatsHourly.source)
+    )
+
+    # État courant: index (status, severity)
+    open_res = await db.execute(
+        select(Alert.severity, func.count()).where(Alert.status == AlertStatus.OPEN).group_by(Alert.severity)
+    )
+
+    return {
+        "start": start_b,
+        "end": end,
+        "opened": opened,
+        "resolved": resolved,
+        "mttr_seconds": (seconds / resolved) if resolved else None,
+        "mttr_by_severity": mttr_by_severity,
+        "open_by_severity": {_value(sev): int(n) for sev, n in open_res.all()},
+        "per_source_per_day": [
+            {"day": str(d), "source": src, "count": int(n or 0)} for d, src, n in per_day.all() if n
+        ],
+    }
+
+
+def _naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is not None and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def default_range(start: Optional[datetime], end: Optional[datetime], days: int = 7) -> tuple[datetime, datetime]:
+    end = _naive_utc(end) or datetime.utcnow()
+    return (_naive_utc(start) or end - timedelta(days=days)), end
@@ -1,9 +1,41 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime
 from typing import Any, Optional
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+import app.database as database
 from app.models import AuditLog, User
+from app.v2.services.audit_diff import apply_diff, decode_diff, encode_diff, make_diff
+
+logger = logging.getLogger(__name__)
+
+
+def _audit_row(
+    actor: Optional[User],
+    action: str,
+    entity_type: str,
+    entity_id: str,
+    before: Any = None,
+    after: Any = None,
+) -> dict[str, Any]:
+    # Diff calculé une seule fois à l'écriture; pas d'instantanés complets.
+    return {
+        "id": str(uuid.uuid4()),
+        "actor_id": (actor.id if actor else None),
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "before": None,
+        "after": None,
+        "diff": encode_diff(make_diff(before, after)),
+        "created_at": datetime.utcnow(),
+    }
 
 
 async def write_audit(
@@ -15,13 +47,162 @@ async def write_audit(
     before: Any = None,
     after: Any = None,
 ) -> None:
-    entry = AuditLog(
-        actor_id=(actor.id if actor else None),
-        action=action,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        before=before,
-        after=after,
+    """Ajoute l'entrée d'audit à la transaction de l'appelant (pas de commit).
+
+    À appeler avant le `db.commit()` du changement audité: l'entrée part
+    dans le même INSERT batch / fsync que la modification elle-même.
+    """
+    db.add(AuditLog(**_audit_row(actor, action, entity_type, entity_id, before, after)))
+
+
+async def write_audit_many(
+    db: AsyncSession,
+    actor: Optional[User],
+    action: str,
+    entity_type: str,
+    entries: list[tuple[str, Any, Any]],
+) -> None:
+    """Variante lot de `write_audit`: un seul INSERT multi-lignes pour
+    `entries` = [(entity_id, before, after), ...], dans la transaction de l'appelant.
+    """
+    if entries:
+        await db.execute(
+            insert(AuditLog), [_audit_row(actor, action, entity_type, eid, before, after) for eid, before, after in entries]
+        )
+
+
+class AuditBuffer:
+    """Buffer en mémoire pour les audits hors transaction.
+
+    Utilisé quand le changement est déjà committé par une couche CRUD.
+    Les entrées sont insérées par lot (`INSERT ... VALUES` multi-lignes)
+    toutes les `flush_interval_ms` ou dès `max_rows` entrées. La file est
+    bornée: si elle est pleine, `enqueue` attend (backpressure).
+    Sans worker démarré (tests, scripts), l'écriture est immédiate.
+    """
+
+    def __init__(self, max_rows: int = 500, flush_interval_ms: int = 200, max_queue: int = 10000) -> None:
+        self.max_rows = max_rows
+        self.flush_interval_ms = flush_interval_ms
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def enqueue(self, row: dict[str, Any]) -> None:
+        if self._task is None or self._queue is None:
+            await self._insert([row])
+            return
+        await self._queue.put(row)
+
+    async def _insert(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        try:
+            async with database.SessionLocal() as db:
+                await db.execute(insert(AuditLog), rows)
+                await db.commit()
+        except Exception:
+            logger.exception("audit flush failed (%d entries dropped)", len(rows))
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        interval = self.flush_interval_ms / 1000
+        while True:
+            row = await queue.get()
+            if row is None:
+                break
+            batch = [row]
+            stop = False
+            deadline = asyncio.get_running_loop().time() + interval
+            while len(batch) < self.max_rows:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    nxt = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            await self._insert(batch)
+            if stop:
+                break
+
+        # Flush final: tout ce qui reste dans la file
+        rest = []
+        while not queue.empty():
+            row = queue.get_nowait()
+            if row is not None:
+                rest.append(row)
+        for i in range(0, len(rest), self.max_rows):
+            await self._insert(rest[i : i + self.max_rows])
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run(self._queue))
+
+    async def stop(self) -> None:
+        """Vide la file puis arrête le worker (appelé par main.lifespan)."""
+        if self._task is None or self._queue is None:
+            return
+        task, queue = self._task, self._queue
+        # Les appels suivants écrivent directement
+        self._task = None
+        self._queue = None
+        await queue.put(None)
+        await task
+
+
+audit_buffer = AuditBuffer(
+    max_rows=int(os.getenv("AUDIT_FLUSH_MAX_ROWS", "500")),
+    flush_interval_ms=int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "200")),
+    max_queue=int(os.getenv("AUDIT_QUEUE_MAX", "10000")),
+)
+
+
+async def enqueue_audit(
+    actor: Optional[User],
+    action: str,
+    entity_type: str,
+    entity_id: str,
+    before: Any = None,
+    after: Any = None,
+) -> None:
+    """Audit hors transaction, via le buffer (pour les changements déjà committés)."""
+    await audit_buffer.enqueue(_audit_row(actor, action, entity_type, entity_id, before, after))
+
+
+def entry_diff(entry: AuditLog) -> list[dict[str, Any]]:
+    """Diff décompressé d'une entrée (calculé à la volée pour les lignes historiques)."""
+    if entry.diff is not None:
+        return decode_diff(entry.diff)
+    return make_diff(entry.before, entry.after)
+
+
+async def entity_states(db: AsyncSession, entity_type: str, entity_id: str) -> list[dict[str, Any]]:
+    """Reconstruit l'état audité d'une entité après chaque entrée (rejeu des diffs)."""
+    res = await db.execute(
+        select(AuditLog)
+        .where(AuditLog.entity_type == entity_type, AuditLog.entity_id == entity_id)
+        .order_by(AuditLog.created_at.asc(), AuditLog.id.asc())
     )
-    db.add(entry)
-    await db.commit()
+    states: list[dict[str, Any]] = []
+    state: Any = None
+    for entry in res.scalars().all():
+        if entry.diff is None and entry.after is not None:
+            # Ligne historique: instantané partiel, fusionné dans l'état courant
+            state = {**(state or {}), **entry.after} if isinstance(entry.after, dict) else entry.after
+        else:
+            state = apply_diff(state, entry_diff(entry))
+        states.append(
+            {
+                "id": entry.id,
+                "action": entry.action,
+                "actor_id": entry.actor_id,
+                "created_at": entry.created_at,
+                "state": state,
+            }
+        )
+    return states
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import base64
+import copy
+import json
+import os
+import zlib
+from typing import Any
+
+# Diff "à la JSON Patch" (RFC 6902) stocké dans AuditLog.diff.
+# Chaque op garde aussi l'ancienne valeur ("old") pour être réversible:
+#   {"op": "add", "path": "/a/0", "value": ...}
+#   {"op": "remove", "path": "/a/0", "old": ...}
+#   {"op": "replace", "path": "/a", "value": ..., "old": ...}
+# Les valeurs volumineuses sont compressées: {"$z": "<base64(zlib(json))>"}.
+
+COMPRESS_MIN_BYTES = int(os.getenv("AUDIT_COMPRESS_MIN_BYTES", "1024"))
+# Au-delà, on ne cherche pas de décalage dans les listes (remplacement complet).
+_MAX_LIST_SHIFT_SCAN = 200
+
+
+def _escape(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _split(path: str) -> list[str]:
+    if not path:
+        return []
+    return [_unescape(t) for t in path.split("/")[1:]]
+
+
+def make_diff(before: Any, after: Any, path: str = "") -> list[dict[str, Any]]:
+    if before == after:
+        return []
+    if before is None and path == "":
+        return [{"op": "add", "path": "", "value": after}]
+    if after is None and path == "":
+        return [{"op": "remove", "path": "", "old": before}]
+
+    if isinstance(before, dict) and isinstance(after, dict):
+        ops: list[dict[str, Any]] = []
+        for k in before:
+            if k not in after:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(str(k))}", "old": before[k]})
+        for k, v in after.items():
+            p = f"{path}/{_escape(str(k))}"
+            if k not in before:
+                ops.append({"op": "add", "path": p, "value": v})
+            else:
+                ops.extend(make_diff(before[k], v, p))
+        return ops
+
+    if isinstance(before, list) and isinstance(after, list):
+        if len(before) <= _MAX_LIST_SHIFT_SCAN:
+            # Ajout en fin et/ou éléments retirés en tête (ex: historique borné à N entrées)
+            n = len(before)
+            for i in range(n + 1):
+                if n - i <= len(after) and before[i:] == after[: n - i]:
+                    ops = [{"op": "remove", "path": f"{path}/0", "old": before[j]} for j in range(i)]
+                    ops.extend({"op": "add", "path": f"{path}/-", "value": v} for v in after[n - i :])
+                    return ops
+        if len(before) == len(after):
+            ops = []
+            for i, (a, b) in enumerate(zip(before, after)):
+                ops.extend(make_diff(a, b, f"{path}/{i}"))
+            return ops
+
+    return [{"op": "replace", "path": path, "value": after, "old": before}]
+
+
+def compress_json(value: Any, min_bytes: int = 0) -> Any:
+    """Valeur JSON -> {"$z": ...} si sa forme sérialisée fait au moins `min_bytes` octets."""
+    if is_compressed(value):
+        return value
+    raw = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    if len(raw) < min_bytes:
+        return value
+    return {"$z": base64.b64encode(zlib.compress(raw, 6)).decode("ascii")}
+
+
+def is_compressed(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and "$z" in value
+
+
+def expand_json(value: Any) -> Any:
+    if is_compressed(value):
+        return json.loads(zlib.decompress(base64.b64decode(value["$z"])).decode("utf-8"))
+    return value
+
+
+def _encode_value(value: Any) -> Any:
+    return compress_json(value, COMPRESS_MIN_BYTES)
+
+
+def _decode_value(value: Any) -> Any:
+    return expand_json(value)
+
+
+def encode_diff(ops: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    out = []
+    for op in ops:
+        op = dict(op)
+        for key in ("value", "old"):
+            if key in op:
+                op[key] = _encode_value(op[key])
+        out.append(op)
+    return out
+
+
+def decode_diff(ops: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    out = []
+    for op in ops or []:
+        op = dict(op)
+        for key in ("value", "old"):
+            if key in op:
+                op[key] = _decode_value(op[key])
+        out.append(op)
+    return out
+
+
+def _parent(doc: Any, tokens: list[str]) -> Any:
+    cur = doc
+    for t in tokens[:-1]:
+        if isinstance(cur, list):
+            cur = cur[int(t)]
+        else:
+            if not isinstance(cur.get(t), (dict, list)):
+                cur[t] = {}
+            cur = cur[t]
+    return cur
+
+
+def _set(doc: Any, path: str, value: Any, insert: bool) -> Any:
+    tokens = _split(path)
+    if not tokens:
+        return copy.deepcopy(value)
+    if doc is None:
+        doc = {}
+    parent = _parent(doc, tokens)
+    last = tokens[-1]
+    if isinstance(parent, list):
+        if last == "-":
+            parent.append(copy.deepcopy(value))
+        elif insert:
+            parent.insert(int(last), copy.deepcopy(value))
+        else:
+            parent[int(last)] = copy.deepcopy(value)
+    else:
+        parent[last] = copy.deepcopy(value)
+    return doc
+
+
+def _remove(doc: Any, path: str) -> Any:
+    tokens = _split(path)
+    if not tokens:
+        return None
+    if doc is None:
+        return doc
+    parent = _parent(doc, tokens)
+    last = tokens[-1]
+    if isinstance(parent, list):
+        if parent:
+            parent.pop(-1 if last == "-" else int(last))
+    else:
+        parent.pop(last, None)
+    return doc
+
+
+def apply_diff(doc: Any, ops: list[dict[str, Any]]) -> Any:
+    """Applique le diff (sens avant). Tolérant aux conteneurs manquants."""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        if op["op"] == "add":
+            doc = _set(doc, op["path"], op.get("value"), insert=True)
+        elif op["op"] == "replace":
+            doc = _set(doc, op["path"], op.get("value"), insert=False)
+        elif op["op"] == "remove":
+            doc = _remove(doc, op["path"])
+    return doc
+
+
+def revert_diff(doc: Any, ops: list[dict[str, Any]]) -> Any:
+    """Annule le diff (sens arrière) grâce aux valeurs "old"."""
+    doc = copy.deepcopy(doc)
+    for op in reversed(ops):
+        if op["op"] == "add":
+            doc = _remove(doc, op["path"])
+        elif op["op"] == "replace":
+            doc = _set(doc, op["path"], op.get("old"), insert=False)
+        elif op["op"] == "remove":
+            doc = _set(doc, op["path"], op.get("old"), insert=True)
+    return doc
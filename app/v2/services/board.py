@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models import Task, TaskStatus
+from app.v2.services.pagination import decode_cursor, encode_cursor
+
+COLUMNS = (TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.DONE)
+
+
+def _scope(project_id: str, sprint_id: Optional[str]) -> list:
+    conds = [Task.project_id == project_id]
+    if sprint_id:
+        conds.append(Task.sprint_id == sprint_id)
+    return conds
+
+
+def _page(rows: list[Task], limit: int) -> tuple[list[Task], Optional[str]]:
+    # limit+1 lignes lues: la dernière ne sert qu'à savoir s'il reste une page
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].rank, rows[-1].id)
+    return rows, None
+
+
+async def board(db: AsyncSession, project_id: str, sprint_id: Optional[str], limit: int) -> dict[str, Any]:
+    """Compteurs par colonne + les `limit` premières tâches de chaque colonne (ordre des rangs).
+
+    Deux requêtes quelle que soit la taille du projet: un GROUP BY status pour
+    les compteurs, et une fenêtre ROW_NUMBER() OVER (PARTITION BY status ORDER BY
+    rank) qui ne garde que `limit + 1` lignes par colonne.
+    """
+    conds = _scope(project_id, sprint_id)
+    res = await db.execute(select(Task.status, func.count()).where(*conds).group_by(Task.status))
+    counts = {st: int(n) for st, n in res.all()}
+
+    rn = func.row_number().over(partition_by=Task.status, order_by=(Task.rank.asc(), Task.id.asc())).label("rn")
+    window = select(Task, rn).where(*conds).subquery()
+    t = aliased(Task, window)
+    res = await db.execute(select(t).where(window.c.rn <= limit + 1).order_by(t.status, window.c.rn))
+    by_status: dict[TaskStatus, list[Task]] = {st: [] for st in COLUMNS}
+    for task in res.scalars().all():
+        by_status.setdefault(task.status, []).append(task)
+
+    columns = []
+    for st in COLUMNS:
+        tasks, next_cursor = _page(by_status[st], limit)
+        columns.append({"status": st.value, "count": counts.get(st, 0), "tasks": tasks, "next_cursor": next_cursor})
+    return {"project_id": project_id, "sprint_id": sprint_id, "columns": columns}
+
+
+async def column_page(
+    db: AsyncSession,
+    project_id: str,
+    sprint_id: Optional[str],
+    status: TaskStatus,
+    cursor: Optional[str],
+    limit: int,
+) -> dict[str, Any]:
+    """Page suivante d'une colonne ("charger plus"): keyset sur (rank, id) via l'index de rangs."""
+    q = select(Task).where(*_scope(project_id, sprint_id), Task.status == status)
+    if cursor:
+        c_rank, c_id = decode_cursor(cursor, 2)
+        q = q.where(or_(Task.rank > c_rank, and_(Task.rank == c_rank, Task.id > c_id)))
+    res = await db.execute(q.order_by(Task.rank.asc(), Task.id.asc()).limit(limit + 1))
+    tasks, next_cursor = _page(list(res.scalars().all()), limit)
+    return {"status": status.value, "tasks": tasks, "next_cursor": next_cursor}
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Sprint, SprintSnapshotDaily, Task, TaskStatus
+from app.v2.services.upsert import insert_for
+
+COLS = ("scope_hours", "scope_tasks", "remaining_hours", "remaining_tasks")
+
+
+def _day(dt: Optional[datetime] = None) -> datetime:
+    return (dt or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _contribution(state: Optional[dict[str, Any]]) -> Optional[tuple[str, list[float]]]:
+    """Poids d'une tâche dans le snapshot de son sprint: (sprint_id, [scope_h, scope_n, rem_h, rem_n])."""
+    if not state or not state.get("sprint_id"):
+        return None
+    hours = float(state.get("estimate_hours") or 0.0)
+    open_ = state.get("status") not in (TaskStatus.DONE, TaskStatus.DONE.value)
+    return state["sprint_id"], [hours, 1, hours if open_ else 0.0, 1 if open_ else 0]
+
+
+class SnapshotDelta:
+    """Variations des snapshots par sprint pour une transaction (avant -> après)."""
+
+    def __init__(self) -> None:
+        self.sprints: dict[str, list[float]] = defaultdict(lambda: [0.0, 0, 0.0, 0])
+
+    def change(self, before: Optional[dict[str, Any]], after: Optional[dict[str, Any]]) -> None:
+        for state, sign in ((before, -1), (after, 1)):
+            c = _contribution(state)
+            if c is not None:
+                acc = self.sprints[c[0]]
+                for i, v in enumerate(c[1]):
+                    acc[i] += sign * v
+
+    def __bool__(self) -> bool:
+        return any(any(v) for v in self.sprints.values())
+
+
+def task_state(task: Task) -> dict[str, Any]:
+    return {"sprint_id": task.sprint_id, "estimate_hours": task.estimate_hours, "status": task.status}
+
+
+async def _current_totals(db: AsyncSession, sprint_id: str) -> list[float]:
+    open_ = Task.status != TaskStatus.DONE
+    hours = func.coalesce(Task.estimate_hours, 0.0)
+    res = await db.execute(
+        select(
+            func.coalesce(func.sum(hours), 0.0),
+            func.count(Task.id),
+            func.coalesce(func.sum(case((open_, hours), else_=0.0)), 0.0),
+            func.coalesce(func.sum(case((open_, 1), else_=0)), 0),
+        ).where(Task.sprint_id == sprint_id)
+    )
+    h, n, rh, rn = res.one()
+    return [float(h), int(n), float(rh), int(rn)]
+
+
+async def apply_delta(db: AsyncSession, delta: SnapshotDelta, day: Optional[datetime] = None) -> None:
+    """Reporte `delta` sur le snapshot du jour de chaque sprint, sans commit.
+
+    Le changement de tâche doit déjà être flushé. Ligne du jour absente: elle part
+    du dernier snapshot antérieur (+ delta), ou, pour un sprint jamais suivi, de
+    l'agrégat courant de ses tâches (qui inclut déjà le changement).
+    Upsert additif: deux transactions concurrentes sur le même jour s'additionnent.
+    """
+    day = _day(day)
+    S = SprintSnapshotDaily
+    insert = insert_for(db)
+    for sprint_id, vals in delta.sprints.items():
+        if not any(vals):
+            continue
+        res = await db.execute(
+            select(*(getattr(S, c) for c in COLS), S.day)
+            .where(S.sprint_id == sprint_id, S.day <= day)
+            .order_by(S.day.desc())
+            .limit(1)
+        )
+        last = res.first()
+        if last is None:
+            base, add = await _current_totals(db, sprint_id), [0.0, 0, 0.0, 0]
+        elif last[-1] == day:
+            base, add = list(last[:-1]), vals
+        else:
+            base, add = [a + b for a, b in zip(last[:-1], vals)], vals
+        stmt = insert(S).values(sprint_id=sprint_id, day=day, **dict(zip(COLS, base)))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[S.sprint_id, S.day],
+            set_={c: getattr(S, c) + v for c, v in zip(COLS, add)},
+        )
+        await db.execute(stmt)
+
+
+async def record_task_change(db: AsyncSession, before: Optional[dict[str, Any]], after: Optional[dict[str, Any]]) -> None:
+    delta = SnapshotDelta()
+    delta.change(before, after)
+    if delta:
+        await apply_delta(db, delta)
+
+
+def _fill(rows: list[tuple], start: datetime, end: datetime) -> dict[str, list]:
+    """Série quotidienne [start, end] à partir de snapshots épars (report de la veille).
+
+    Avant le premier snapshot (sprint suivi en cours de route), on reprend ses valeurs.
+    """
+    out: dict[str, list] = {"day": [], **{c: [] for c in COLS}}
+    current = list(rows[0][1:]) if rows else [0.0, 0, 0.0, 0]
+    i = 0
+    d = start
+    while d <= end:
+        while i < len(rows) and rows[i][0] <= d:
+            current = list(rows[i][1:])
+            i += 1
+        out["day"].append(d.date().isoformat())
+        for c, v in zip(COLS, current):
+            out[c].append(v)
+        d += timedelta(days=1)
+    return out
+
+
+async def sprint_burndown(db: AsyncSession, sprint: Sprint, today: Optional[datetime] = None) -> dict[str, Any]:
+    """Burndown d'un sprint: une requête sur la clé primaire (sprint_id, day)."""
+    start, end = _day(sprint.start_date), _day(sprint.end_date)
+    S = SprintSnapshotDaily
+    res = await db.execute(
+        select(S.day, *(getattr(S, c) for c in COLS)).where(S.sprint_id == sprint.id, S.day <= end).order_by(S.day.asc())
+    )
+    series = _fill(list(res.all()), start, min(end, _day(today)) if start <= _day(today) else start)
+    days = (end - start).days or 1
+    committed = series["scope_hours"][0] if series["scope_hours"] else 0.0
+    series["ideal_hours"] = [
+        round(committed * max(0.0, 1 - i / days), 2) for i in range(len(series["day"]))
+    ]
+    return {"sprint_id": sprint.id, "start_date": sprint.start_date, "end_date": sprint.end_date, **series}
+
+
+async def project_velocity(db: AsyncSession, project_id: str, limit: int, today: Optional[datetime] = None) -> dict[str, Any]:
+    """Heures/tâches terminées par sprint clos: dernier snapshot <= fin de sprint.
+
+    Une seule requête: ROW_NUMBER() par sprint sur les snapshots (index PK), jointe aux sprints.
+    """
+    today = today or datetime.utcnow()
+    S = SprintSnapshotDaily
+    rn = func.row_number().over(partition_by=S.sprint_id, order_by=S.day.desc()).label("rn")
+    last = (
+        select(S.sprint_id, *(getattr(S, c) for c in COLS), rn)
+        .join(Sprint, and_(Sprint.id == S.sprint_id, S.day <= Sprint.end_date))
+        .where(Sprint.project_id == project_id, Sprint.end_date < today)
+        .subquery()
+    )
+    res = await db.execute(
+        select(Sprint.id, Sprint.name, Sprint.start_date, Sprint.end_date, *(last.c[c] for c in COLS))
+        .join(last, and_(last.c.sprint_id == Sprint.id, last.c.rn == 1))
+        .order_by(Sprint.end_date.desc())
+        .limit(limit)
+    )
+    sprints = []
+    for sid, name, start, end, scope_h, scope_n, rem_h, rem_n in res.all():
+        sprints.append(
+            {
+                "id": sid,
+                "name": name,
+                "start_date": start,
+                "end_date": end,
+                "committed_hours": float(scope_h),
+                "completed_hours": float(scope_h) - float(rem_h),
+                "completed_tasks": int(scope_n) - int(rem_n),
+            }
+        )
+    sprints.reverse()
+    avg = (sum(s["completed_hours"] for s in sprints) / len(sprints)) if sprints else None
+    return {"project_id": project_id, "sprints": sprints, "average_completed_hours": avg}
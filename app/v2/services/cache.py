@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class SingleFlightCache:
+    """Cache mémoire à TTL court avec coalescence des chargements (singleflight).
+
+    Pour une clé donnée, un seul `loader` s'exécute à la fois: les appels
+    concurrents attendent le même résultat. `invalidate()` incrémente une
+    génération et détache les chargements en cours: démarrés avant
+    l'invalidation, ils servent leurs appelants mais ne sont pas mis en cache,
+    et un appel ultérieur relance un chargement (lecture de ses écritures).
+    """
+
+    def __init__(self, ttl_seconds: float = 2.0, max_entries: int = 1024) -> None:
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._values: dict[Hashable, tuple[float, Any]] = {}
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self.loads = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        hit = self._values.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            return hit[1]
+
+        # Le chargement tourne dans sa propre tâche: l'annulation d'un appelant
+        # (client déconnecté), même le premier, n'atteint ni le loader ni les autres.
+        task = self._inflight.get(key)
+        if task is None:
+            self.loads += 1
+            task = asyncio.ensure_future(self._load(key, loader, self._generation))
+            task.add_done_callback(_consume_exception)
+            self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], generation: int) -> Any:
+        try:
+            value = await loader()
+            if generation == self._generation and self.ttl > 0:
+                if len(self._values) >= self.max_entries:
+                    self._values.clear()
+                self._values[key] = (time.monotonic() + self.ttl, value)
+            return value
+        finally:
+            if self._inflight.get(key) is asyncio.current_task():
+                del self._inflight[key]
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        self._generation += 1
+        if key is None:
+            self._values.clear()
+            self._inflight.clear()
+        else:
+            self._values.pop(key, None)
+            self._inflight.pop(key, None)
+
+
+def _consume_exception(task: asyncio.Future) -> None:
+    # Chargement en échec dont tous les appelants ont été annulés: pas d'avertissement
+    if not task.cancelled():
+        task.exception()
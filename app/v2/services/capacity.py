@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.database as database
+from app.models import CalendarEntry, CalendarEventType, Sprint, Task, TaskAssignee, User
+from app.v2.services.cache import SingleFlightCache
+from app.v2.services.events import bus
+from app.v2.services.maintenance import expand_entry
+from app.v2.services.timeline import HOURS_PER_DAY
+
+# Jours ouvrés (lundi=0): les week-ends ont une capacité nulle
+WORKDAYS = frozenset(range(5))
+
+
+def _days(start: datetime, end: datetime) -> list[datetime]:
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    out = []
+    while day <= end:
+        out.append(day)
+        day += timedelta(days=1)
+    return out
+
+
+def _subtract(row: list[float], origin: datetime, start: datetime, end: datetime) -> None:
+    """Retire un intervalle d'absence [start, end) de la ligne de capacité (heures par jour).
+
+    Seuls les jours touchés par l'intervalle sont visités; au plus HOURS_PER_DAY
+    par jour (une journée entière d'absence vide la journée).
+    """
+    first = max(0, (start - origin).days)
+    last = min(len(row) - 1, (end - timedelta(microseconds=1) - origin).days)
+    for i in range(first, last + 1):
+        day = origin + timedelta(days=i)
+        overlap = (min(end, day + timedelta(days=1)) - max(start, day)).total_seconds() / 3600
+        row[i] = max(0.0, row[i] - min(HOURS_PER_DAY, overlap))
+
+
+async def sprint_capacity(db: AsyncSession, sprint_id: str) -> Optional[dict[str, Any]]:
+    """Matrice de capacité assigné × jour d'un sprint, en colonnes.
+
+    Trois requêtes: le sprint, ses tâches avec leurs assignés (LEFT JOIN), puis
+    les absences (VACATION, RRULE développées) de ces assignés sur la période.
+    L'estimation d'une tâche à plusieurs assignés est répartie à parts égales.
+    """
+    sprint = (await db.execute(select(Sprint).where(Sprint.id == sprint_id))).scalar_one_or_none()
+    if sprint is None:
+        return None
+    days = _days(sprint.start_date, sprint.end_date)
+    origin = days[0] if days else sprint.start_date
+    window_end = origin + timedelta(days=len(days))
+
+    res = await db.execute(
+        select(Task.id, Task.estimate_hours, TaskAssignee.user_id)
+        .outerjoin(TaskAssignee, TaskAssignee.task_id == Task.id)
+        .where(Task.sprint_id == sprint_id)
+    )
+    owners: dict[str, list[str]] = defaultdict(list)
+    estimate: dict[str, float] = {}
+    for tid, hours, uid in res.all():
+        estimate[tid] = float(hours or 0.0)
+        if uid is not None:
+            owners[tid].append(uid)
+    assigned: dict[str, float] = defaultdict(float)
+    unassigned = 0.0
+    for tid, hours in estimate.items():
+        if owners[tid]:
+            for uid in owners[tid]:
+                assigned[uid] += hours / len(owners[tid])
+        else:
+            unassigned += hours
+
+    user_ids = list(assigned)
+    names: dict[str, str] = {}
+    rows = {uid: [HOURS_PER_DAY if d.weekday() in WORKDAYS else 0.0 for d in days] for uid in user_ids}
+    if user_ids:
+        res = await db.execute(select(User.id, User.first_name, User.last_name).where(User.id.in_(user_ids)))
+        names = {uid: f"{first} {last}" for uid, first, last in res.all()}
+        res = await db.execute(
+            select(CalendarEntry).where(
+                CalendarEntry.event_type == CalendarEventType.VACATION,
+                CalendarEntry.owner_id.in_(user_ids),
+                CalendarEntry.start < window_end,
+                or_(
+                    CalendarEntry.rrule.is_not(None),
+                    func.coalesce(CalendarEntry.end, CalendarEntry.start) >= origin - timedelta(days=1),
+                ),
+            )
+        )
+        for entry in res.scalars().all():
+            for start, end in expand_entry(entry, origin, window_end):
+                _subtract(rows[entry.owner_id], origin, start, end)
+
+    user_ids.sort(key=lambda u: names.get(u, u).lower())
+    available = [round(sum(rows[u]), 2) for u in user_ids]
+    assigned_hours = [round(assigned[u], 2) for u in user_ids]
+    return {
+        "sprint_id": sprint.id,
+        "days": [d.date().isoformat() for d in days],
+        "hours_per_day": HOURS_PER_DAY,
+        "assignees": {
+            "user_id": user_ids,
+            "name": [names.get(u, "") for u in user_ids],
+            "assigned_hours": assigned_hours,
+            "available_hours": available,
+            "balance_hours": [round(a - b, 2) for a, b in zip(available, assigned_hours)],
+        },
+        # available[i][j]: heures disponibles de l'assigné i le jour j
+        "available": [[round(h, 2) for h in rows[u]] for u in user_ids],
+        "unassigned_hours": round(unassigned, 2),
+    }
+
+
+cache = SingleFlightCache(ttl_seconds=float(os.getenv("CAPACITY_CACHE_SECONDS", "300")), max_entries=256)
+
+
+def _invalidate_on_change(event: dict[str, Any]) -> None:
+    # Estimations, assignés, statuts (tasks) et absences (calendar): les événements
+    # ne portent pas le sprint, on vide tout (recalcul à la demande, par sprint).
+    if event.get("topic") in ("tasks", "calendar"):
+        cache.invalidate()
+
+
+bus.add_listener(_invalidate_on_change)
+
+
+async def _load(sprint_id: str) -> Optional[dict[str, Any]]:
+    async with database.SessionLocal() as db:
+        return await sprint_capacity(db, sprint_id)
+
+
+async def capacity_for(sprint_id: str) -> Optional[dict[str, Any]]:
+    return await cache.get_or_load(("capacity", sprint_id), lambda: _load(sprint_id))
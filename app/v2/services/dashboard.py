@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.database as database
+from app.models import Alert, PipelineEvent, Task, TaskStatus, User
+from app.v2.schemas.alerts import AlertRead
+from app.v2.schemas.pipeline import PipelineStatus
+from app.v2.schemas.tasks import TaskRead
+from app.v2.services.cache import SingleFlightCache
+from app.v2.services.events import bus
+from app.v2.services.pipeline_ingest import latest_status
+
+TICKETS_LIMIT = 5
+TASKS_TODAY_LIMIT = 8
+
+
+async def recent_tickets(db: AsyncSession, limit: int) -> list[Alert]:
+    res = await db.execute(select(Alert).order_by(Alert.created_at.desc()).limit(limit))
+    return list(res.scalars().all())
+
+
+async def tasks_due_today(db: AsyncSession, limit: int) -> list[Task]:
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today_start + timedelta(days=1)
+
+    q = (
+        select(Task)
+        .where(Task.due_at.is_not(None))
+        .where(Task.due_at >= today_start)
+        .where(Task.due_at < tomorrow)
+        .order_by(Task.due_at.asc())
+        .limit(limit)
+    )
+    res = await db.execute(q)
+    rows = list(res.scalars().all())
+    if rows:
+        return rows
+
+    # Fallback (démo/dev): si rien n'est dû aujourd'hui, renvoyer des tâches récentes
+    q2 = (
+        select(Task)
+        .where(Task.status != TaskStatus.DONE)
+        .order_by(Task.updated_at.desc(), Task.created_at.desc())
+        .limit(limit)
+    )
+    res2 = await db.execute(q2)
+    return list(res2.scalars().all())
+
+
+async def latest_pipeline_status(db: AsyncSession) -> PipelineStatus:
+    hit = latest_status.newest()
+    if hit is not None:
+        return PipelineStatus(status=hit["status"], ref=hit["ref"], url=hit["url"], updated_at=hit["updated_at"])
+    res = await db.execute(select(PipelineEvent).order_by(PipelineEvent.created_at.desc()).limit(1))
+    ev = res.scalar_one_or_none()
+    if not ev:
+        return PipelineStatus(status="unknown")
+    return PipelineStatus(status=ev.status, ref=ev.ref, url=ev.url, updated_at=ev.created_at)
+
+
+def visibility_scope(user: User) -> str:
+    """Clé de cache: ce qu'un utilisateur peut voir sur le dashboard.
+
+    Aujourd'hui tous les rôles voient les mêmes données; la clé reste
+    par rôle pour ne pas partager un résultat si cela change.
+    """
+    return getattr(user.role, "value", str(user.role))
+
+
+async def _in_session(fn, *args) -> Any:
+    # Une session par requête: une AsyncSession ne supporte pas d'opérations concurrentes
+    async with database.SessionLocal() as db:
+        return await fn(db, *args)
+
+
+async def _load_dashboard() -> dict[str, Any]:
+    tickets, tasks, pipeline = await asyncio.gather(
+        _in_session(recent_tickets, TICKETS_LIMIT),
+        _in_session(tasks_due_today, TASKS_TODAY_LIMIT),
+        _in_session(latest_pipeline_status),
+    )
+    return {
+        "tickets": [AlertRead.model_validate(a) for a in tickets],
+        "tasks_today": [TaskRead.model_validate(t) for t in tasks],
+        "pipeline": pipeline,
+        "generated_at": datetime.utcnow(),
+    }
+
+
+cache = SingleFlightCache(ttl_seconds=float(os.getenv("DASHBOARD_CACHE_SECONDS", "2")))
+
+
+def _invalidate_on_change(event: dict[str, Any]) -> None:
+    if event.get("topic") in ("tickets", "tasks", "pipeline"):
+        cache.invalidate()
+
+
+bus.add_listener(_invalidate_on_change)
+
+
+async def dashboard_for(user: User) -> dict[str, Any]:
+    return await cache.get_or_load(("dashboard", visibility_scope(user)), _load_dashboard)
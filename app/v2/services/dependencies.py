@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Project, Task, TaskDependency, TaskStatus
+from app.v2.services.events import bus
+
+# Tolérance sur les marges (heures flottantes)
+_EPS = 1e-9
+
+
+class CycleError(ValueError):
+    pass
+
+
+def _duration(estimate_hours: Optional[float], status: Any) -> float:
+    # Travail restant: une tâche terminée ne pèse plus sur le chemin critique
+    if status == TaskStatus.DONE or status == TaskStatus.DONE.value:
+        return 0.0
+    return float(estimate_hours or 0.0)
+
+
+class ProjectGraph:
+    """DAG des dépendances d'un projet, en mémoire.
+
+    Arête u -> v: v est bloquée par u. Les mutations sont O(1) (hors contrôle de
+    cycle); les calculs sont O(V+E) et mémorisés jusqu'à la mutation suivante.
+    """
+
+    def __init__(self) -> None:
+        self.estimate: dict[str, float] = {}
+        self.duration: dict[str, float] = {}
+        self.succ: dict[str, set[str]] = {}
+        self.pred: dict[str, set[str]] = {}
+        self.version = 0
+        self._memo: Optional[tuple[int, dict[str, Any]]] = None
+
+    def _touch(self) -> None:
+        self.version += 1
+
+    def upsert_task(self, task_id: str, estimate_hours: Optional[float], status: Any) -> None:
+        self.estimate[task_id] = float(estimate_hours or 0.0)
+        self.duration[task_id] = _duration(estimate_hours, status)
+        self.succ.setdefault(task_id, set())
+        self.pred.setdefault(task_id, set())
+        self._touch()
+
+    def set_status(self, task_id: str, status: Any) -> None:
+        if task_id in self.duration:
+            self.duration[task_id] = _duration(self.estimate.get(task_id), status)
+            self._touch()
+
+    def remove_task(self, task_id: str) -> None:
+        for v in self.succ.pop(task_id, set()):
+            self.pred[v].discard(task_id)
+        for u in self.pred.pop(task_id, set()):
+            self.succ[u].discard(task_id)
+        self.duration.pop(task_id, None)
+        self.estimate.pop(task_id, None)
+        self._touch()
+
+    def reaches(self, src: str, dst: str) -> bool:
+        """`dst` est-il atteignable depuis `src`? Parcours itératif O(V+E) au pire."""
+        if src == dst:
+            return True
+        seen = {src}
+        stack = [src]
+        while stack:
+            for v in self.succ.get(stack.pop(), ()):
+                if v == dst:
+                    return True
+                if v not in seen:
+                    seen.add(v)
+                    stack.append(v)
+        return False
+
+    def check_edge(self, task_id: str, depends_on_id: str) -> None:
+        """Lève CycleError si « task_id bloquée par depends_on_id » fermerait un cycle."""
+        if self.reaches(task_id, depends_on_id):
+            raise CycleError(f"dependency {depends_on_id} -> {task_id} would create a cycle")
+
+    def add_edge(self, task_id: str, depends_on_id: str) -> None:
+        for n in (task_id, depends_on_id):
+            self.succ.setdefault(n, set())
+            self.pred.setdefault(n, set())
+            self.duration.setdefault(n, 0.0)
+        self.succ[depends_on_id].add(task_id)
+        self.pred[task_id].add(depends_on_id)
+        self._touch()
+
+    def remove_edge(self, task_id: str, depends_on_id: str) -> None:
+        self.succ.get(depends_on_id, set()).discard(task_id)
+        self.pred.get(task_id, set()).discard(depends_on_id)
+        self._touch()
+
+    def topo_order(self) -> tuple[list[str], list[str]]:
+        """Ordre topologique (Kahn). Retourne (ordre, nœuds restés bloqués dans un cycle)."""
+        indeg = {n: len(p) for n, p in self.pred.items()}
+        # Ordre déterministe entre nœuds indépendants
+        queue = deque(sorted(n for n, d in indeg.items() if d == 0))
+        order: list[str] = []
+        while queue:
+            u = queue.popleft()
+            order.append(u)
+            for v in self.succ[u]:
+                indeg[v] -= 1
+                if indeg[v] == 0:
+                    queue.append(v)
+        cyclic = sorted(n for n, d in indeg.items() if d > 0) if len(order) < len(indeg) else []
+        return order, cyclic
+
+    def critical_path(self) -> dict[str, Any]:
+        """Passes avant/arrière (CPM) sur l'ordre topologique: dates au plus tôt/tard et marges.
+
+        Les heures sont relatives au début du projet. Les nœuds pris dans un cycle
+        (écritures concurrentes) sont exclus et renvoyés à part.
+        """
+        if self._memo is not None and self._memo[0] == self.version:
+            return self._memo[1]
+
+        order, cyclic = self.topo_order()
+        dur = self.duration
+        es: dict[str, float] = {}
+        ef: dict[str, float] = {}
+        for u in order:
+            start = max((ef[p] for p in self.pred[u] if p in ef), default=0.0)
+            es[u] = start
+            ef[u] = start + dur[u]
+        total = max(ef.values(), default=0.0)
+
+        ls: dict[str, float] = {}
+        for u in reversed(order):
+            ls[u] = min((ls[s] for s in self.succ[u] if s in ls), default=total) - dur[u]
+
+        # Chemin critique: on remonte depuis la tâche qui finit en dernier,
+        # par des prédécesseurs sans marge qui la précèdent immédiatement.
+        path: list[str] = []
+        if order:
+            cur: Optional[str] = max(order, key=lambda n: (ef[n], -dur[n]))
+            while cur is not None:
+                path.append(cur)
+                cur = next(
+                    (
+                        p
+                        for p in sorted(self.pred[cur])
+                        if p in ef and abs(ef[p] - es[cur]) <= _EPS and abs(ls[p] - es[p]) <= _EPS
+                    ),
+                    None,
+                )
+            path.reverse()
+
+        result = {
+            "duration_hours": total,
+            "path": path,
+            "order": order,
+            "earliest_start": [es[n] for n in order],
+            "earliest_finish": [ef[n] for n in order],
+            "slack": [max(0.0, ls[n] - es[n]) for n in order],
+            "cycle": cyclic,
+        }
+        self._memo = (self.version, result)
+        return result
+
+
+class GraphCache:
+    """Graphes par projet, chargés à la demande (2 requêtes) puis tenus à jour.
+
+    Les routes de ce processus appliquent leurs changements directement
+    (`update_task`, `add_edge`...). Un changement publié par une autre instance
+    (pont Redis du bus) invalide le graphe du projet concerné; `ttl_seconds`
+    borne l'écart si un événement est perdu. `lock(project_id)` sérialise les
+    ajouts d'arêtes d'un projet dans ce processus; entre instances, voir
+    `lock_project_edges` et `check_edge_in_db`.
+    """
+
+    def __init__(self, ttl_seconds: float = 600.0, max_projects: int = 64) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_projects = max_projects
+        self._graphs: dict[str, tuple[float, ProjectGraph]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.loads = 0
+
+    def lock(self, project_id: str) -> asyncio.Lock:
+        return self._locks.setdefault(project_id, asyncio.Lock())
+
+    async def get(self, db: AsyncSession, project_id: str) -> ProjectGraph:
+        hit = self._graphs.get(project_id)
+        if hit is not None and time.monotonic() - hit[0] < self.ttl_seconds:
+            return hit[1]
+        graph = await load_graph(db, project_id)
+        self.loads += 1
+        if len(self._graphs) >= self.max_projects and project_id not in self._graphs:
+            oldest = min(self._graphs, key=lambda k: self._graphs[k][0])
+            self._graphs.pop(oldest, None)
+        self._graphs[project_id] = (time.monotonic(), graph)
+        return graph
+
+    def peek(self, project_id: str) -> Optional[ProjectGraph]:
+        hit = self._graphs.get(project_id)
+        return hit[1] if hit is not None else None
+
+    def update_task(self, project_id: str, task_id: str, estimate_hours: Optional[float], status: Any) -> None:
+        graph = self.peek(project_id)
+        if graph is not None:
+            graph.upsert_task(task_id, estimate_hours, status)
+
+    def set_status(self, project_id: str, task_id: str, status: Any) -> None:
+        graph = self.peek(project_id)
+        if graph is not None:
+            graph.set_status(task_id, status)
+
+    def invalidate(self, project_id: Optional[str] = None) -> None:
+        if project_id is None:
+            self._graphs.clear()
+        else:
+            self._graphs.pop(project_id, None)
+
+
+async def load_graph(db: AsyncSession, project_id: str) -> ProjectGraph:
+    graph = ProjectGraph()
+    res = await db.execute(select(Task.id, Task.estimate_hours, Task.status).where(Task.project_id == project_id))
+    for task_id, estimate, st in res.all():
+        graph.estimate[task_id] = float(estimate or 0.0)
+        graph.duration[task_id] = _duration(estimate, st)
+        graph.succ[task_id] = set()
+        graph.pred[task_id] = set()
+    res = await db.execute(
+        select(TaskDependency.task_id, TaskDependency.depends_on_id).where(TaskDependency.project_id == project_id)
+    )
+    for task_id, dep_id in res.all():
+        if task_id in graph.duration and dep_id in graph.duration:
+            graph.succ[dep_id].add(task_id)
+            graph.pred[task_id].add(dep_id)
+    return graph
+
+
+async def lock_project_edges(db: AsyncSession, project_id: str) -> None:
+    """Verrou base sur le projet (SELECT ... FOR UPDATE) jusqu'à la fin de la transaction.
+
+    Sérialise les ajouts d'arêtes d'un même projet entre instances. Sans effet sous
+    SQLite, qui n'a qu'un écrivain à la fois.
+    """
+    await db.execute(select(Project.id).where(Project.id == project_id).with_for_update())
+
+
+async def check_edge_in_db(db: AsyncSession, task_id: str, depends_on_id: str) -> None:
+    """Contrôle de cycle sur les arêtes en base (CTE récursive), sous `lock_project_edges`.
+
+    Le graphe en cache peut ignorer une arête ajoutée par une autre instance dont
+    l'événement n'est pas encore arrivé: ce contrôle fait foi avant l'INSERT.
+    """
+    reach = (
+        select(TaskDependency.depends_on_id.label("id"))
+        .where(TaskDependency.task_id == depends_on_id)
+        .cte("reach", recursive=True)
+    )
+    reach = reach.union(select(TaskDependency.depends_on_id).join(reach, TaskDependency.task_id == reach.c.id))
+    res = await db.execute(select(reach.c.id).where(reach.c.id == task_id).limit(1))
+    if res.first() is not None:
+        raise CycleError(f"dependency {depends_on_id} -> {task_id} would create a cycle")
+
+
+graphs = GraphCache(ttl_seconds=float(os.getenv("TASK_GRAPH_CACHE_SECONDS", "600")))
+
+
+def _invalidate_on_remote_change(event: dict[str, Any]) -> None:
+    # Événements locaux: déjà appliqués par les routes. Distants: recharger le projet.
+    if event.get("topic") != "tasks" or str(event.get("id", "")).startswith(bus.origin[:8]):
+        return
+    project_id = (event.get("data") or {}).get("project_id")
+    graphs.invalidate(project_id)
+
+
+bus.add_listener(_invalidate_on_remote_change)
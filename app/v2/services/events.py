@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+TOPICS = ("tickets", "tasks", "pipeline", "calendar", "projects")
+
+
+class Subscription:
+    """File bornée d'une connexion SSE.
+
+    Backpressure par connexion: si le client ne suit pas (file pleine), ses
+    événements en attente sont remplacés par un unique `resync` (le client
+    recharge ses données); l'émetteur n'est jamais bloqué.
+    """
+
+    def __init__(self, topics: Iterable[str], maxsize: int = 100) -> None:
+        self.topics = frozenset(topics)
+        self.queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def offer(self, event: dict[str, Any]) -> None:
+        if event["topic"] not in self.topics:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait({"id": event["id"], "topic": "resync", "data": {"dropped": self.dropped}})
+
+
+class EventBus:
+    """Pub/sub en mémoire des changements (tickets, tâches, pipeline, calendrier).
+
+    `publish` est synchrone et non bloquant (à appeler après le commit).
+    Avec `REDIS_URL`, un pont Redis pub/sub relaie les événements entre
+    workers: publication locale immédiate, puis envoi Redis en tâche de fond;
+    les messages reçus de Redis portant notre `origin` sont ignorés.
+    """
+
+    def __init__(self, channel: str = "opshub:events", queue_size: int = 100) -> None:
+        self.channel = channel
+        self.queue_size = queue_size
+        self.origin = uuid.uuid4().hex
+        self._subs: set[Subscription] = set()
+        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._seq = itertools.count(1)
+        self._outgoing: Optional[asyncio.Queue[dict[str, Any]]] = None
+        self._tasks: list[asyncio.Task] = []
+        self._redis = None
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None) -> Subscription:
+        sub = Subscription(topics or TOPICS, maxsize=self.queue_size)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subs.discard(sub)
+
+    def add_listener(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """Callback synchrone appelé pour chaque événement (ex: invalidation de cache)."""
+        self._listeners.append(callback)
+
+    def _deliver(self, event: dict[str, Any]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("event bus: listener failed")
+        for sub in list(self._subs):
+            sub.offer(event)
+
+    def publish(self, topic: str, data: dict[str, Any]) -> dict[str, Any]:
+        event = {"id": f"{self.origin[:8]}-{next(self._seq)}", "topic": topic, "data": data}
+        self._deliver(event)
+        if self._outgoing is not None:
+            try:
+                self._outgoing.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("event bus: redis bridge saturated, event %s not relayed", event["id"])
+        return event
+
+    async def _pump_out(self, redis) -> None:
+        assert self._outgoing is not None
+        while True:
+            event = await self._outgoing.get()
+            try:
+                await redis.publish(self.channel, json.dumps({**event, "origin": self.origin}, default=str))
+            except Exception:
+                logger.exception("event bus: redis publish failed")
+
+    async def _pump_in(self, redis) -> None:
+        while True:
+            try:
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for msg in pubsub.listen():
+                    if msg.get("type") != "message":
+                        continue
+                    try:
+                        event = json.loads(msg["data"])
+                    except (TypeError, ValueError):
+                        continue
+                    if event.pop("origin", None) != self.origin:
+                        self._deliver(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("event bus: redis subscription lost, retrying")
+                await asyncio.sleep(1.0)
+
+    def start(self) -> None:
+        url = os.getenv("REDIS_URL")
+        if not url or self._tasks:
+            return
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url)
+        self._outgoing = asyncio.Queue(maxsize=10000)
+        self._tasks = [
+            asyncio.create_task(self._pump_out(self._redis)),
+            asyncio.create_task(self._pump_in(self._redis)),
+        ]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        for t in tasks:
+            try:
+                await t
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._outgoing = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+def format_sse(event: dict[str, Any]) -> str:
+    return f"id: {event['id']}\nevent: {event['topic']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+async def sse_stream(
+    bus: EventBus,
+    topics: Iterable[str],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    heartbeat_seconds: float = 15.0,
+) -> AsyncIterator[str]:
+    """Flux text/event-stream des `topics`, avec heartbeat (commentaire SSE).
+
+    La souscription est prise au premier `next()` et rendue dans le `finally`:
+    une réponse jamais itérée (client parti avant) ne laisse pas de file orpheline.
+    """
+    sub = bus.subscribe(topics)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield ": ping\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        bus.unsubscribe(sub)
+
+
+bus = EventBus(
+    channel=os.getenv("EVENTS_REDIS_CHANNEL", "opshub:events"),
+    queue_size=int(os.getenv("EVENTS_QUEUE_SIZE", "100")),
+)
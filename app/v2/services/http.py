@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import httpx
+
+# Client HTTP partagé (pool de connexions keep-alive) pour toute la durée de vie de l'app.
+# Ouvert/fermé par main.lifespan; créé à la demande si utilisé hors lifespan (scripts, tests).
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(10.0, connect=5.0),
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import bisect
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional
+
+from dateutil.rrule import rrulestr
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import CalendarEntry, CalendarEventType
+
+# Durée par défaut d'une maintenance sans fin explicite
+_DEFAULT_DURATION = timedelta(hours=1)
+_MAX_OCCURRENCES = 1000
+
+
+def _naive_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def expand_entry(entry: CalendarEntry, window_start: datetime, window_end: datetime) -> list[tuple[datetime, datetime]]:
+    """Intervalles [début, fin) d'une entrée (RRULE développée) qui recoupent la fenêtre."""
+    start = _naive_utc(entry.start)
+    if entry.end:
+        duration = _naive_utc(entry.end) - start
+    elif entry.all_day:
+        duration = timedelta(days=1)
+    else:
+        duration = _DEFAULT_DURATION
+    if duration <= timedelta(0):
+        duration = _DEFAULT_DURATION
+
+    if not entry.rrule:
+        end = start + duration
+        return [(start, end)] if start < window_end and end > window_start else []
+
+    try:
+        rule = rrulestr(entry.rrule, dtstart=start)
+    except (ValueError, TypeError):
+        return [(start, start + duration)] if start < window_end and start + duration > window_start else []
+    out = []
+    for occ in rule.xafter(window_start - duration, count=_MAX_OCCURRENCES, inc=True):
+        if occ >= window_end:
+            break
+        out.append((occ, occ + duration))
+    return out
+
+
+class _ResourceIntervals:
+    """Intervalles triés par début + max cumulé des fins: recherche en O(log n + k)."""
+
+    __slots__ = ("starts", "ends", "ids", "prefix_max_end")
+
+    def __init__(self, items: list[tuple[datetime, datetime, str]]) -> None:
+        items.sort()
+        self.starts = [s for s, _, _ in items]
+        self.ends = [e for _, e, _ in items]
+        self.ids = [i for _, _, i in items]
+        self.prefix_max_end: list[datetime] = []
+        for e in self.ends:
+            self.prefix_max_end.append(max(e, self.prefix_max_end[-1]) if self.prefix_max_end else e)
+
+    def covering(self, at: datetime) -> Optional[str]:
+        i = bisect.bisect_right(self.starts, at) - 1
+        while i >= 0 and self.prefix_max_end[i] > at:
+            if self.ends[i] > at:
+                return self.ids[i]
+            i -= 1
+        return None
+
+
+class MaintenanceIndex:
+    """Index mémoire des fenêtres de maintenance actives, par ressource.
+
+    Chargé depuis `calendar_entries` (type MAINTENANCE, RRULE développées sur
+    un horizon glissant), mis à jour à chaque écriture calendrier et
+    rechargé périodiquement (écritures faites par d'autres workers).
+    La consultation ne fait aucune requête DB.
+    """
+
+    def __init__(self, horizon_hours: float = 48.0, refresh_seconds: float = 60.0) -> None:
+        self.horizon = timedelta(hours=horizon_hours)
+        self.refresh = timedelta(seconds=refresh_seconds)
+        self._intervals: dict[str, list[tuple[datetime, datetime, str]]] = {}
+        self._by_entry: dict[str, list[str]] = {}
+        self._index: dict[str, _ResourceIntervals] = {}
+        self._window: Optional[tuple[datetime, datetime]] = None
+        self._loaded_at: Optional[datetime] = None
+
+    def _window_for(self, now: datetime) -> tuple[datetime, datetime]:
+        return now - timedelta(hours=1), now + self.horizon
+
+    def _add(self, entry: CalendarEntry) -> None:
+        if entry.event_type != CalendarEventType.MAINTENANCE or not entry.resources or self._window is None:
+            return
+        intervals = expand_entry(entry, *self._window)
+        if not intervals:
+            return
+        resources = [r for r in entry.resources if r]
+        self._by_entry[entry.id] = resources
+        for r in resources:
+            self._intervals.setdefault(r, []).extend((s, e, entry.id) for s, e in intervals)
+
+    def _rebuild(self, resources: Iterable[str]) -> None:
+        for r in set(resources):
+            items = self._intervals.get(r)
+            if items:
+                self._index[r] = _ResourceIntervals(list(items))
+            else:
+                self._intervals.pop(r, None)
+                self._index.pop(r, None)
+
+    async def load(self, db: AsyncSession, now: Optional[datetime] = None) -> None:
+        now = now or datetime.utcnow()
+        self._window = self._window_for(now)
+        self._intervals.clear()
+        self._by_entry.clear()
+        self._index.clear()
+        res = await db.execute(
+            select(CalendarEntry).where(CalendarEntry.event_type == CalendarEventType.MAINTENANCE)
+        )
+        for entry in res.scalars().all():
+            self._add(entry)
+        self._rebuild(list(self._intervals))
+        self._loaded_at = now
+
+    async def ensure_fresh(self, db: AsyncSession, now: Optional[datetime] = None) -> None:
+        now = now or datetime.utcnow()
+        if self._loaded_at is None or now - self._loaded_at > self.refresh:
+            await self.load(db, now)
+
+    def remove(self, entry_id: str) -> None:
+        resources = self._by_entry.pop(entry_id, [])
+        for r in resources:
+            self._intervals[r] = [it for it in self._intervals.get(r, []) if it[2] != entry_id]
+        self._rebuild(resources)
+
+    def upsert(self, entry: CalendarEntry) -> None:
+        """À appeler après chaque création/modification d'une entrée calendrier."""
+        if self._loaded_at is None:
+            return  # sera chargé complet au premier usage
+        previous = self._by_entry.get(entry.id, [])
+        self.remove(entry.id)
+        self._add(entry)
+        self._rebuild(list(previous) + list(self._by_entry.get(entry.id, [])))
+
+    def covering(self, resources: Iterable[str], at: Optional[datetime] = None) -> Optional[str]:
+        """Id de la maintenance active couvrant l'une des ressources, sinon None."""
+        at = at or datetime.utcnow()
+        for r in resources:
+            idx = self._index.get(r)
+            if idx is not None:
+                hit = idx.covering(at)
+                if hit:
+                    return hit
+        return None
+
+
+def alert_resources(row: dict[str, Any]) -> list[str]:
+    """Ressources candidates d'une alerte: host/instance (avec et sans port), labels usuels."""
+    payload = row.get("payload") or {}
+    labels = payload.get("labels") or {}
+    out: list[str] = []
+    for value in (payload.get("host"), labels.get("instance"), labels.get("host"), labels.get("service"), labels.get("resource")):
+        if not value:
+            continue
+        value = str(value)
+        out.append(value)
+        if ":" in value:
+            out.append(value.rsplit(":", 1)[0])
+    return list(dict.fromkeys(out))
+
+
+def apply_silences(rows: list[dict[str, Any]], index: MaintenanceIndex, now: Optional[datetime] = None) -> int:
+    """Marque `muted`/`muted_by` sur les lignes d'ingestion. Retourne le nombre d'alertes mises en sourdine."""
+    now = now or datetime.utcnow()
+    muted = 0
+    for row in rows:
+        entry_id = index.covering(alert_resources(row), now)
+        row["muted"] = entry_id is not None
+        row["muted_by"] = entry_id
+        muted += entry_id is not None
+    return muted
+
+
+maintenance_index = MaintenanceIndex(
+    horizon_hours=float(os.getenv("MAINTENANCE_HORIZON_HOURS", "48")),
+    refresh_seconds=float(os.getenv("MAINTENANCE_REFRESH_SECONDS", "60")),
+)
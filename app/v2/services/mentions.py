@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import User
+
+# @alice@example.com ou @alice.martin (prénom.nom); pas de match au milieu d'un mot/email
+MENTION_RE = re.compile(r"(?<![\w.@])@([\w%+-]+(?:\.[\w%+-]+)*(?:@[\w-]+(?:\.[\w-]+)+)?)")
+MAX_MENTIONS = 50
+
+
+def parse_mentions(body: str) -> list[str]:
+    """Identifiants mentionnés (minuscules, dédoublonnés, dans l'ordre d'apparition)."""
+    out: dict[str, None] = {}
+    for m in MENTION_RE.finditer(body or ""):
+        handle = m.group(1).rstrip(".-").lower()
+        if handle:
+            out.setdefault(handle, None)
+        if len(out) >= MAX_MENTIONS:
+            break
+    return list(out)
+
+
+async def resolve_mentions(db: AsyncSession, handles: Iterable[str]) -> list[User]:
+    """Utilisateurs actifs désignés par `handles`, en une seule requête.
+
+    Emails comparés sur lower(email), noms sur (lower(first_name), lower(last_name))
+    -> index ix_users_email_lower / ix_users_name_lower. Un identifiant sans
+    correspondance est ignoré.
+    """
+    emails: list[str] = []
+    names: list[tuple[str, str]] = []
+    for h in handles:
+        if "@" in h:
+            emails.append(h)
+        elif "." in h:
+            first, last = h.split(".", 1)
+            names.append((first, last))
+    conds = []
+    if emails:
+        conds.append(func.lower(User.email).in_(emails))
+    if names:
+        conds.append(tuple_(func.lower(User.first_name), func.lower(User.last_name)).in_(names))
+    if not conds:
+        return []
+    res = await db.execute(select(User).where(or_(*conds), User.is_active.is_not(False)))
+    return list(res.scalars().all())
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Iterable
-import httpx
+from typing import Awaitable, Iterable, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.notifications import send_email
+from app.v2.services import outbox
+from app.v2.services.slack import coalescer
 
 
 def _severity_rank(sev: str) -> int:
@@ -15,21 +18,44 @@ async def notify_slack(message: str) -> None:
     url = os.getenv("SLACK_WEBHOOK_URL")
     if not url:
         return
-    async with httpx.AsyncClient(timeout=10) as client:
-        await client.post(url, json={"text": message})
+    # Client HTTP partagé + regroupement des messages proches en un digest
+    await coalescer.post(url, message)
 
 
 async def notify_email(recipients: Iterable[str], subject: str, body: str) -> None:
     for r in recipients:
-        send_email(r, subject, body)
+        # smtplib est bloquant: ne pas geler la boucle d'événements
+        await asyncio.to_thread(send_email, r, subject, body)
+
+
+async def _send_slack(payload: dict) -> Optional[Awaitable[None]]:
+    # Message déposé dans le digest; l'outbox attend l'envoi hors de son sémaphore
+    url = os.getenv("SLACK_WEBHOOK_URL")
+    if not url:
+        return None
+    return coalescer.stage(url, payload.get("text") or "")
+
+
+async def _send_email(payload: dict) -> None:
+    await notify_email([payload["to"]], payload.get("subject") or "", payload.get("body") or "")
+
+
+outbox.register_sender("slack", _send_slack)
+outbox.register_sender("email", _send_email)
 
 
 async def notify_escalation(
+    db: AsyncSession,
     severity: str,
     assigned_emails: Iterable[str],
     admin_emails: Iterable[str],
     message: str,
 ) -> None:
+    """Met en file les notifications d'escalade dans l'outbox.
+
+    Aucun envoi réseau ici: les messages sont committés avec la transaction
+    de l'appelant puis envoyés par `outbox.dispatcher`.
+    """
     # P0 -> tous (admins + assignés), P3 -> assigné (simple)
     sev = severity or "P3"
     if _severity_rank(sev) <= 0:
@@ -37,6 +63,25 @@ async def notify_escalation(
     else:
         recipients = sorted(set(list(assigned_emails)))
 
-    await notify_slack(message)
-    if recipients:
-        await notify_email(recipients, f"[OpsHub] {sev} notification", message)
+    outbox.enqueue(db, "slack", {"text": message})
+    # Un message par destinataire: un échec SMTP ne renvoie pas aux autres.
+    for r in recipients:
+        outbox.enqueue(db, "email", {"to": r, "subject": f"[OpsHub] {sev} notification", "body": message})
+
+
+def notify_mentions(db: AsyncSession, recipients: Iterable[str], author: str, task_title: str, body: str) -> int:
+    """Met en file un email par utilisateur mentionné (outbox, même transaction que le commentaire).
+
+    La requête qui crée le commentaire ne fait que des INSERT: l'envoi
+    (potentiellement des dizaines de destinataires) est fait par le dispatcher.
+    """
+    excerpt = body if len(body) <= 500 else body[:497] + "..."
+    count = 0
+    for r in sorted(set(recipients)):
+        outbox.enqueue(
+            db,
+            "email",
+            {"to": r, "subject": f"[OpsHub] {author} vous a mentionné: {task_title}", "body": excerpt},
+        )
+        count += 1
+    return count
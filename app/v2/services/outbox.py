@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.database as database
+from app.models import OutboxMessage, OutboxStatus
+
+# Un sender peut rendre un awaitable de complétion (ex: digest Slack): il est
+# attendu après libération du sémaphore du canal.
+Sender = Callable[[dict], Awaitable[Optional[Awaitable[None]]]]
+
+# channel -> coroutine d'envoi (enregistrés par app.v2.services.notify)
+_SENDERS: dict[str, Sender] = {}
+
+
+def register_sender(channel: str, sender: Sender) -> None:
+    _SENDERS[channel] = sender
+
+
+def enqueue(db: AsyncSession, channel: str, payload: dict) -> OutboxMessage:
+    """Ajoute un message à l'outbox sans commit.
+
+    Le message est persisté par le commit de l'appelant: la notification
+    existe si et seulement si le changement métier existe.
+    """
+    msg = OutboxMessage(
+        channel=channel,
+        payload=payload,
+        status=OutboxStatus.PENDING,
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+        created_at=datetime.utcnow(),
+    )
+    db.add(msg)
+    return msg
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class OutboxDispatcher:
+    """Worker de fond qui draine la table outbox.
+
+    - claim par lot: `next_attempt_at` est repoussé d'un bail (lease) pour que
+      les autres workers ne reprennent pas le message; un crash en cours
+      d'envoi le rend de nouveau visible à l'expiration du bail.
+    - concurrence limitée par canal (sémaphores).
+    - retries avec backoff exponentiel, puis statut DEAD (dead-letter).
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 1.0,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        lease_seconds: int = 60,
+        base_backoff_seconds: float = 5.0,
+    ) -> None:
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.base_backoff_seconds = base_backoff_seconds
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+        self.sent_total: dict[str, int] = {}
+        self.failed_total: dict[str, int] = {}
+        self.dead_total: dict[str, int] = {}
+        self._latencies: dict[str, deque[float]] = {}
+
+    def _semaphore(self, channel: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(channel)
+        if sem is None:
+            limit = _env_int(f"OUTBOX_CONCURRENCY_{channel.upper()}", 4)
+            sem = asyncio.Semaphore(max(1, limit))
+            self._semaphores[channel] = sem
+        return sem
+
+    async def _claim(self) -> list[OutboxMessage]:
+        now = datetime.utcnow()
+        async with database.SessionLocal() as db:
+            res = await db.execute(
+                select(OutboxMessage)
+                .where(OutboxMessage.status == OutboxStatus.PENDING)
+                .where(OutboxMessage.next_attempt_at <= now)
+                .order_by(OutboxMessage.next_attempt_at.asc())
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            rows = list(res.scalars().all())
+            for row in rows:
+                row.attempts = (row.attempts or 0) + 1
+                row.next_attempt_at = now + timedelta(seconds=self.lease_seconds)
+            await db.commit()
+            return rows
+
+    async def _deliver(self, msg: OutboxMessage) -> None:
+        sender = _SENDERS.get(msg.channel)
+        error: Optional[str] = None
+        completion: Optional[Awaitable[None]] = None
+        async with self._semaphore(msg.channel):
+            if sender is None:
+                error = f"no sender for channel {msg.channel!r}"
+            else:
+                try:
+                    completion = await sender(msg.payload or {})
+                except Exception as e:
+                    error = str(e) or e.__class__.__name__
+        if completion is not None:
+            try:
+                await completion
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+
+        now = datetime.utcnow()
+        async with database.SessionLocal() as db:
+            row = await db.get(OutboxMessage, msg.id)
+            if row is None:
+                return
+            if error is None:
+                row.status = OutboxStatus.SENT
+                row.sent_at = now
+                row.last_error = None
+                self.sent_total[msg.channel] = self.sent_total.get(msg.channel, 0) + 1
+                created = row.created_at or now
+                self._latencies.setdefault(msg.channel, deque(maxlen=1000)).append((now - created).total_seconds())
+            else:
+                row.last_error = error[:1000]
+                self.failed_total[msg.channel] = self.failed_total.get(msg.channel, 0) + 1
+                if (row.attempts or 0) >= self.max_attempts:
+                    row.status = OutboxStatus.DEAD
+                    self.dead_total[msg.channel] = self.dead_total.get(msg.channel, 0) + 1
+                else:
+                    backoff = self.base_backoff_seconds * (2 ** max(0, (row.attempts or 1) - 1))
+                    row.next_attempt_at = now + timedelta(seconds=backoff)
+            await db.commit()
+
+    async def run_once(self) -> int:
+        """Claim un lot et l'envoie. Retourne le nombre de messages traités."""
+        rows = await self._claim()
+        if rows:
+            await asyncio.gather(*(self._deliver(r) for r in rows))
+        return len(rows)
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = await self.run_once()
+            except Exception:
+                processed = 0
+            if processed >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=10)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    def latency_stats(self) -> dict[str, dict[str, Any]]:
+        out: dict[str, dict[str, Any]] = {}
+        for channel, values in self._latencies.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            n = len(ordered)
+            out[channel] = {
+                "count": n,
+                "avg_seconds": sum(ordered) / n,
+                "p50_seconds": ordered[int(0.50 * (n - 1))],
+                "p95_seconds": ordered[int(0.95 * (n - 1))],
+                "max_seconds": ordered[-1],
+            }
+        return out
+
+
+async def queue_depth(db: AsyncSession) -> dict[str, dict[str, int]]:
+    res = await db.execute(
+        select(OutboxMessage.channel, OutboxMessage.status, func.count())
+        .group_by(OutboxMessage.channel, OutboxMessage.status)
+    )
+    depth: dict[str, dict[str, int]] = {}
+    for channel, st, n in res.all():
+        depth.setdefault(channel, {})[st.value if hasattr(st, "value") else str(st)] = int(n)
+    return depth
+
+
+dispatcher = OutboxDispatcher(
+    poll_interval=float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0")),
+    batch_size=_env_int("OUTBOX_BATCH_SIZE", 50),
+    max_attempts=_env_int("OUTBOX_MAX_ATTEMPTS", 5),
+)
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime
+from typing import Optional
+
+
+def encode_cursor(*parts: Optional[str]) -> str:
+    """Curseur keyset opaque: valeurs de la clé de tri de la dernière ligne renvoyée."""
+    raw = "|".join(p or "" for p in parts).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str, n: int) -> list[str]:
+    """Curseur -> `n` valeurs. Lève ValueError si illisible."""
+    try:
+        parts = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", n - 1)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if len(parts) != n:
+        raise ValueError("invalid cursor")
+    return parts
+
+
+def encode_time_cursor(at: datetime, row_id: str) -> str:
+    return encode_cursor(at.isoformat(), row_id)
+
+
+def decode_time_cursor(cursor: str) -> tuple[datetime, str]:
+    at, row_id = decode_cursor(cursor, 2)
+    try:
+        return datetime.fromisoformat(at), row_id
+    except ValueError as e:
+        raise ValueError("invalid cursor") from e
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from sqlalchemy import func, null, select
+
+import app.database as database
+from app.models import AlertSource, PipelineEvent, Project
+from app.v2.services.upsert import UPSERT_CHUNK, insert_for
+from app.v2.services.audit_diff import expand_json
+from app.v2.services.events import bus
+from app.v2.services.pipeline_stats import PipelineDelta, apply_delta as apply_stats_delta
+
+logger = logging.getLogger(__name__)
+
+# Un statut terminal n'est jamais écrasé par un statut antérieur livré en retard
+TERMINAL_STATUSES = frozenset({"success", "failed", "canceled", "skipped"})
+
+
+def _parse_ts(value: Any) -> Optional[datetime]:
+    """Horodatage GitLab ("2026-10-19 10:00:00 UTC" ou ISO 8601) -> UTC naïf."""
+    if not value:
+        return None
+    raw = str(value).strip()
+    if raw.endswith(" UTC"):
+        raw = raw[:-4] + "+00:00"
+    try:
+        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _merge_status(old: Optional[str], new: Optional[str]) -> Optional[str]:
+    if old in TERMINAL_STATUSES and new not in TERMINAL_STATUSES:
+        return old
+    return new or old
+
+
+def _job(job_id: Any, name: Any, stage: Any, status: Any, duration: Any) -> tuple[str, dict[str, Any]]:
+    return str(job_id), {
+        "name": name,
+        "stage": stage,
+        "status": status,
+        "duration": float(duration) if duration is not None else None,
+    }
+
+
+def parse_gitlab_hook(body: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """Pipeline Hook / Job Hook GitLab -> enregistrement par pipeline (None si non géré)."""
+    kind = body.get("object_kind")
+    project = body.get("project") or {}
+    if kind == "pipeline":
+        attrs = body.get("object_attributes") or {}
+        if attrs.get("id") is None:
+            return None
+        jobs = dict(
+            _job(b.get("id"), b.get("name"), b.get("stage"), b.get("status"), b.get("duration"))
+            for b in body.get("builds") or []
+            if b.get("id") is not None
+        )
+        web_url = project.get("web_url")
+        return {
+            "pipeline_id": str(attrs["id"]),
+            "gitlab_project": project.get("path_with_namespace") or str(project.get("id") or ""),
+            "ref": attrs.get("ref"),
+            "status": attrs.get("status") or "unknown",
+            "url": attrs.get("url") or (f"{web_url}/-/pipelines/{attrs['id']}" if web_url else None),
+            "created_at": _parse_ts(attrs.get("created_at")),
+            "finished_at": _parse_ts(attrs.get("finished_at")),
+            "duration_seconds": float(attrs["duration"]) if attrs.get("duration") is not None else None,
+            "sha": attrs.get("sha"),
+            "source": attrs.get("source"),
+            "jobs": jobs,
+        }
+    if kind == "build":
+        pipeline_id = body.get("pipeline_id") or (body.get("pipeline") or {}).get("id")
+        if pipeline_id is None or body.get("build_id") is None:
+            return None
+        job_id, job = _job(
+            body.get("build_id"), body.get("build_name"), body.get("build_stage"), body.get("build_status"), body.get("build_duration")
+        )
+        return {
+            "pipeline_id": str(pipeline_id),
+            "gitlab_project": project.get("path_with_namespace") or body.get("project_name") or str(body.get("project_id") or ""),
+            "ref": body.get("ref"),
+            "status": None,  # un job ne change pas le statut du pipeline
+            "jobs": {job_id: job},
+        }
+    return None
+
+
+def merge_record(old: Optional[dict[str, Any]], new: dict[str, Any]) -> dict[str, Any]:
+    """Fusionne deux enregistrements d'un même pipeline (livraisons dans le désordre tolérées)."""
+    if old is None:
+        return {**new, "jobs": dict(new.get("jobs") or {})}
+    out = dict(old)
+    for k, v in new.items():
+        if k in ("jobs", "status"):
+            continue
+        if v is not None:
+            out[k] = v
+    out["status"] = _merge_status(old.get("status"), new.get("status"))
+    jobs = dict(old.get("jobs") or {})
+    for job_id, job in (new.get("jobs") or {}).items():
+        prev = jobs.get(job_id)
+        if prev is not None:
+            job = {**prev, **{k: v for k, v in job.items() if v is not None}}
+            job["status"] = _merge_status(prev.get("status"), job.get("status"))
+        jobs[job_id] = job
+    out["jobs"] = jobs
+    return out
+
+
+class LatestStatus:
+    """Dernier statut connu par (projet GitLab, ref): lecture instantanée, sans DB."""
+
+    def __init__(self) -> None:
+        self._latest: dict[tuple[str, str], dict[str, Any]] = {}
+
+    def observe(self, record: dict[str, Any]) -> None:
+        if not record.get("status") or not record.get("ref"):
+            return
+        key = (record.get("gitlab_project") or "", record["ref"])
+        cur = self._latest.get(key)
+        pid = int(record["pipeline_id"]) if str(record["pipeline_id"]).isdigit() else 0
+        if cur is not None:
+            if pid < cur["pipeline_id"]:
+                return  # pipeline plus ancien
+            if pid == cur["pipeline_id"]:
+                record = {**record, "status": _merge_status(cur["status"], record["status"])}
+        self._latest[key] = {
+            "project": key[0],
+            "ref": key[1],
+            "pipeline_id": pid,
+            "status": record["status"],
+            "url": record.get("url") or (cur or {}).get("url"),
+            "updated_at": datetime.utcnow(),
+        }
+
+    def get(self, project: str, ref: str) -> Optional[dict[str, Any]]:
+        return self._latest.get((project, ref))
+
+    def newest(self, project: Optional[str] = None) -> Optional[dict[str, Any]]:
+        items = [v for v in self._latest.values() if project is None or v["project"] == project]
+        return max(items, key=lambda v: v["updated_at"]) if items else None
+
+    def all(self) -> list[dict[str, Any]]:
+        return sorted(self._latest.values(), key=lambda v: (v["project"], v["ref"]))
+
+
+class PipelineWriter:
+    """Écriture différée des webhooks pipeline/job.
+
+    Les livraisons sont fusionnées en mémoire par `pipeline_id` (un pipeline
+    de 50 jobs = une ligne), puis écrites toutes les `flush_interval_ms` par
+    un seul upsert multi-lignes. Au-delà de `max_pending` pipelines en
+    attente, `submit` déclenche l'écriture (backpressure).
+    Sans worker démarré (tests, scripts), l'écriture est immédiate.
+    """
+
+    def __init__(self, flush_interval_ms: int = 250, max_pending: int = 5000) -> None:
+        self.flush_interval_ms = flush_interval_ms
+        self.max_pending = max_pending
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.written_total = 0
+
+    async def submit(self, record: dict[str, Any]) -> None:
+        pid = record["pipeline_id"]
+        self._pending[pid] = merge_record(self._pending.get(pid), record)
+        if self._task is None or len(self._pending) >= self.max_pending:
+            await self.flush()
+        else:
+            self.notify()
+
+    async def flush(self) -> int:
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                await self._write(pending)
+            except Exception:
+                logger.exception("pipeline flush failed (%d pipelines requeued)", len(pending))
+                self._requeue(pending)
+                return 0
+            except BaseException:
+                # Annulation en cours d'écriture (arrêt): le lot revient en attente,
+                # le flush final de stop() l'écrit (upsert: réécriture sans doublon).
+                self._requeue(pending)
+                raise
+        self.written_total += len(pending)
+        bus.publish("pipeline", {"action": "updated", "pipelines": len(pending)})
+        return len(pending)
+
+    def _requeue(self, pending: dict[str, dict[str, Any]]) -> None:
+        for pid, rec in pending.items():
+            self._pending[pid] = merge_record(rec, self._pending[pid]) if pid in self._pending else rec
+
+    async def _write(self, pending: dict[str, dict[str, Any]]) -> None:
+        now = datetime.utcnow()
+        async with database.SessionLocal() as db:
+            # Une lecture par lot: fusion avec l'état stocké (jobs, statut terminal)
+            ids = list(pending)
+            stored: dict[str, dict[str, Any]] = {}
+            for i in range(0, len(ids), UPSERT_CHUNK):
+                res = await db.execute(
+                    select(
+                        PipelineEvent.pipeline_id,
+                        PipelineEvent.status,
+                        PipelineEvent.payload,
+                        PipelineEvent.created_at,
+                        PipelineEvent.gitlab_project,
+                        PipelineEvent.ref,
+                        PipelineEvent.duration_seconds,
+                    ).where(PipelineEvent.pipeline_id.in_(ids[i : i + UPSERT_CHUNK]))
+                )
+                for pid, st, payload, created_at, path, ref, duration in res.all():
+                    stored[pid] = {
+                        "status": st,
+                        "jobs": (expand_json(payload) or {}).get("jobs") or {},
+                        "created_at": created_at,
+                        "gitlab_project": path,
+                        "ref": ref,
+                        "duration_seconds": duration,
+                    }
+
+            paths = {r.get("gitlab_project") for r in pending.values() if r.get("gitlab_project")}
+            projects: dict[str, str] = {}
+            if paths:
+                res = await db.execute(select(Project.gitlab_project, Project.id).where(Project.gitlab_project.in_(paths)))
+                projects = dict(res.all())
+
+            rows = []
+            delta = PipelineDelta()
+            for pid, rec in pending.items():
+                old = stored.get(pid)
+                if old is not None:
+                    rec = merge_record(old, rec)
+                    # created_at n'est pas réécrit par l'upsert
+                    rec["created_at"] = old["created_at"]
+                # Rollups: contribution nouvelle moins contribution déjà comptée
+                delta.add(old, -1)
+                delta.add(rec)
+                rows.append(
+                    {
+                        "pipeline_id": pid,
+                        "gitlab_project": rec.get("gitlab_project"),
+                        "project_id": projects.get(rec.get("gitlab_project") or ""),
+                        "source": AlertSource.GITLAB,
+                        "status": rec.get("status") or "unknown",
+                        "ref": rec.get("ref"),
+                        "url": rec.get("url"),
+                        "payload": {"sha": rec.get("sha"), "source": rec.get("source"), "jobs": rec.get("jobs") or {}},
+                        "created_at": rec.get("created_at") or now,
+                        "finished_at": rec.get("finished_at"),
+                        "duration_seconds": rec.get("duration_seconds"),
+                        "updated_at": now,
+                    }
+                )
+
+            insert = insert_for(db)
+            for i in range(0, len(rows), UPSERT_CHUNK):
+                stmt = insert(PipelineEvent).values(rows[i : i + UPSERT_CHUNK])
+                excluded = stmt.excluded
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[PipelineEvent.pipeline_id],
+                    set_={
+                        "status": excluded.status,
+                        "payload": excluded.payload,
+                        "gitlab_project": func.coalesce(excluded.gitlab_project, PipelineEvent.gitlab_project),
+                        "project_id": func.coalesce(excluded.project_id, PipelineEvent.project_id),
+                        "ref": func.coalesce(excluded.ref, PipelineEvent.ref),
+                        "url": func.coalesce(excluded.url, PipelineEvent.url),
+                        "finished_at": func.coalesce(excluded.finished_at, PipelineEvent.finished_at),
+                        "duration_seconds": func.coalesce(excluded.duration_seconds, PipelineEvent.duration_seconds),
+                        "updated_at": excluded.updated_at,
+                        "compacted_at": null(),
+                    },
+                )
+                await db.execute(stmt)
+            await apply_stats_delta(db, delta)
+            await db.commit()
+
+    async def _run(self, wake: asyncio.Event) -> None:
+        interval = self.flush_interval_ms / 1000
+        while True:
+            await wake.wait()
+            wake.clear()
+            await asyncio.sleep(interval)  # laisse la rafale s'accumuler
+            await self.flush()
+
+    def notify(self) -> None:
+        if self._wake is not None:
+            self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(self._wake))
+
+    async def stop(self) -> None:
+        """Arrête le worker puis écrit ce qui reste (appelé par main.lifespan)."""
+        task, self._task, self._wake = self._task, None, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+
+latest_status = LatestStatus()
+writer = PipelineWriter(
+    flush_interval_ms=int(os.getenv("PIPELINE_FLUSH_INTERVAL_MS", "250")),
+    max_pending=int(os.getenv("PIPELINE_MAX_PENDING", "5000")),
+)
+
+
+async def warm_latest(db, limit: int = 1000) -> None:
+    """Recharge la carte des derniers statuts depuis les pipelines récents (démarrage)."""
+    res = await db.execute(
+        select(PipelineEvent.pipeline_id, PipelineEvent.gitlab_project, PipelineEvent.ref, PipelineEvent.status, PipelineEvent.url)
+        .where(PipelineEvent.pipeline_id.is_not(None))
+        .order_by(PipelineEvent.created_at.desc())
+        .limit(limit)
+    )
+    for pid, project, ref, st, url in reversed(res.all()):
+        latest_status.observe({"pipeline_id": pid, "gitlab_project": project, "ref": ref, "status": st, "url": url})
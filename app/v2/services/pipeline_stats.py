@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import PipelineDurationHistDaily, PipelineEvent, PipelineJobStatsDaily, PipelineStatsDaily
+from app.v2.services.upsert import UPSERT_CHUNK, insert_for
+from app.v2.services.audit_diff import expand_json
+
+# Histogramme de durées à buckets logarithmiques: bucket i couvre ]2^((i-1)/4), 2^(i/4)] secondes
+# (~19% d'écart relatif max). Les histogrammes journaliers s'additionnent: un percentile
+# sur N jours = somme des buckets puis un cumul, quel que soit le nombre de pipelines.
+_BUCKETS_PER_OCTAVE = 4
+OUTCOMES = ("success", "failed", "canceled")
+
+
+def duration_bucket(seconds: float) -> int:
+    if seconds <= 1:
+        return 0
+    return math.ceil(_BUCKETS_PER_OCTAVE * math.log2(seconds))
+
+
+def bucket_value(bucket: int) -> float:
+    """Valeur représentative d'un bucket (milieu géométrique)."""
+    if bucket <= 0:
+        return 1.0
+    return 2 ** ((bucket - 0.5) / _BUCKETS_PER_OCTAVE)
+
+
+def histogram_quantiles(hist: dict[int, int], qs: tuple[float, ...]) -> dict[float, Optional[float]]:
+    """Quantiles d'un histogramme {bucket: count} en un seul passage cumulatif."""
+    total = sum(c for c in hist.values() if c > 0)
+    out: dict[float, Optional[float]] = {q: None for q in qs}
+    if total <= 0:
+        return out
+    targets = sorted((max(1, math.ceil(q * total)), q) for q in qs)
+    cum = 0
+    t = 0
+    for bucket in sorted(hist):
+        cum += max(0, hist[bucket])
+        while t < len(targets) and cum >= targets[t][0]:
+            out[targets[t][1]] = bucket_value(bucket)
+            t += 1
+    return out
+
+
+def _day(dt: Optional[datetime]) -> datetime:
+    return (dt or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class PipelineDelta:
+    """Deltas de rollups (pipelines, histogramme de durées, jobs) par jour."""
+
+    def __init__(self) -> None:
+        self.pipelines: dict[tuple, list[float]] = defaultdict(lambda: [0, 0, 0, 0, 0.0, 0])
+        self.hist: dict[tuple, int] = defaultdict(int)
+        self.jobs: dict[tuple, list[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def add(self, rec: Optional[dict[str, Any]], sign: int = 1) -> None:
+        """Contribution d'un pipeline terminé (no-op sinon). sign=-1 retire une contribution."""
+        if not rec or rec.get("status") not in OUTCOMES:
+            return
+        day = _day(rec.get("created_at"))
+        project = rec.get("gitlab_project") or ""
+        ref = rec.get("ref") or ""
+        p = self.pipelines[(day, project, ref)]
+        p[0] += sign
+        p[1 + OUTCOMES.index(rec["status"])] += sign
+        duration = rec.get("duration_seconds")
+        if duration is not None and rec["status"] == "success":
+            p[4] += sign * float(duration)
+            p[5] += sign
+            self.hist[(day, project, ref, duration_bucket(float(duration)))] += sign
+
+        # Dernière tentative par nom de job; flaky = échec puis succès dans le même pipeline
+        attempts: dict[str, list[tuple[int, str]]] = defaultdict(list)
+        for job_id, job in (rec.get("jobs") or {}).items():
+            if job.get("name") and job.get("status") in OUTCOMES:
+                attempts[job["name"]].append((int(job_id) if str(job_id).isdigit() else 0, job["status"]))
+        for name, runs in attempts.items():
+            runs.sort()
+            final = runs[-1][1]
+            j = self.jobs[(day, project, name)]
+            j[0] += sign
+            j[1] += sign * (final == "failed")
+            j[2] += sign * (final == "success" and any(st == "failed" for _, st in runs[:-1]))
+
+    def __bool__(self) -> bool:
+        return bool(self.pipelines or self.hist or self.jobs)
+
+
+def _compact(rows: list[dict[str, Any]], keys: tuple[str, ...]) -> list[dict[str, Any]]:
+    return [r for r in rows if any(r[k] for k in keys)]
+
+
+async def _upsert_additive(db: AsyncSession, model, rows: list[dict[str, Any]], index: list, cols: tuple[str, ...]) -> None:
+    insert = insert_for(db)
+    for i in range(0, len(rows), UPSERT_CHUNK):
+        stmt = insert(model).values(rows[i : i + UPSERT_CHUNK])
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index,
+            set_={c: getattr(model, c) + getattr(excluded, c) for c in cols},
+        )
+        await db.execute(stmt)
+
+
+async def apply_delta(db: AsyncSession, delta: PipelineDelta) -> None:
+    """Ajoute les deltas aux rollups journaliers (INSERT ... ON CONFLICT additif), sans commit."""
+    p_cols = ("total", "success", "failed", "canceled", "duration_sum", "duration_count")
+    rows = _compact(
+        [
+            {"day": d, "gitlab_project": proj, "ref": ref, **dict(zip(p_cols, vals))}
+            for (d, proj, ref), vals in delta.pipelines.items()
+        ],
+        p_cols,
+    )
+    if rows:
+        t = PipelineStatsDaily
+        await _upsert_additive(db, t, rows, [t.day, t.gitlab_project, t.ref], p_cols)
+
+    rows = [
+        {"day": d, "gitlab_project": proj, "ref": ref, "bucket": b, "count": n}
+        for (d, proj, ref, b), n in delta.hist.items()
+        if n
+    ]
+    if rows:
+        t = PipelineDurationHistDaily
+        await _upsert_additive(db, t, rows, [t.day, t.gitlab_project, t.ref, t.bucket], ("count",))
+
+    j_cols = ("runs", "failed", "flaky")
+    rows = _compact(
+        [{"day": d, "gitlab_project": proj, "job_name": name, **dict(zip(j_cols, vals))} for (d, proj, name), vals in delta.jobs.items()],
+        j_cols,
+    )
+    if rows:
+        t = PipelineJobStatsDaily
+        await _upsert_additive(db, t, rows, [t.day, t.gitlab_project, t.job_name], j_cols)
+
+
+def _event_record(ev: PipelineEvent) -> dict[str, Any]:
+    return {
+        "status": ev.status,
+        "created_at": ev.created_at,
+        "gitlab_project": ev.gitlab_project,
+        "ref": ev.ref,
+        "duration_seconds": ev.duration_seconds,
+        "jobs": (expand_json(ev.payload) or {}).get("jobs") or {},
+    }
+
+
+async def rebuild_pipeline_stats(db: AsyncSession, batch_size: int = 1000) -> int:
+    """Construit les rollups depuis `pipeline_events` s'ils sont vides (premier démarrage)."""
+    if (await db.execute(select(PipelineStatsDaily.day).limit(1))).first() is not None:
+        return 0
+    counted = 0
+    last_id = ""
+    while True:
+        res = await db.execute(
+            select(PipelineEvent)
+            .where(PipelineEvent.id > last_id, PipelineEvent.status.in_(OUTCOMES))
+            .order_by(PipelineEvent.id.asc())
+            .limit(batch_size)
+        )
+        batch = list(res.scalars().all())
+        if not batch:
+            break
+        delta = PipelineDelta()
+        for ev in batch:
+            delta.add(_event_record(ev))
+        await apply_delta(db, delta)
+        counted += len(batch)
+        last_id = batch[-1].id
+    await db.commit()
+    return counted
+
+
+async def pipeline_stats(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    project: Optional[str] = None,
+    ref: Optional[str] = None,
+    flaky_limit: int = 20,
+) -> dict[str, Any]:
+    """Agrégats sur les rollups journaliers: coût proportionnel à la fenêtre, pas à l'historique."""
+    start_d = _day(start)
+
+    def _scope(model, with_ref: bool = True):
+        conds = [model.day >= start_d, model.day < end]
+        if project is not None:
+            conds.append(model.gitlab_project == project)
+        if ref is not None and with_ref:
+            conds.append(model.ref == ref)
+        return conds
+
+    P = PipelineStatsDaily
+    by_ref = await db.execute(
+        select(
+            P.ref,
+            func.sum(P.total),
+            func.sum(P.success),
+            func.sum(P.failed),
+            func.sum(P.canceled),
+            func.sum(P.duration_sum),
+            func.sum(P.duration_count),
+        )
+        .where(*_scope(P))
+        .group_by(P.ref)
+        .order_by(func.sum(P.total).desc())
+    )
+    refs = []
+    totals = [0, 0, 0, 0, 0.0, 0]
+    for r, total, ok, failed, canceled, dsum, dcount in by_ref.all():
+        vals = [int(total or 0), int(ok or 0), int(failed or 0), int(canceled or 0), float(dsum or 0.0), int(dcount or 0)]
+        totals = [a + b for a, b in zip(totals, vals)]
+        if vals[0]:
+            refs.append({"ref": r, "total": vals[0], "failed": vals[2], "failure_rate": _rate(vals[2], vals[1] + vals[2])})
+
+    H = PipelineDurationHistDaily
+    hist_res = await db.execute(select(H.bucket, func.sum(H.count)).where(*_scope(H)).group_by(H.bucket))
+    hist = {int(b): int(n or 0) for b, n in hist_res.all()}
+    q = histogram_quantiles(hist, (0.5, 0.95))
+
+    J = PipelineJobStatsDaily
+    jobs_res = await db.execute(
+        select(J.gitlab_project, J.job_name, func.sum(J.runs), func.sum(J.failed), func.sum(J.flaky))
+        .where(*_scope(J, with_ref=False))
+        .group_by(J.gitlab_project, J.job_name)
+        .having(func.sum(J.flaky) > 0)
+        .order_by(func.sum(J.flaky).desc())
+        .limit(flaky_limit)
+    )
+
+    return {
+        "start": start_d,
+        "end": end,
+        "pipelines": totals[0],
+        "success": totals[1],
+        "failed": totals[2],
+        "canceled": totals[3],
+        "failure_rate": _rate(totals[2], totals[1] + totals[2]),
+        "duration": {
+            "p50_seconds": q[0.5],
+            "p95_seconds": q[0.95],
+            "mean_seconds": (totals[4] / totals[5]) if totals[5] else None,
+        },
+        "by_ref": refs,
+        "flaky_jobs": [
+            {
+                "project": proj,
+                "job": name,
+                "runs": int(runs or 0),
+                "failed": int(failed or 0),
+                "flaky": int(flaky or 0),
+                "flaky_rate": _rate(int(flaky or 0), int(runs or 0)),
+            }
+            for proj, name, runs, failed, flaky in jobs_res.all()
+        ],
+    }
+
+
+def _rate(n: int, d: int) -> Optional[float]:
+    return (n / d) if d else None
+
+
+def default_window(days: int, end: Optional[datetime] = None) -> tuple[datetime, datetime]:
+    end = end or datetime.utcnow()
+    return end - timedelta(days=days), end
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.database as database
+from app.models import Alert, AlertStatus, PipelineEvent, Priority, Project, Sprint, Task, TaskStatus
+from app.v2.services.cache import SingleFlightCache
+from app.v2.services.events import bus
+
+OPEN_TASK_STATUSES = (TaskStatus.TODO, TaskStatus.IN_PROGRESS)
+
+
+def _count_if(cond, label: str):
+    return func.sum(case((cond, 1), else_=0)).label(label)
+
+
+async def project_overview(db: AsyncSession, now: Optional[datetime] = None) -> list[dict[str, Any]]:
+    """Projets + compteurs, en une seule requête.
+
+    Chaque indicateur est une sous-requête agrégée par project_id jointe en
+    LEFT JOIN: tâches ouvertes par statut (GROUP BY), alertes ouvertes par
+    sévérité (GROUP BY), sprint actif (ROW_NUMBER() par projet, rang 1). Le
+    dernier pipeline est une sous-requête corrélée LIMIT 1 par projet (index
+    (project_id, created_at)): l'historique des pipelines n'est pas parcouru.
+    """
+    now = now or datetime.utcnow()
+    tasks = (
+        select(Task.project_id, *(_count_if(Task.status == st, st.value) for st in OPEN_TASK_STATUSES))
+        .where(Task.status != TaskStatus.DONE)
+        .group_by(Task.project_id)
+        .subquery()
+    )
+    alerts = (
+        select(Alert.project_id, *(_count_if(Alert.severity == p, p.value) for p in Priority))
+        .where(Alert.status == AlertStatus.OPEN, Alert.project_id.is_not(None))
+        .group_by(Alert.project_id)
+        .subquery()
+    )
+    sprints = (
+        select(
+            Sprint.project_id,
+            Sprint.id,
+            Sprint.name,
+            Sprint.start_date,
+            Sprint.end_date,
+            func.row_number().over(partition_by=Sprint.project_id, order_by=Sprint.start_date.desc()).label("rn"),
+        )
+        .where(Sprint.start_date <= now, Sprint.end_date >= now)
+        .subquery()
+    )
+    latest_pipeline = (
+        select(PipelineEvent.id)
+        .where(PipelineEvent.project_id == Project.id)
+        .order_by(PipelineEvent.created_at.desc())
+        .limit(1)
+        .correlate(Project)
+        .scalar_subquery()
+    )
+    q = (
+        select(
+            Project,
+            *(tasks.c[st.value] for st in OPEN_TASK_STATUSES),
+            *(alerts.c[p.value] for p in Priority),
+            sprints.c.id,
+            sprints.c.name,
+            sprints.c.start_date,
+            sprints.c.end_date,
+            PipelineEvent.status,
+            PipelineEvent.ref,
+            PipelineEvent.url,
+            PipelineEvent.created_at,
+        )
+        .outerjoin(tasks, tasks.c.project_id == Project.id)
+        .outerjoin(alerts, alerts.c.project_id == Project.id)
+        .outerjoin(sprints, and_(sprints.c.project_id == Project.id, sprints.c.rn == 1))
+        .outerjoin(PipelineEvent, PipelineEvent.id == latest_pipeline)
+        .order_by(Project.created_at.desc())
+    )
+    n_tasks, n_alerts = len(OPEN_TASK_STATUSES), len(Priority)
+    out = []
+    for row in (await db.execute(q)).all():
+        p = row[0]
+        task_counts = row[1 : 1 + n_tasks]
+        alert_counts = row[1 + n_tasks : 1 + n_tasks + n_alerts]
+        s_id, s_name, s_start, s_end, pl_status, pl_ref, pl_url, pl_at = row[1 + n_tasks + n_alerts :]
+        out.append(
+            {
+                "id": p.id,
+                "key": p.key,
+                "name": p.name,
+                "description": p.description,
+                "gitlab_project": p.gitlab_project,
+                "created_at": p.created_at,
+                "open_tasks": {st.value: int(n or 0) for st, n in zip(OPEN_TASK_STATUSES, task_counts)},
+                "open_alerts": {pr.value: int(n or 0) for pr, n in zip(Priority, alert_counts)},
+                "active_sprint": (
+                    {"id": s_id, "name": s_name, "start_date": s_start, "end_date": s_end} if s_id else None
+                ),
+                "pipeline": (
+                    {"status": pl_status, "ref": pl_ref, "url": pl_url, "updated_at": pl_at} if pl_status else None
+                ),
+            }
+        )
+    return out
+
+
+cache = SingleFlightCache(ttl_seconds=float(os.getenv("PROJECTS_CACHE_SECONDS", "30")), max_entries=4)
+
+
+# Seuls ces changements de tâches touchent les compteurs (pas commentaires, assignés...)
+_TASK_ACTIONS = frozenset({"created", "updated", "moved"})
+
+
+def _invalidate_on_change(event: dict[str, Any]) -> None:
+    topic, data = event.get("topic"), event.get("data") or {}
+    if topic == "tasks" and data.get("action") not in _TASK_ACTIONS:
+        return
+    # Alertes sans projet (ingestion Alertmanager): hors de la vue, pas d'invalidation
+    if topic == "tickets" and not data.get("project_id"):
+        return
+    if topic in ("projects", "tasks", "tickets", "pipeline"):
+        cache.invalidate()
+
+
+bus.add_listener(_invalidate_on_change)
+
+
+async def _load() -> list[dict[str, Any]]:
+    async with database.SessionLocal() as db:
+        return await project_overview(db)
+
+
+async def projects_overview() -> list[dict[str, Any]]:
+    return await cache.get_or_load("projects", _load)
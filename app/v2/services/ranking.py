@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import math
+import os
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import app.database as database
+from app.models import Task, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+# Rangs fractionnaires (style LexoRank): chaînes base 36 comparées lexicographiquement,
+# lues comme des fractions 0.xxx. Entre deux rangs il en existe toujours un autre:
+# insérer/déplacer une carte ne réécrit qu'une ligne. Minuscules + chiffres seulement
+# pour que l'ordre soit le même quelle que soit la collation (SQLite, Postgres).
+DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+_INDEX = {c: i for i, c in enumerate(DIGITS)}
+
+# Au-delà, la colonne est renumérotée en tâche de fond (les clés s'allongent
+# d'un caractère toutes les ~5 insertions répétées entre deux mêmes voisins).
+MAX_RANK_LENGTH = int(os.getenv("TASK_RANK_MAX_LENGTH", "24"))
+# Borne ouverte (début/fin de colonne): pas fixe de 1 sur le STEP_DIGITS-ième
+# chiffre, soit 36^4 ≈ 1,7 M ajouts en bout de colonne sans allonger les clés.
+STEP_DIGITS = 4
+
+
+def _encode(v: int, width: int) -> str:
+    chars = []
+    for _ in range(width):
+        v, r = divmod(v, BASE)
+        chars.append(DIGITS[r])
+    return "".join(reversed(chars)).rstrip("0")
+
+
+def _step(bound: str, up: bool) -> Optional[str]:
+    """Rang à un pas de `bound` vers la borne ouverte, sur STEP_DIGITS chiffres (None si épuisé)."""
+    head = bound[:STEP_DIGITS].ljust(STEP_DIGITS, "0")
+    v = int(head, BASE)
+    if up:
+        v += 1
+    elif head.rstrip("0") == bound:
+        # bound tient sur STEP_DIGITS chiffres: on descend d'un pas; sinon son préfixe est déjà plus petit
+        v -= 1
+    if v <= 0 or v >= BASE**STEP_DIGITS:
+        return None
+    return _encode(v, STEP_DIGITS)
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    # a < b (b=None: borne ouverte), aucun des deux ne finit par "0"
+    if b is not None:
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    da = _INDEX[a[0]] if a else 0
+    db = _INDEX[b[0]] if b is not None else BASE
+    if db - da > 1:
+        return DIGITS[(da + db) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[da] + _midpoint(a[1:], None)
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """Rang strictement entre `before` et `after` (None = début / fin de colonne)."""
+    a = before or ""
+    if after is not None and a >= after:
+        raise ValueError(f"invalid rank interval: {before!r} >= {after!r}")
+    # Une seule borne: pas fixe plutôt que bissection (qui allonge la clé toutes les ~6 insertions)
+    if a and after is None:
+        return _step(a, up=True) or _midpoint(a, None)
+    if not a and after is not None:
+        return _step(after, up=False) or _midpoint(a, after)
+    return _midpoint(a, after)
+
+
+def spread_ranks(n: int) -> list[str]:
+    """`n` rangs courts, croissants et régulièrement espacés (renumérotation)."""
+    if n <= 0:
+        return []
+    width = max(1, math.ceil(math.log(n + 1, BASE)) + 1)
+    step = BASE**width // (n + 1)
+    return [_encode(i * step, width) for i in range(1, n + 1)]
+
+
+def needs_rebalance(rank: Optional[str]) -> bool:
+    return rank is None or len(rank) > MAX_RANK_LENGTH
+
+
+async def last_rank(db: AsyncSession, project_id: str, status: TaskStatus) -> Optional[str]:
+    """Dernier rang d'une colonne (lecture d'index sur (project_id, status, rank))."""
+    res = await db.execute(select(func.max(Task.rank)).where(Task.project_id == project_id, Task.status == status))
+    return res.scalar_one_or_none()
+
+
+async def _neighbor_bound(
+    db: AsyncSession, project_id: str, status: TaskStatus, rank: str, exclude_id: Optional[str], below: bool
+) -> Optional[str]:
+    col = [Task.project_id == project_id, Task.status == status, Task.rank.is_not(None)]
+    if exclude_id:
+        col.append(Task.id != exclude_id)
+    if below:
+        q = select(func.min(Task.rank)).where(*col, Task.rank > rank)
+    else:
+        q = select(func.max(Task.rank)).where(*col, Task.rank < rank)
+    return (await db.execute(q)).scalar_one_or_none()
+
+
+async def place_rank(
+    db: AsyncSession,
+    project_id: str,
+    status: TaskStatus,
+    after_id: Optional[str] = None,
+    before_id: Optional[str] = None,
+    exclude_id: Optional[str] = None,
+) -> str:
+    """Rang pour insérer une tâche entre `after_id` (au-dessus) et `before_id` (en dessous).
+
+    Sans voisin: fin de colonne. Avec un seul voisin, l'autre borne est lue par
+    l'index. Des rangs égaux ou manquants (données anciennes, insertions concurrentes)
+    déclenchent une renumérotation immédiate de la colonne puis un second essai.
+    Lève ValueError si un voisin n'existe pas ou n'est pas dans la colonne cible.
+    """
+    wanted = [i for i in (after_id, before_id) if i]
+    for attempt in range(2):
+        ranks: dict[str, Optional[str]] = {}
+        if wanted:
+            res = await db.execute(select(Task.id, Task.project_id, Task.status, Task.rank).where(Task.id.in_(wanted)))
+            for tid, pid, st, rank in res.all():
+                if pid != project_id or st != status:
+                    raise ValueError(f"task {tid} is not in the target column")
+                ranks[tid] = rank
+            missing = [i for i in wanted if i not in ranks]
+            if missing:
+                raise ValueError(f"task {missing[0]} not found")
+
+        try:
+            if any(r is None for r in ranks.values()):
+                raise ValueError("unranked neighbor")
+            lo = ranks.get(after_id) if after_id else None
+            hi = ranks.get(before_id) if before_id else None
+            if after_id and (not before_id or hi <= lo):
+                hi = await _neighbor_bound(db, project_id, status, lo, exclude_id, below=True)
+            elif before_id and not after_id:
+                lo = await _neighbor_bound(db, project_id, status, hi, exclude_id, below=False)
+            elif not wanted:
+                lo = await last_rank(db, project_id, status)
+            return rank_between(lo, hi)
+        except ValueError:
+            if attempt:
+                raise
+            await rebalance_column(db, project_id, status)
+    raise AssertionError("unreachable")
+
+
+class _Column:
+    """Colonne triée en mémoire: [(rank, id)] pour les déplacements en lot."""
+
+    def __init__(self, items: list[tuple[Optional[str], str]]) -> None:
+        self.items = sorted(items, key=lambda x: (x[0] is None, x[0] or "", x[1]))
+        self.renumbered: list[str] = []
+        ranks = [r for r, _ in self.items]
+        # Rangs manquants ou égaux: renuméroter dans la même transaction que le lot
+        if any(r is None for r in ranks) or len(set(ranks)) != len(ranks):
+            self.items = [(r, tid) for r, (_, tid) in zip(spread_ranks(len(self.items)), self.items)]
+            self.renumbered = [tid for _, tid in self.items]
+
+    def rank_of(self, task_id: str) -> Optional[str]:
+        for r, tid in self.items:
+            if tid == task_id:
+                return r
+        return None
+
+    def remove(self, rank: str, task_id: str) -> None:
+        i = bisect.bisect_left(self.items, (rank, task_id))
+        if i < len(self.items) and self.items[i] == (rank, task_id):
+            self.items.pop(i)
+
+    def place(self, task_id: str, after_id: Optional[str], before_id: Optional[str]) -> str:
+        lo = self.rank_of(after_id) if after_id else None
+        hi = self.rank_of(before_id) if before_id else None
+        if (after_id and lo is None) or (before_id and hi is None):
+            raise ValueError(f"neighbor of task {task_id} is not in the target column")
+        if after_id and (not before_id or hi <= lo):
+            i = bisect.bisect_right(self.items, (lo, after_id))
+            hi = self.items[i][0] if i < len(self.items) else None
+        elif before_id and not after_id:
+            i = bisect.bisect_left(self.items, (hi, before_id))
+            lo = self.items[i - 1][0] if i > 0 else None
+        elif not after_id:
+            lo = self.items[-1][0] if self.items else None
+        rank = rank_between(lo, hi)
+        bisect.insort(self.items, (rank, task_id))
+        return rank
+
+
+async def move_tasks(db: AsyncSession, moves: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Applique une liste ordonnée de déplacements {id, status?, after_id?, before_id?}.
+
+    Deux lectures (tâches déplacées, puis leurs colonnes source/cible), placement en
+    mémoire dans l'ordre de la liste, puis un UPDATE groupé. Aucun commit.
+    Retourne [{id, project_id, status, rank, old_status, old_rank}] dans l'ordre des
+    déplacements (la dernière position l'emporte si une tâche apparaît plusieurs fois).
+    Lève ValueError (tâche ou voisin introuvable / hors colonne cible).
+    """
+    ids = list(dict.fromkeys(m["id"] for m in moves))
+    res = await db.execute(select(Task.id, Task.project_id, Task.status, Task.rank).where(Task.id.in_(ids)))
+    current = {tid: {"project_id": pid, "status": st, "rank": rank} for tid, pid, st, rank in res.all()}
+    missing = [i for i in ids if i not in current]
+    if missing:
+        raise ValueError(f"task {missing[0]} not found")
+
+    targets: list[Optional[TaskStatus]] = [TaskStatus(m["status"]) if m.get("status") else None for m in moves]
+    keys = {(t["project_id"], t["status"]) for t in current.values()}
+    keys |= {(current[m["id"]]["project_id"], st) for m, st in zip(moves, targets) if st is not None}
+    res = await db.execute(
+        select(Task.id, Task.project_id, Task.status, Task.rank).where(
+            Task.project_id.in_({p for p, _ in keys}), Task.status.in_({s for _, s in keys})
+        )
+    )
+    grouped: dict[tuple[str, TaskStatus], list[tuple[Optional[str], str]]] = {k: [] for k in keys}
+    for tid, pid, st, rank in res.all():
+        if (pid, st) in grouped:
+            grouped[(pid, st)].append((rank, tid))
+    columns = {k: _Column(items) for k, items in grouped.items()}
+
+    renumbered: dict[str, str] = {}
+    for col in columns.values():
+        renumbered.update({tid: r for r, tid in col.items if tid in col.renumbered})
+    state = {
+        tid: {"status": t["status"], "rank": renumbered.get(tid, t["rank"])} for tid, t in current.items()
+    }
+
+    results: dict[str, dict[str, Any]] = {}
+    for m, target in zip(moves, targets):
+        tid = m["id"]
+        project_id = current[tid]["project_id"]
+        st = state[tid]
+        columns[(project_id, st["status"])].remove(st["rank"], tid)
+        st["status"] = target or st["status"]
+        st["rank"] = columns[(project_id, st["status"])].place(tid, m.get("after_id"), m.get("before_id"))
+        results[tid] = {
+            "id": tid,
+            "project_id": project_id,
+            "status": st["status"],
+            "rank": st["rank"],
+            "old_status": current[tid]["status"],
+            "old_rank": current[tid]["rank"],
+        }
+
+    now = datetime.utcnow()
+    others = [{"id": tid, "rank": r} for tid, r in renumbered.items() if tid not in results]
+    if others:
+        await db.execute(update(Task), others)
+    await db.execute(
+        update(Task), [{"id": r["id"], "status": r["status"], "rank": r["rank"], "updated_at": now} for r in results.values()]
+    )
+    return list(results.values())
+
+
+async def rebalance_column(db: AsyncSession, project_id: str, status: TaskStatus) -> int:
+    """Renumérote une colonne (ordre courant conservé), sans commit."""
+    res = await db.execute(
+        select(Task.id)
+        .where(Task.project_id == project_id, Task.status == status)
+        # Rangs NULL (tâches antérieures aux rangs) en fin, dans l'ordre historique
+        .order_by(Task.rank.is_(None), Task.rank.asc(), Task.position.asc(), Task.created_at.asc(), Task.id.asc())
+    )
+    ids = list(res.scalars().all())
+    if ids:
+        await db.execute(update(Task), [{"id": i, "rank": r} for i, r in zip(ids, spread_ranks(len(ids)))])
+    return len(ids)
+
+
+async def columns_to_rebalance(
+    db: AsyncSession, since: Optional[datetime] = None
+) -> list[tuple[str, TaskStatus]]:
+    """Colonnes avec une tâche sans rang ou à rang trop long.
+
+    `since` limite la recherche aux tâches modifiées depuis cette date (index
+    sur updated_at); sans `since`, toute la table est parcourue (démarrage).
+    """
+    q = select(Task.project_id, Task.status).where(
+        (Task.rank.is_(None)) | (func.length(Task.rank) > MAX_RANK_LENGTH)
+    )
+    if since is not None:
+        q = q.where(Task.updated_at >= since)
+    res = await db.execute(q.group_by(Task.project_id, Task.status))
+    return [(p, s) for p, s in res.all()]
+
+
+async def backfill_task_ranks(db: AsyncSession) -> int:
+    """Attribue un rang aux tâches qui n'en ont pas (démarrage), colonne par colonne."""
+    total = 0
+    for project_id, status in await columns_to_rebalance(db):
+        total += await rebalance_column(db, project_id, status)
+        await db.commit()
+    return total
+
+
+class RankRebalancer:
+    """Renumérote en tâche de fond les colonnes dont les rangs deviennent trop longs.
+
+    Les routes signalent une colonne avec `request()` (aucun accès base); le worker
+    traite chaque colonne dans sa propre transaction courte. Une passe
+    (`columns_to_rebalance`) tourne aussi à intervalle régulier pour rattraper un
+    signal perdu (autre instance), limitée aux tâches modifiées depuis la passe
+    précédente: le parcours complet n'a lieu qu'au démarrage (`backfill_task_ranks`).
+    """
+
+    def __init__(self, interval_seconds: float = 600.0) -> None:
+        self.interval_seconds = interval_seconds
+        self._last_pass = datetime.utcnow()
+        self._pending: set[tuple[str, TaskStatus]] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def request(self, project_id: str, status: TaskStatus) -> None:
+        self._pending.add((project_id, status))
+        self._wake.set()
+
+    async def run_once(self) -> int:
+        started = datetime.utcnow()
+        async with database.SessionLocal() as db:
+            columns = self._pending | set(await columns_to_rebalance(db, since=self._last_pass))
+            self._pending.clear()
+            done = 0
+            for project_id, status in columns:
+                await rebalance_column(db, project_id, status)
+                await db.commit()
+                done += 1
+        # Après succès seulement: une passe en échec est reprise depuis la même date
+        self._last_pass = started
+        return done
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("task rank rebalance failed")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+rebalancer = RankRebalancer(interval_seconds=float(os.getenv("TASK_RANK_REBALANCE_SECONDS", "600")))
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import gzip
+import json
+import logging
+import os
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from sqlalchemy import delete, exists, select, update
+
+import app.database as database
+from app.models import Alert, AlertStatus, AuditLog, PipelineEvent, TicketEvent
+from app.v2.services.audit_diff import compress_json, expand_json
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "archives")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return str(value)
+
+
+def _row_to_dict(row: Any) -> dict[str, Any]:
+    # Les payloads compactés sont archivés décompressés: les NDJSON restent lisibles tels quels
+    return {attr.key: expand_json(getattr(row, attr.key)) for attr in row.__mapper__.column_attrs}
+
+
+def _append_ndjson_gz(path: Path, rows: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Mode "ab": chaque lot est un membre gzip; les lecteurs gzip les enchaînent.
+    with gzip.open(path, "ab") as f:
+        for r in rows:
+            f.write(json.dumps(r, default=_json_default, ensure_ascii=False).encode("utf-8"))
+            f.write(b"\n")
+
+
+async def archive_older_than(
+    model: Any,
+    days: int,
+    archive_dir: Optional[str] = None,
+    batch_size: int = 500,
+    max_batches: Optional[int] = None,
+    where: tuple = (),
+) -> int:
+    """Déplace les lignes de `model` plus vieilles que `days` jours vers des NDJSON.gz.
+
+    Un fichier par table et par jour de `created_at` (<dir>/<table>/<YYYY-MM-DD>.ndjson.gz).
+    Travaille par petits lots (une transaction courte par lot). L'archive est
+    écrite avant la suppression: en cas de crash entre les deux, le lot sera
+    ré-archivé au passage suivant (au moins une fois, jamais perdu).
+    `where` ajoute des conditions (ex: ne pas archiver une ligne encore référencée).
+    Retourne le nombre de lignes archivées.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    base = Path(archive_dir or ARCHIVE_DIR) / model.__tablename__
+    total = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        async with database.SessionLocal() as db:
+            res = await db.execute(
+                select(model)
+                .where(model.created_at < cutoff, *where)
+                .order_by(model.created_at.asc(), model.id.asc())
+                .limit(batch_size)
+            )
+            rows = list(res.scalars().all())
+            if not rows:
+                break
+
+            by_day: dict[str, list[dict[str, Any]]] = {}
+            for r in rows:
+                day = (r.created_at or cutoff).date().isoformat()
+                by_day.setdefault(day, []).append(_row_to_dict(r))
+            for day, items in by_day.items():
+                await asyncio.to_thread(_append_ndjson_gz, base / f"{day}.ndjson.gz", items)
+
+            await db.execute(delete(model).where(model.id.in_([r.id for r in rows])))
+            await db.commit()
+
+        total += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+        # Laisser respirer la boucle / les autres transactions entre deux lots
+        await asyncio.sleep(0)
+
+    return total
+
+
+async def compact_older_than(
+    model: Any,
+    days: int,
+    where: tuple = (),
+    batch_size: int = 500,
+    max_batches: Optional[int] = None,
+    min_bytes: int = 256,
+) -> int:
+    """Compresse `payload` des lignes de `model` plus vieilles que `days` jours.
+
+    Les lignes restent en base (listes, stats, liens) mais leur payload passe au
+    format {"$z": ...} (voir audit_diff.expand_json pour le relire) et `compacted_at`
+    est renseigné. La sélection suit l'index partiel `compacted_at IS NULL`: chaque
+    passage ne relit que ce qui n'a pas encore été traité. Une transaction courte
+    par lot. Retourne le nombre de lignes compactées.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    total = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        async with database.SessionLocal() as db:
+            res = await db.execute(
+                select(model.id, model.payload)
+                .where(model.compacted_at.is_(None), model.created_at < cutoff, *where)
+                .order_by(model.created_at.asc(), model.id.asc())
+                .limit(batch_size)
+            )
+            rows = res.all()
+            if not rows:
+                break
+
+            now = datetime.utcnow()
+            await db.execute(
+                update(model),
+                [
+                    {"id": row_id, "payload": compress_json(payload, min_bytes) if payload else payload, "compacted_at": now}
+                    for row_id, payload in rows
+                ],
+            )
+            await db.commit()
+
+        total += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+        await asyncio.sleep(0)
+
+    return total
+
+
+def _days(name: str) -> int:
+    return int(os.getenv(name, "0"))
+
+
+async def run_audit_retention(archive_dir: Optional[str] = None) -> int:
+    days = _days("AUDIT_RETENTION_DAYS")
+    if days <= 0:
+        return 0
+    return await archive_older_than(AuditLog, days, archive_dir=archive_dir)
+
+
+# Seules les alertes résolues vieillissent; un ticket avec historique reste en base
+_ALERT_COLD = (Alert.status == AlertStatus.RESOLVED,)
+_ALERT_ARCHIVABLE = _ALERT_COLD + (~exists().where(TicketEvent.ticket_id == Alert.id),)
+# Un pipeline encore en cours peut recevoir des webhooks (fusion des jobs)
+_PIPELINE_COLD = (PipelineEvent.status.in_(("success", "failed", "canceled", "skipped")),)
+
+
+async def run_alert_retention(archive_dir: Optional[str] = None) -> dict[str, int]:
+    out = {"alerts_compacted": 0, "alerts": 0}
+    days = _days("ALERT_COMPACT_DAYS")
+    if days > 0:
+        out["alerts_compacted"] = await compact_older_than(Alert, days, where=_ALERT_COLD)
+    days = _days("ALERT_RETENTION_DAYS")
+    if days > 0:
+        out["alerts"] = await archive_older_than(Alert, days, archive_dir=archive_dir, where=_ALERT_ARCHIVABLE)
+    return out
+
+
+async def run_pipeline_retention(archive_dir: Optional[str] = None) -> dict[str, int]:
+    out = {"pipeline_events_compacted": 0, "pipeline_events": 0}
+    days = _days("PIPELINE_COMPACT_DAYS")
+    if days > 0:
+        out["pipeline_events_compacted"] = await compact_older_than(PipelineEvent, days, where=_PIPELINE_COLD)
+    days = _days("PIPELINE_RETENTION_DAYS")
+    if days > 0:
+        out["pipeline_events"] = await archive_older_than(
+            PipelineEvent, days, archive_dir=archive_dir, where=_PIPELINE_COLD
+        )
+    return out
+
+
+class RetentionWorker:
+    """Exécute périodiquement les jobs de rétention (démarré par main.lifespan)."""
+
+    def __init__(self, interval_seconds: float = 3600.0) -> None:
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    async def run_once(self) -> dict[str, int]:
+        # Les rollups (alert_stats_hourly, pipeline_stats_daily) ne sont pas touchés:
+        # les statistiques restent exactes après compaction/archivage.
+        return {
+            "audit_logs": await run_audit_retention(),
+            **(await run_alert_retention()),
+            **(await run_pipeline_retention()),
+        }
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("retention run failed")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopping.set()
+        try:
+            # Laisser le lot en cours se terminer plutôt que de l'interrompre
+            await asyncio.wait_for(self._task, timeout=30)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        self._task = None
+
+
+retention_worker = RetentionWorker(interval_seconds=float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600")))
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Awaitable, Optional
+
+from app.v2.services.http import get_http_client
+
+# Slack: ~1 message/s par webhook (burst toléré), 429 + Retry-After au-delà.
+MAX_DIGEST_LINES = 20
+MAX_RETRIES_ON_429 = 3
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def format_digest(texts: list[str]) -> str:
+    """Fusionne les messages d'une fenêtre en un seul post (doublons comptés)."""
+    if len(texts) == 1:
+        return texts[0]
+    counts = Counter(texts)
+    lines = [f"*{len(texts)} notifications*"]
+    for text, n in counts.most_common(MAX_DIGEST_LINES):
+        lines.append(f"• {text}" + (f" (×{n})" if n > 1 else ""))
+    hidden = len(counts) - MAX_DIGEST_LINES
+    if hidden > 0:
+        lines.append(f"… +{hidden} autres")
+    return "\n".join(lines)
+
+
+class SlackCoalescer:
+    """Regroupe les messages destinés au même webhook sur une courte fenêtre.
+
+    `stage()` dépose le message et rend aussitôt un awaitable résolu à l'envoi
+    effectif du digest (ou en erreur, l'outbox peut donc réessayer): l'appelant
+    n'occupe pas de créneau d'envoi pendant la fenêtre. `post()` = stage + attente.
+    Les posts d'un même webhook sont sérialisés et espacés de `min_interval_seconds`.
+    """
+
+    def __init__(self, window_seconds: float = 2.0, min_interval_seconds: float = 1.0) -> None:
+        self.window_seconds = window_seconds
+        self.min_interval_seconds = min_interval_seconds
+        self._pending: dict[str, list[tuple[str, asyncio.Future]]] = {}
+        self._flushers: dict[str, asyncio.Task] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._next_allowed: dict[str, float] = {}
+        self._flush_now: Optional[asyncio.Event] = None
+
+    def _event(self) -> asyncio.Event:
+        if self._flush_now is None:
+            self._flush_now = asyncio.Event()
+        return self._flush_now
+
+    def stage(self, url: str, text: str) -> Awaitable[None]:
+        if self.window_seconds <= 0:
+            return asyncio.ensure_future(self._send(url, text))
+
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(url, []).append((text, fut))
+        task = self._flushers.get(url)
+        if task is None or task.done():
+            self._flushers[url] = asyncio.create_task(self._flush_later(url))
+        return fut
+
+    async def post(self, url: str, text: str) -> None:
+        await self.stage(url, text)
+
+    async def _flush_later(self, url: str) -> None:
+        try:
+            await asyncio.wait_for(self._event().wait(), timeout=self.window_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+        batch = self._pending.pop(url, [])
+        self._flushers.pop(url, None)
+        if not batch:
+            return
+        try:
+            await self._send(url, format_digest([text for text, _ in batch]))
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+        else:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_result(None)
+
+    async def _send(self, url: str, text: str) -> None:
+        lock = self._locks.setdefault(url, asyncio.Lock())
+        async with lock:
+            for attempt in range(MAX_RETRIES_ON_429 + 1):
+                wait = self._next_allowed.get(url, 0.0) - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                resp = await get_http_client().post(url, json={"text": text})
+                self._next_allowed[url] = time.monotonic() + self.min_interval_seconds
+                if resp.status_code == 429 and attempt < MAX_RETRIES_ON_429:
+                    try:
+                        retry_after = float(resp.headers.get("Retry-After", "1"))
+                    except ValueError:
+                        retry_after = 1.0
+                    self._next_allowed[url] = time.monotonic() + max(retry_after, self.min_interval_seconds)
+                    continue
+                resp.raise_for_status()
+                return
+
+    async def drain(self) -> None:
+        """Envoie immédiatement les digests en attente (arrêt de l'app)."""
+        self._event().set()
+        tasks = list(self._flushers.values())
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._flush_now = None
+
+
+coalescer = SlackCoalescer(
+    window_seconds=_env_float("SLACK_COALESCE_WINDOW_SECONDS", 2.0),
+    min_interval_seconds=_env_float("SLACK_MIN_INTERVAL_SECONDS", 1.0),
+)
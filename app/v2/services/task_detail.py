@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import and_, delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models import Task, TaskAssignee, TaskComment, TaskStatus, User
+from app.v2.services.pagination import decode_time_cursor, encode_time_cursor
+
+
+async def comments_page(db: AsyncSession, task_id: str, cursor: Optional[str], limit: int) -> dict[str, Any]:
+    """Commentaires d'une tâche, du plus ancien au plus récent.
+
+    Keyset sur (created_at, id) (index ix_task_comments_task_created); les auteurs
+    sont chargés par un seul SELECT ... IN (selectinload), pas un par commentaire.
+    Lève ValueError si le curseur est illisible.
+    """
+    q = select(TaskComment).options(selectinload(TaskComment.user)).where(TaskComment.task_id == task_id)
+    if cursor:
+        c_at, c_id = decode_time_cursor(cursor)
+        q = q.where(
+            or_(TaskComment.created_at > c_at, and_(TaskComment.created_at == c_at, TaskComment.id > c_id))
+        )
+    res = await db.execute(q.order_by(TaskComment.created_at.asc(), TaskComment.id.asc()).limit(limit + 1))
+    rows = list(res.scalars().all())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_time_cursor(rows[-1].created_at, rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+async def task_detail(db: AsyncSession, task_id: str, comments_limit: int) -> Optional[dict[str, Any]]:
+    """Tâche + assignés (avec utilisateurs) + première page de commentaires.
+
+    Nombre de requêtes fixe: la tâche, ses assignés, leurs utilisateurs
+    (selectinload en chaîne), puis la page de commentaires et ses auteurs.
+    """
+    res = await db.execute(
+        select(Task)
+        .options(selectinload(Task.assignees).selectinload(TaskAssignee.user))
+        .where(Task.id == task_id)
+    )
+    task = res.scalar_one_or_none()
+    if task is None:
+        return None
+    return {"task": task, "comments": await comments_page(db, task_id, None, comments_limit)}
+
+
+async def assignees_of(db: AsyncSession, task_id: str) -> list[TaskAssignee]:
+    res = await db.execute(
+        select(TaskAssignee)
+        .options(selectinload(TaskAssignee.user))
+        .where(TaskAssignee.task_id == task_id)
+        .order_by(TaskAssignee.created_at.asc())
+    )
+    return list(res.scalars().all())
+
+
+async def set_assignees(db: AsyncSession, task_id: str, user_ids: list[str]) -> tuple[list[str], list[str]]:
+    """Remplace les assignés d'une tâche (diff: un DELETE et un INSERT multi-lignes), sans commit.
+
+    Retourne (avant, après). Lève LookupError si un utilisateur n'existe pas.
+    """
+    wanted = list(dict.fromkeys(user_ids))
+    if wanted:
+        res = await db.execute(select(User.id).where(User.id.in_(wanted)))
+        found = set(res.scalars().all())
+        missing = [u for u in wanted if u not in found]
+        if missing:
+            raise LookupError(f"user {missing[0]} not found")
+
+    res = await db.execute(select(TaskAssignee.user_id).where(TaskAssignee.task_id == task_id))
+    current = list(res.scalars().all())
+    removed = [u for u in current if u not in wanted]
+    added = [u for u in wanted if u not in current]
+    if removed:
+        await db.execute(
+            delete(TaskAssignee).where(TaskAssignee.task_id == task_id, TaskAssignee.user_id.in_(removed))
+        )
+    if added:
+        await db.execute(insert(TaskAssignee), [{"task_id": task_id, "user_id": u} for u in added])
+    return sorted(current), sorted(wanted)
+
+
+async def my_tasks(
+    db: AsyncSession,
+    user_id: str,
+    status: Optional[TaskStatus],
+    cursor: Optional[str],
+    limit: int,
+) -> dict[str, Any]:
+    """Tâches assignées à `user_id`, les plus récemment modifiées d'abord (keyset sur (updated_at, id)).
+
+    Le filtre part de ix_task_assignees_user_task: coût proportionnel aux
+    tâches de l'utilisateur, pas à la table.
+    """
+    q = select(Task).join(TaskAssignee, TaskAssignee.task_id == Task.id).where(TaskAssignee.user_id == user_id)
+    if status is not None:
+        q = q.where(Task.status == status)
+    if cursor:
+        c_at, c_id = decode_time_cursor(cursor)
+        q = q.where(or_(Task.updated_at < c_at, and_(Task.updated_at == c_at, Task.id < c_id)))
+    res = await db.execute(q.order_by(Task.updated_at.desc(), Task.id.desc()).limit(limit + 1))
+    rows = list(res.scalars().all())
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_time_cursor(rows[-1].updated_at, rows[-1].id)
+    return {"items": rows, "next_cursor": next_cursor}
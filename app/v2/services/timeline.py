@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import heapq
+import os
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Sprint, Task, TaskAssignee, User
+from app.v2.services.dependencies import graphs
+
+# Heures de travail par jour: estimate_hours -> longueur de barre
+HOURS_PER_DAY = float(os.getenv("TIMELINE_HOURS_PER_DAY", "8"))
+# Barre minimale pour une tâche sans estimation (heures calendaires)
+MIN_BAR_HOURS = 4.0
+GROUPS = ("sprint", "assignee")
+
+
+def _pack_rows(bars: list[tuple[float, float, int]]) -> tuple[dict[int, int], int]:
+    """Empile des intervalles [start, end) sur le minimum de lignes (glouton, tas des fins).
+
+    `bars` = [(start, end, index)]; retourne ({index: ligne}, nombre de lignes).
+    """
+    rows: dict[int, int] = {}
+    free: list[tuple[float, int]] = []  # (fin, ligne)
+    count = 0
+    for start, end, idx in sorted(bars):
+        if free and free[0][0] <= start:
+            _, row = heapq.heappop(free)
+        else:
+            row = count
+            count += 1
+        rows[idx] = row
+        heapq.heappush(free, (end, row))
+    return rows, count
+
+
+def _hours(delta: timedelta) -> float:
+    return round(delta.total_seconds() / 3600, 2)
+
+
+async def project_timeline(
+    db: AsyncSession,
+    project_id: str,
+    group_by: str = "sprint",
+    sprint_id: Optional[str] = None,
+    anchor: Optional[datetime] = None,
+) -> dict[str, Any]:
+    """Disposition Gantt calculée côté serveur, en colonnes (tableaux parallèles).
+
+    Placement d'une barre: fin = due_at si renseignée, début = fin - durée;
+    sinon début = `anchor` + date au plus tôt du chemin critique (dépendances),
+    convertie en jours ouvrés (HOURS_PER_DAY). Les barres d'un couloir (sprint ou
+    assigné) sont empilées sur le minimum de lignes sans chevauchement.
+    Positions en heures depuis `origin` (début de la première barre).
+    """
+    anchor = anchor or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    q = select(Task.id, Task.title, Task.status, Task.sprint_id, Task.due_at, Task.estimate_hours).where(
+        Task.project_id == project_id
+    )
+    if sprint_id:
+        q = q.where(Task.sprint_id == sprint_id)
+    tasks = (await db.execute(q)).all()
+
+    graph = await graphs.get(db, project_id)
+    cp = graph.critical_path()
+    earliest = dict(zip(cp["order"], cp["earliest_start"]))
+    critical = set(cp["path"])
+
+    placed: dict[str, tuple[datetime, datetime]] = {}
+    for tid, _title, _st, _sprint, due_at, estimate in tasks:
+        length = timedelta(hours=max(MIN_BAR_HOURS, 24 * float(estimate or 0) / HOURS_PER_DAY))
+        if due_at is not None:
+            placed[tid] = (due_at - length, due_at)
+        else:
+            start = anchor + timedelta(hours=24 * earliest.get(tid, 0.0) / HOURS_PER_DAY)
+            placed[tid] = (start, start + length)
+
+    # Couloirs: (clé, libellé, ordre) puis les tâches de chaque couloir
+    lane_of: dict[str, list[Optional[str]]] = {}
+    lanes: list[tuple[Optional[str], str]] = []
+    if group_by == "assignee":
+        q = (
+            select(TaskAssignee.task_id, User.id, User.first_name, User.last_name)
+            .join(User, User.id == TaskAssignee.user_id)
+            .join(Task, Task.id == TaskAssignee.task_id)
+            .where(Task.project_id == project_id)
+        )
+        if sprint_id:
+            q = q.where(Task.sprint_id == sprint_id)
+        names: dict[str, str] = {}
+        for tid, uid, first, last in (await db.execute(q)).all():
+            lane_of.setdefault(tid, []).append(uid)
+            names[uid] = f"{first} {last}"
+        lanes = sorted(names.items(), key=lambda kv: kv[1].lower())
+    else:
+        res = await db.execute(
+            select(Sprint.id, Sprint.name).where(Sprint.project_id == project_id).order_by(Sprint.start_date.asc())
+        )
+        lanes = [(sid, name) for sid, name in res.all()]
+        for tid, _title, _st, t_sprint, _due, _est in tasks:
+            lane_of[tid] = [t_sprint]
+    lane_index = {key: i for i, (key, _) in enumerate(lanes)}
+    if any(lane_of.get(t[0], [None])[0] not in lane_index for t in tasks):
+        # Couloir "sans sprint" / "non assigné" en dernier
+        lane_index[None] = len(lanes)
+        lanes.append((None, ""))
+
+    origin = min((s for s, _ in placed.values()), default=anchor)
+    bars: dict[str, list] = {k: [] for k in ("task_id", "title", "status", "lane", "row", "start", "end", "critical")}
+    first_bar: dict[str, int] = {}
+    per_lane: dict[int, list[tuple[float, float, int]]] = {}
+    for tid, title, st, _sprint, _due, _est in sorted(tasks, key=lambda t: placed[t[0]][0]):
+        start, end = placed[tid]
+        s, e = _hours(start - origin), _hours(end - origin)
+        for key in lane_of.get(tid) or [None]:
+            lane = lane_index.get(key, lane_index.get(None, 0))
+            idx = len(bars["task_id"])
+            first_bar.setdefault(tid, idx)
+            bars["task_id"].append(tid)
+            bars["title"].append(title)
+            bars["status"].append(getattr(st, "value", st))
+            bars["lane"].append(lane)
+            bars["start"].append(s)
+            bars["end"].append(e)
+            bars["critical"].append(1 if tid in critical else 0)
+            per_lane.setdefault(lane, []).append((s, e, idx))
+
+    bars["row"] = [0] * len(bars["task_id"])
+    lane_rows = [0] * len(lanes)
+    for lane, items in per_lane.items():
+        rows, count = _pack_rows(items)
+        lane_rows[lane] = count
+        for idx, row in rows.items():
+            bars["row"][idx] = row
+
+    edges: dict[str, list[int]] = {"from": [], "to": []}
+    for dep, succs in graph.succ.items():
+        if dep not in first_bar:
+            continue
+        for tid in succs:
+            if tid in first_bar:
+                edges["from"].append(first_bar[dep])
+                edges["to"].append(first_bar[tid])
+
+    return {
+        "project_id": project_id,
+        "group_by": group_by,
+        "origin": origin,
+        "unit": "hour",
+        "lanes": {"key": [k for k, _ in lanes], "label": [label for _, label in lanes], "rows": lane_rows},
+        "bars": bars,
+        "edges": edges,
+    }
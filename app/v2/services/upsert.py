@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Lignes par INSERT multi-VALUES (limite de paramètres SQLite/asyncpg ~32k)
+UPSERT_CHUNK = 1000
+
+
+def insert_for(db: AsyncSession):
+    """`insert()` du dialecte de la session, pour INSERT ... ON CONFLICT (PostgreSQL, SQLite)."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise RuntimeError(f"upsert not supported on {dialect}")
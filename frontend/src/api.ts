@@ -27,3 +27,46 @@ export async function apiFetch(path: string, init: RequestInit = {}) {
   }
   return body
 }
+
+export type StreamEvent = { event: string; data: any }
+
+// Flux SSE via fetch (EventSource ne permet pas d'envoyer le header Authorization).
+// Se reconnecte tant que le signal n'est pas annulé.
+export async function apiStream(path: string, onEvent: (ev: StreamEvent) => void, signal: AbortSignal) {
+  const url = API_BASE_URL ? `${API_BASE_URL}${path}` : path
+  let retryMs = 5000
+  while (!signal.aborted) {
+    try {
+      const headers = new Headers({ Accept: 'text/event-stream' })
+      const token = getToken()
+      if (token) headers.set('Authorization', `Bearer ${token}`)
+      const resp = await fetch(url, { headers, signal })
+      if (!resp.ok || !resp.body) throw new Error(`stream failed (${resp.status})`)
+      onEvent({ event: 'resync', data: null })
+
+      const reader = resp.body.pipeThrough(new TextDecoderStream()).getReader()
+      let buffer = ''
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += value
+        let sep: number
+        while ((sep = buffer.indexOf('\n\n')) >= 0) {
+          const block = buffer.slice(0, sep)
+          buffer = buffer.slice(sep + 2)
+          let event = 'message'
+          const data: string[] = []
+          for (const line of block.split('\n')) {
+            if (line.startsWith('event:')) event = line.slice(6).trim()
+            else if (line.startsWith('data:')) data.push(line.slice(5).trim())
+            else if (line.startsWith('retry:')) retryMs = Number(line.slice(6).trim()) || retryMs
+          }
+          if (data.length) onEvent({ event, data: JSON.parse(data.join('\n')) })
+        }
+      }
+    } catch (e) {
+      if (signal.aborted) return
+    }
+    await new Promise(resolve => window.setTimeout(resolve, retryMs))
+  }
+}
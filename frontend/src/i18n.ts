@@ -88,7 +88,9 @@ const resources = {
         estimate: 'Est',
         gitlabMr: 'GitLab MR',
         gitlabJob: 'GitLab Job',
-        note: "Note: drag&drop UI arrive dans l’itération suivante; la mise à jour est déjà câblée via l’API.",
+        note: "Glisser-déposer une carte pour la déplacer; les colonnes longues se chargent par pages.",
+        loadMore: 'Charger plus',
+        project: 'Projet',
       },
       calendar: {
         createEvent: 'Créer un événement',
@@ -257,7 +259,9 @@ const resources = {
         estimate: 'Est',
         gitlabMr: 'GitLab MR',
         gitlabJob: 'GitLab Job',
-        note: 'Note: drag&drop UI comes next iteration; updates already work via API.',
+        note: 'Drag and drop a card to move it; long columns load page by page.',
+        loadMore: 'Load more',
+        project: 'Project',
       },
       calendar: {
         createEvent: 'Create event',
@@ -1,5 +1,5 @@
 import { useEffect, useState } from 'react'
-import { apiFetch } from '../api'
+import { apiFetch, apiStream } from '../api'
 import { useTranslation } from 'react-i18next'
 
 type Alert = { id: string; title: string; severity: 'P0'|'P1'|'P2'|'P3'; status: 'OPEN'|'RESOLVED'; created_at: string }
@@ -24,23 +24,37 @@ export default function DashboardPage() {
     const load = async () => {
       try {
         setError(null)
-        const [a, t, p] = await Promise.all([
-          apiFetch('/v2/tickets?limit=5'),
-          apiFetch('/v2/tasks/today?limit=8'),
-          apiFetch('/v2/pipeline/status'),
-        ])
+        const d = await apiFetch('/v2/dashboard')
         if (!alive) return
-        setAlerts(a)
-        setTasksToday(t)
-        setPipeline(p)
+        setAlerts(d.tickets)
+        setTasksToday(d.tasks_today)
+        setPipeline(d.pipeline)
       } catch (e: any) {
         if (!alive) return
         setError(e?.message ?? t('dashboard.loadError'))
       }
     }
-    void load()
-    const id = window.setInterval(load, 5000)
-    return () => { alive = false; window.clearInterval(id) }
+
+    // Rechargement regroupé: une rafale d'événements = un seul appel
+    let timer: number | undefined
+    const schedule = (topic: string) => {
+      if (!['resync', 'tickets', 'tasks', 'pipeline'].includes(topic)) return
+      if (timer !== undefined) return
+      timer = window.setTimeout(() => {
+        timer = undefined
+        void load()
+      }, 300)
+    }
+
+    // Chargement initial; le flux renvoie un "resync" à chaque (re)connexion
+    schedule('resync')
+    const controller = new AbortController()
+    void apiStream('/v2/events/stream?topics=tickets,tasks,pipeline', ev => schedule(ev.event), controller.signal)
+    return () => {
+      alive = false
+      controller.abort()
+      if (timer !== undefined) window.clearTimeout(timer)
+    }
   }, [])
 
   return (
@@ -9,6 +9,7 @@ type Task = {
   status: 'TODO'|'IN_PROGRESS'|'DONE'
   priority: 'P0'|'P1'|'P2'|'P3'
   estimate_hours?: number | null
+  rank?: string | null
   gitlab_mr_url?: string | null
   gitlab_job_url?: string | null
 }
@@ -20,22 +21,43 @@ function priClass(p: Task['priority']) {
   return 'is-success'
 }
 
+function byRank(a: Task, b: Task) {
+  const ra = a.rank ?? ''
+  const rb = b.rank ?? ''
+  return ra < rb ? -1 : ra > rb ? 1 : a.id < b.id ? -1 : 1
+}
+
+type ColumnMeta = { count: number; next_cursor?: string | null }
+type Board = { columns: (ColumnMeta & { status: Task['status']; tasks: Task[] })[] }
+type Project = { id: string; name: string }
+
 function KanbanColumn(props: {
   col: Task['status']
   tasks: Task[]
-  moveTask: (taskId: string, status: Task['status']) => void
+  meta?: ColumnMeta
+  moveTask: (taskId: string, status: Task['status'], beforeId?: string) => void
+  loadMore: (status: Task['status']) => void
 }) {
   const { t: tr } = useTranslation()
   const [parent] = useAutoAnimate()
 
-  const { col, tasks, moveTask } = props
+  const { col, tasks, meta, moveTask, loadMore } = props
+
+  // Glisser-déposer: déposer sur une carte place la tâche juste au-dessus, sur la colonne à la fin
+  function onDrop(e: React.DragEvent, beforeId?: string) {
+    e.preventDefault()
+    e.stopPropagation()
+    const id = e.dataTransfer.getData('text/plain')
+    if (id && id !== beforeId) moveTask(id, col, beforeId)
+  }
 
   return (
     <div className="column">
-      <div className="box">
+      <div className="box" onDragOver={e => e.preventDefault()} onDrop={e => onDrop(e)}>
         <div className="mb-3">
           <span className="tag is-light">
             {col === 'TODO' ? tr('kanban.todo') : col === 'IN_PROGRESS' ? tr('kanban.inProgress') : tr('kanban.done')}
+            {meta && <span className="ml-1">({meta.count})</span>}
           </span>
         </div>
 
@@ -43,7 +65,14 @@ function KanbanColumn(props: {
 
         <div ref={parent}>
           {tasks.map(task => (
-            <article key={task.id} className="message is-light mb-3">
+            <article
+              key={task.id}
+              className="message is-light mb-3"
+              draggable
+              onDragStart={e => e.dataTransfer.setData('text/plain', task.id)}
+              onDragOver={e => e.preventDefault()}
+              onDrop={e => onDrop(e, task.id)}
+            >
               <div className="message-header">
                 <p style={{ overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap' }}>{task.title}</p>
                 <span className={`tag ${priClass(task.priority)}`}>{task.priority}</span>
@@ -66,6 +95,10 @@ function KanbanColumn(props: {
             </article>
           ))}
         </div>
+
+        {meta?.next_cursor && (
+          <button className="button is-small is-fullwidth" onClick={() => loadMore(col)}>{tr('kanban.loadMore')}</button>
+        )}
       </div>
     </div>
   )
@@ -74,31 +107,79 @@ function KanbanColumn(props: {
 export default function KanbanPage() {
   const { t: tr } = useTranslation()
   const [tasks, setTasks] = useState<Task[]>([])
+  const [meta, setMeta] = useState<Record<string, ColumnMeta>>({})
+  const [projects, setProjects] = useState<Project[]>([])
+  const [projectId, setProjectId] = useState<string>('')
   const [error, setError] = useState<string | null>(null)
 
   const columns = useMemo(() => {
     const by: Record<string, Task[]> = { TODO: [], IN_PROGRESS: [], DONE: [] }
     for (const t of tasks) by[t.status].push(t)
+    for (const k of Object.keys(by)) by[k].sort(byRank)
     return by
   }, [tasks])
 
+  async function loadProjects() {
+    try {
+      const data: Project[] = await apiFetch('/v2/projects')
+      setProjects(data)
+      if (data.length && !projectId) setProjectId(data[0].id)
+    } catch (e: any) {
+      setError(e?.message ?? tr('common.error'))
+    }
+  }
+
+  // Compteurs exacts + première page de chaque colonne; la suite à la demande
   async function load() {
+    if (!projectId) return
     setError(null)
     try {
-      const data = await apiFetch('/v2/tasks?limit=200')
-      setTasks(data)
+      const data: Board = await apiFetch(`/v2/board?project_id=${encodeURIComponent(projectId)}`)
+      setTasks(data.columns.flatMap(c => c.tasks))
+      setMeta(Object.fromEntries(data.columns.map(c => [c.status, { count: c.count, next_cursor: c.next_cursor }])))
+    } catch (e: any) {
+      setError(e?.message ?? tr('common.error'))
+    }
+  }
+
+  async function loadMore(status: Task['status']) {
+    const cursor = meta[status]?.next_cursor
+    if (!cursor) return
+    try {
+      const params = new URLSearchParams({ project_id: projectId, status, cursor })
+      const page: { tasks: Task[]; next_cursor?: string | null } = await apiFetch(`/v2/board/column?${params}`)
+      setTasks(prev => [...prev, ...page.tasks.filter(t => !prev.some(p => p.id === t.id))])
+      setMeta(prev => ({ ...prev, [status]: { ...prev[status], next_cursor: page.next_cursor } }))
     } catch (e: any) {
       setError(e?.message ?? tr('common.error'))
     }
   }
 
-  useEffect(() => { void load() }, [])
+  useEffect(() => { void loadProjects() }, [])
+  useEffect(() => { void load() }, [projectId])
 
-  async function moveTask(taskId: string, status: Task['status']) {
+  async function moveTask(taskId: string, status: Task['status'], beforeId?: string) {
     setError(null)
+    // Voisins dans la colonne cible (hors tâche déplacée): le serveur calcule un rang entre les deux
+    const col = columns[status].filter(t => t.id !== taskId)
+    const idx = beforeId ? col.findIndex(t => t.id === beforeId) : col.length
+    const afterId = idx > 0 ? col[idx - 1].id : undefined
     try {
-      await apiFetch(`/v2/tasks/${taskId}`, { method: 'PATCH', body: JSON.stringify({ status }) })
-      await load()
+      const res: { items: Pick<Task, 'id' | 'status' | 'rank'>[] } = await apiFetch('/v2/tasks/batch-move', {
+        method: 'POST',
+        body: JSON.stringify({ moves: [{ id: taskId, status, after_id: afterId, before_id: beforeId }] }),
+      })
+      // Seuls les rangs/statuts renvoyés changent: mise à jour locale, pas de rechargement du tableau
+      const moved = new Map(res.items.map(i => [i.id, i]))
+      const from = tasks.find(t => t.id === taskId)?.status
+      setTasks(prev => prev.map(t => (moved.has(t.id) ? { ...t, ...moved.get(t.id)! } : t)))
+      if (from && from !== status) {
+        setMeta(prev => ({
+          ...prev,
+          [from]: { ...prev[from], count: (prev[from]?.count ?? 1) - 1 },
+          [status]: { ...prev[status], count: (prev[status]?.count ?? 0) + 1 },
+        }))
+      }
     } catch (e: any) {
       setError(e?.message ?? tr('common.error'))
     }
@@ -111,6 +192,13 @@ export default function KanbanPage() {
           <h1 className="title is-5 mb-0">{tr('kanban.title')}</h1>
         </div>
         <div className="level-right">
+          {projects.length > 1 && (
+            <div className="select mr-2">
+              <select value={projectId} onChange={e => setProjectId(e.target.value)} aria-label={tr('kanban.project')}>
+                {projects.map(p => <option key={p.id} value={p.id}>{p.name}</option>)}
+              </select>
+            </div>
+          )}
           <button className="button is-dark" onClick={() => void load()}>{tr('common.refresh')}</button>
         </div>
       </div>
@@ -123,7 +211,9 @@ export default function KanbanPage() {
             key={col}
             col={col}
             tasks={columns[col]}
-            moveTask={(taskId, status) => void moveTask(taskId, status)}
+            meta={meta[col]}
+            moveTask={(taskId, status, beforeId) => void moveTask(taskId, status, beforeId)}
+            loadMore={status => void loadMore(status)}
           />
         ))}
       </div>
@@ -0,0 +1,215 @@
+import pytest
+from httpx import AsyncClient
+
+
+def _am_payload(n: int, status: str = "firing", offset: int = 0) -> dict:
+    return {
+        "version": "4",
+        "status": status,
+        "receiver": "opshub",
+        "commonLabels": {"job": "node"},
+        "alerts": [
+            {
+                "status": status,
+                "labels": {"alertname": "DiskFull", "instance": f"web-{i:04d}", "severity": "critical" if i % 10 == 0 else "warning"},
+                "annotations": {},
+                "startsAt": "2026-10-19T10:00:00.123456789Z",
+                "endsAt": "2026-10-19T11:00:00Z" if status == "resolved" else "0001-01-01T00:00:00Z",
+                "fingerprint": f"fp-{i:04d}",
+            }
+            for i in range(offset, offset + n)
+        ],
+    }
+
+
+@pytest.mark.anyio
+async def test_ingest_requires_token(client: AsyncClient, monkeypatch):
+    monkeypatch.setenv("ALERTMANAGER_WEBHOOK_TOKEN", "s3cret")
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(1))
+    assert r.status_code == 401
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(1), headers={"Authorization": "Bearer nope"})
+    assert r.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_ingest_storm_is_batched_and_deduplicated(client: AsyncClient, monkeypatch):
+    monkeypatch.setenv("ALERTMANAGER_WEBHOOK_TOKEN", "s3cret")
+    headers = {"Authorization": "Bearer s3cret"}
+
+    import app.v2.routers.alerts as alerts_router
+    from sqlalchemy import event, func, select
+    from app.database import SessionLocal, engine
+    from app.models import Alert, AlertStatus, Priority
+    from app.v2.services.alert_grouping import AlertGrouper
+
+    monkeypatch.setattr(alerts_router, "grouper", AlertGrouper())
+
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO ALERTS"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        r = await client.post("/v2/alerts/ingest", json=_am_payload(5000), headers=headers)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _count)
+    assert r.status_code == 202, r.text
+    assert r.json()["received"] == 5000
+    assert r.json()["firing"] == 5000
+    assert len(statements) == 5  # 5000 lignes / lots de 1000
+
+    # Même storm renvoyé (repeat_interval) + 100 résolues: pas de doublons
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(5000), headers=headers)
+    assert r.status_code == 202
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(100, status="resolved"), headers=headers)
+    assert r.json()["resolved"] == 100
+
+    async with SessionLocal() as db:
+        total = (await db.execute(select(func.count()).select_from(Alert))).scalar_one()
+        resolved = (await db.execute(select(func.count()).select_from(Alert).where(Alert.status == AlertStatus.RESOLVED))).scalar_one()
+        a0 = (await db.execute(select(Alert).where(Alert.fingerprint == "fp-0000"))).scalar_one()
+    assert total == 5000
+    assert resolved == 100
+    assert a0.severity == Priority.P0
+    assert a0.title == "DiskFull on web-0000"
+    assert a0.resolved_at is not None
+
+    # Re-déclenchement: l'alerte repasse OPEN
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(1), headers=headers)
+    async with SessionLocal() as db:
+        a0 = (await db.execute(select(Alert).where(Alert.fingerprint == "fp-0000"))).scalar_one()
+    assert a0.status == AlertStatus.OPEN
+    assert a0.resolved_at is None
+
+
+def test_grouper_folds_storm_into_one_group():
+    from datetime import datetime, timedelta
+    from app.models import AlertStatus, Priority
+    from app.v2.services.alert_grouping import AlertGrouper
+    from app.v2.services.alert_ingest import parse_alertmanager
+
+    g = AlertGrouper(group_by=["alertname"], window_seconds=60)
+    t0 = datetime(2026, 10, 19, 10, 0, 0)
+
+    firing = parse_alertmanager(_am_payload(300))
+    for r in firing:
+        r["severity"] = Priority.P2
+    transitions = g.observe(firing, now=t0)
+    assert [t.kind for t in transitions] == ["opened"]
+    assert [grp["count"] for grp in g.groups()] == [300]
+
+    # Même storm renvoyé: aucune notification
+    assert g.observe(firing, now=t0 + timedelta(seconds=30)) == []
+
+    # Une alerte plus grave dans le groupe: escalade
+    worse = dict(firing[0], severity=Priority.P0)
+    transitions = g.observe([worse], now=t0 + timedelta(seconds=40))
+    assert [t.kind for t in transitions] == ["escalated"]
+    assert transitions[0].group.count == 300
+
+    # Toutes résolues: une seule notification de résolution
+    resolved = parse_alertmanager(_am_payload(300, status="resolved"))
+    assert all(r["status"] == AlertStatus.RESOLVED for r in resolved)
+    transitions = g.observe(resolved, now=t0 + timedelta(seconds=50))
+    assert [t.kind for t in transitions] == ["resolved"]
+
+
+@pytest.mark.anyio
+async def test_ingest_notifies_once_per_group(client: AsyncClient, monkeypatch):
+    monkeypatch.setenv("ALERTMANAGER_WEBHOOK_TOKEN", "s3cret")
+    headers = {"Authorization": "Bearer s3cret"}
+
+    import app.v2.routers.alerts as alerts_router
+    from app.v2.services.alert_grouping import AlertGrouper
+
+    monkeypatch.setattr(alerts_router, "grouper", AlertGrouper(group_by=["alertname"]))
+
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(500), headers=headers)
+    assert r.json()["notifications"] == 1
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(500, offset=500), headers=headers)
+    assert r.json()["notifications"] == 0
+
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models import OutboxMessage
+
+    async with SessionLocal() as db:
+        slack = (await db.execute(select(func.count()).select_from(OutboxMessage).where(OutboxMessage.channel == "slack"))).scalar_one()
+    assert slack == 1
+
+
+def test_maintenance_index_expands_rrule():
+    from datetime import datetime, timedelta
+    from app.models import CalendarEntry, CalendarEventType
+    from app.v2.services.maintenance import MaintenanceIndex
+
+    idx = MaintenanceIndex(horizon_hours=72)
+    idx._window = idx._window_for(datetime(2026, 10, 19, 12, 0))
+    idx._loaded_at = datetime(2026, 10, 19, 12, 0)
+    # Tous les jours 02:00-03:00 sur db-01
+    idx.upsert(CalendarEntry(
+        id="m1", title="backup", event_type=CalendarEventType.MAINTENANCE, resources=["db-01"],
+        start=datetime(2026, 10, 1, 2, 0), end=datetime(2026, 10, 1, 3, 0), rrule="FREQ=DAILY",
+    ))
+    assert idx.covering(["db-01"], datetime(2026, 10, 20, 2, 30)) == "m1"
+    assert idx.covering(["db-01"], datetime(2026, 10, 20, 3, 0)) is None
+    assert idx.covering(["web-01"], datetime(2026, 10, 20, 2, 30)) is None
+
+    # Déplacement de l'entrée: l'ancien créneau disparaît
+    idx.upsert(CalendarEntry(
+        id="m1", title="backup", event_type=CalendarEventType.MAINTENANCE, resources=["db-01"],
+        start=datetime(2026, 10, 1, 4, 0), end=datetime(2026, 10, 1, 5, 0), rrule="FREQ=DAILY",
+    ))
+    assert idx.covering(["db-01"], datetime(2026, 10, 20, 2, 30)) is None
+    assert idx.covering(["db-01"], datetime(2026, 10, 21, 4, 59) - timedelta(minutes=1)) == "m1"
+
+
+@pytest.mark.anyio
+async def test_ingest_mutes_alerts_during_maintenance(client: AsyncClient, monkeypatch):
+    from datetime import datetime, timedelta
+
+    monkeypatch.setenv("ALERTMANAGER_WEBHOOK_TOKEN", "s3cret")
+    headers = {"Authorization": "Bearer s3cret"}
+
+    import app.v2.routers.alerts as alerts_router
+    import app.v2.routers.calendar as calendar_router
+    from app.v2.services.alert_grouping import AlertGrouper
+    from app.v2.services.maintenance import MaintenanceIndex
+
+    index = MaintenanceIndex()
+    monkeypatch.setattr(alerts_router, "grouper", AlertGrouper(group_by=["alertname", "instance"]))
+    monkeypatch.setattr(alerts_router, "maintenance_index", index)
+    monkeypatch.setattr(calendar_router, "maintenance_index", index)
+
+    # Premier lot: index chargé (vide), rien n'est muet
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(2), headers=headers)
+    assert r.json()["muted"] == 0
+    assert r.json()["notifications"] == 2
+
+    r = await client.post("/auth/login", json={"email": "admin@devops.example.com", "password": "Admin@123456"})
+    auth = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    now = datetime.utcnow()
+    r = await client.post(
+        "/v2/calendar/events",
+        json={
+            "title": "Patch kernel",
+            "event_type": "MAINTENANCE",
+            "start": (now - timedelta(minutes=10)).isoformat(),
+            "end": (now + timedelta(hours=1)).isoformat(),
+            "resources": ["web-0002", "web-0003"],
+        },
+        headers=auth,
+    )
+    assert r.status_code == 201, r.text
+    entry_id = r.json()["id"]
+
+    # Index mis à jour par l'écriture calendrier, sans rechargement
+    r = await client.post("/v2/alerts/ingest", json=_am_payload(2, offset=2), headers=headers)
+    assert r.json()["muted"] == 2
+    assert r.json()["notifications"] == 0
+
+    r = await client.get("/v2/alerts", params={"muted": True}, headers=auth)
+    assert {a["muted_by"] for a in r.json()} == {entry_id}
+    assert len(r.json()) == 2
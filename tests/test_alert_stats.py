@@ -0,0 +1,105 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+def _am_alert(i: int, status: str) -> dict:
+    return {
+        "status": status,
+        "labels": {"alertname": "HighLatency", "instance": f"api-{i}", "severity": "critical"},
+        "annotations": {},
+        "startsAt": "2026-10-19T08:00:00Z",
+        "endsAt": "2026-10-19T08:30:00Z" if status == "resolved" else "0001-01-01T00:00:00Z",
+        "fingerprint": f"lat-{i}",
+    }
+
+
+@pytest.mark.anyio
+async def test_alert_stats_from_rollups(client: AsyncClient, monkeypatch):
+    monkeypatch.setenv("ALERTMANAGER_WEBHOOK_TOKEN", "s3cret")
+    ingest_headers = {"Authorization": "Bearer s3cret"}
+
+    import app.v2.routers.alerts as alerts_router
+    from app.v2.services.alert_grouping import AlertGrouper
+    from app.v2.services.maintenance import MaintenanceIndex
+
+    monkeypatch.setattr(alerts_router, "grouper", AlertGrouper())
+    monkeypatch.setattr(alerts_router, "maintenance_index", MaintenanceIndex())
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for title, sev in (("Disque plein", "P1"), ("Backup KO", "P2")):
+        r = await client.post("/v2/tickets", json={"title": title, "severity": sev}, headers=headers)
+        assert r.status_code == 201, r.text
+        ticket_id = r.json()["id"]
+    r = await client.post(f"/v2/tickets/{ticket_id}/resolve", json={}, headers=headers)
+    assert r.status_code == 200
+
+    # 3 alertes Prometheus, puis 2 résolues (30 min d'ouverture), puis un renvoi identique
+    body = {"status": "firing", "alerts": [_am_alert(i, "firing") for i in range(3)]}
+    await client.post("/v2/alerts/ingest", json=body, headers=ingest_headers)
+    body = {"status": "resolved", "alerts": [_am_alert(i, "resolved") for i in range(2)]}
+    await client.post("/v2/alerts/ingest", json=body, headers=ingest_headers)
+    await client.post("/v2/alerts/ingest", json=body, headers=ingest_headers)
+
+    r = await client.get(
+        "/v2/alerts/stats",
+        params={"start": "2026-10-01T00:00:00", "end": "2027-01-01T00:00:00"},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+    stats = r.json()
+    assert stats["opened"] == 5
+    assert stats["resolved"] == 3
+    assert stats["mttr_by_severity"]["P0"] == pytest.approx(1800.0)
+    assert stats["open_by_severity"] == {"P0": 1, "P1": 1}
+    per_source = {}
+    for row in stats["per_source_per_day"]:
+        per_source[row["source"]] = per_source.get(row["source"], 0) + row["count"]
+    assert per_source == {"MANUAL": 2, "PROMETHEUS": 3}
+    assert {"day": "2026-10-19", "source": "PROMETHEUS", "count": 3} in stats["per_source_per_day"]
+
+    # Reconstruction au démarrage: sans effet si les rollups existent déjà
+    from app.database import SessionLocal
+    from app.v2.services.alert_stats import rebuild_alert_stats
+
+    async with SessionLocal() as db:
+        assert await rebuild_alert_stats(db) == 0
+
+
+@pytest.mark.anyio
+async def test_rebuild_alert_stats_from_existing_alerts(client: AsyncClient):
+    from datetime import datetime, timedelta
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models import Alert, AlertSource, AlertStatsHourly, AlertStatus, Priority
+    from app.v2.services.alert_stats import alert_stats, rebuild_alert_stats
+
+    t0 = datetime(2026, 10, 18, 9, 15)
+    async with SessionLocal() as db:
+        db.add_all(
+            [
+                Alert(title="a", severity=Priority.P2, status=AlertStatus.OPEN, source=AlertSource.ANSIBLE, created_at=t0),
+                Alert(
+                    title="b",
+                    severity=Priority.P2,
+                    status=AlertStatus.RESOLVED,
+                    source=AlertSource.ANSIBLE,
+                    created_at=t0,
+                    resolved_at=t0 + timedelta(minutes=10),
+                ),
+            ]
+        )
+        await db.commit()
+
+        assert await rebuild_alert_stats(db, batch_size=1) == 2
+        assert (await db.execute(select(func.count()).select_from(AlertStatsHourly))).scalar_one() == 1
+        stats = await alert_stats(db, t0 - timedelta(days=1), t0 + timedelta(days=1))
+    assert stats["opened"] == 2
+    assert stats["mttr_seconds"] == pytest.approx(600.0)
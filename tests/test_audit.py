@@ -0,0 +1,165 @@
+import pytest
+
+
+@pytest.mark.anyio
+async def test_audit_buffer_bulk_flushes_on_stop(test_app):
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models import AuditLog
+    from app.v2.services.audit import AuditBuffer, _audit_row
+
+    buffer = AuditBuffer(max_rows=50, flush_interval_ms=10_000, max_queue=1000)
+    buffer.start()
+    for i in range(120):
+        await buffer.enqueue(_audit_row(None, "task.update", "task", f"t-{i}"))
+    await buffer.stop()
+
+    async with SessionLocal() as db:
+        res = await db.execute(select(func.count()).select_from(AuditLog).where(AuditLog.action == "task.update"))
+        assert res.scalar_one() == 120
+
+
+@pytest.mark.anyio
+async def test_write_audit_is_part_of_caller_transaction(test_app):
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models import AuditLog
+    from app.v2.services.audit import write_audit
+
+    async with SessionLocal() as db:
+        await write_audit(db, None, "task.update", "task", "t-1")
+        await db.rollback()
+
+    async with SessionLocal() as db:
+        res = await db.execute(select(func.count()).select_from(AuditLog))
+        assert res.scalar_one() == 0
+
+
+async def _seed_audit(n: int, days_ago: int = 0) -> None:
+    from datetime import datetime, timedelta
+    from app.database import SessionLocal
+    from app.models import AuditLog
+
+    async with SessionLocal() as db:
+        base = datetime.utcnow() - timedelta(days=days_ago)
+        for i in range(n):
+            db.add(
+                AuditLog(
+                    action="ticket.update" if i % 2 else "task.update",
+                    entity_type="ticket" if i % 2 else "task",
+                    entity_id=f"e-{i % 3}",
+                    created_at=base - timedelta(minutes=i),
+                )
+            )
+        await db.commit()
+
+
+async def _admin_token(client) -> str:
+    r = await client.post("/auth/login", json={"email": "admin@devops.example.com", "password": "Admin@123456"})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+@pytest.mark.anyio
+async def test_audit_api_keyset_pagination_and_filters(client):
+    await _seed_audit(25)
+    headers = {"Authorization": f"Bearer {await _admin_token(client)}"}
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params = {"entity_type": "task", "limit": 5}
+        if cursor:
+            params["cursor"] = cursor
+        r = await client.get("/v2/audit", headers=headers, params=params)
+        assert r.status_code == 200, r.text
+        body = r.json()
+        seen.extend(item["id"] for item in body["items"])
+        assert all(item["entity_type"] == "task" for item in body["items"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 13
+
+    r = await client.get("/v2/audit", headers=headers, params={"entity_id": "e-0", "action": "ticket.update"})
+    assert r.status_code == 200
+    assert all(i["entity_id"] == "e-0" and i["action"] == "ticket.update" for i in r.json()["items"])
+
+
+@pytest.mark.anyio
+async def test_audit_retention_moves_old_rows_to_archives(test_app, tmp_path, monkeypatch):
+    import gzip
+    import json
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models import AuditLog
+    from app.v2.services.retention import run_audit_retention
+
+    await _seed_audit(7, days_ago=40)
+    await _seed_audit(3, days_ago=0)
+    monkeypatch.setenv("AUDIT_RETENTION_DAYS", "30")
+
+    archived = await run_audit_retention(archive_dir=str(tmp_path))
+    assert archived == 7
+
+    async with SessionLocal() as db:
+        res = await db.execute(select(func.count()).select_from(AuditLog))
+        assert res.scalar_one() == 3
+
+    lines = []
+    for f in (tmp_path / "audit_logs").glob("*.ndjson.gz"):
+        with gzip.open(f, "rt", encoding="utf-8") as fh:
+            lines.extend(json.loads(line) for line in fh)
+    assert len(lines) == 7
+
+
+def test_audit_diff_roundtrip_and_compression():
+    from app.v2.services.audit_diff import apply_diff, decode_diff, encode_diff, make_diff, revert_diff
+
+    history = [{"at": f"2026-01-{i:02d}", "note": "x" * 40} for i in range(1, 51)]
+    before = {"title": "Disk low", "payload": {"history": history, "assigned_to": None}}
+    after = {
+        "title": "Disk low on /data",
+        "payload": {"history": history[1:] + [{"at": "2026-02-01", "note": "y" * 40}], "workflow_status": "OPEN"},
+    }
+
+    ops = make_diff(before, after)
+    # Historique borné: une entrée retirée en tête + une ajoutée, pas 50 remplacements
+    assert len([o for o in ops if "/history" in o["path"]]) == 2
+    assert apply_diff(before, ops) == after
+    assert revert_diff(after, ops) == before
+
+    big = {"blob": "z" * 5000}
+    encoded = encode_diff(make_diff(None, big))
+    assert "$z" in encoded[0]["value"]
+    assert decode_diff(encoded)[0]["value"] == big
+
+
+@pytest.mark.anyio
+async def test_ticket_audit_stores_diffs_and_reconstructs_states(client):
+    headers = {"Authorization": f"Bearer {await _admin_token(client)}"}
+    create = await client.post("/v2/tickets", headers=headers, json={"title": "Disk low", "severity": "P2"})
+    assert create.status_code == 201, create.text
+    ticket_id = create.json()["id"]
+
+    for i in range(5):
+        r = await client.patch(f"/v2/tickets/{ticket_id}", headers=headers, json={"note": f"n{i}"})
+        assert r.status_code == 200, r.text
+    r = await client.patch(f"/v2/tickets/{ticket_id}", headers=headers, json={"title": "Disk very low"})
+    assert r.status_code == 200, r.text
+
+    from sqlalchemy import select
+    from app.database import SessionLocal
+    from app.models import Alert, AuditLog
+
+    async with SessionLocal() as db:
+        ticket = (await db.execute(select(Alert).where(Alert.id == ticket_id))).scalar_one()
+        rows = list((await db.execute(select(AuditLog).where(AuditLog.entity_id == ticket_id))).scalars().all())
+    assert all(r.before is None and r.after is None for r in rows)
+
+    states = await client.get(f"/v2/audit/ticket/{ticket_id}/states", headers=headers)
+    assert states.status_code == 200, states.text
+    final = states.json()[-1]["state"]
+    assert final["title"] == "Disk very low"
+    assert final["payload"] == ticket.payload
@@ -0,0 +1,62 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+async def _seed_board(n_todo: int, n_doing: int) -> str:
+    import app.database as database
+    from app.models import Project, Task, TaskStatus
+    from app.v2.services.ranking import spread_ranks
+
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        other = Project(key="DEV", name="Dev")
+        db.add_all([project, other])
+        await db.flush()
+        for st, n in ((TaskStatus.TODO, n_todo), (TaskStatus.IN_PROGRESS, n_doing)):
+            for i, rank in enumerate(spread_ranks(n)):
+                db.add(Task(project_id=project.id, title=f"{st.value}-{i:03d}", status=st, rank=rank))
+        db.add(Task(project_id=other.id, title="ailleurs", status=TaskStatus.TODO, rank="i"))
+        await db.commit()
+        return project.id
+
+
+@pytest.mark.anyio
+async def test_board_counts_and_column_windows(client: AsyncClient):
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = await _seed_board(25, 3)
+
+    r = await client.get("/v2/board", params={"project_id": project_id, "limit": 10}, headers=headers)
+    assert r.status_code == 200, r.text
+    cols = {c["status"]: c for c in r.json()["columns"]}
+    assert list(cols) == ["TODO", "IN_PROGRESS", "DONE"]
+    assert [cols[s]["count"] for s in cols] == [25, 3, 0]
+    assert [t["title"] for t in cols["TODO"]["tasks"]] == [f"TODO-{i:03d}" for i in range(10)]
+    assert cols["TODO"]["next_cursor"]
+    assert len(cols["IN_PROGRESS"]["tasks"]) == 3 and cols["IN_PROGRESS"]["next_cursor"] is None
+    assert cols["DONE"]["tasks"] == []
+
+    # "Charger plus" jusqu'à épuisement de la colonne
+    titles = [t["title"] for t in cols["TODO"]["tasks"]]
+    cursor = cols["TODO"]["next_cursor"]
+    while cursor:
+        r = await client.get(
+            "/v2/board/column",
+            params={"project_id": project_id, "status": "TODO", "cursor": cursor, "limit": 10},
+            headers=headers,
+        )
+        assert r.status_code == 200, r.text
+        titles += [t["title"] for t in r.json()["tasks"]]
+        cursor = r.json()["next_cursor"]
+    assert titles == [f"TODO-{i:03d}" for i in range(25)]
+
+    r = await client.get(
+        "/v2/board/column", params={"project_id": project_id, "status": "TODO", "cursor": "%%%"}, headers=headers
+    )
+    assert r.status_code == 422
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+@pytest.mark.anyio
+async def test_burndown_tracks_task_changes(client: AsyncClient):
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    import app.database as database
+    from app.models import Project
+
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.commit()
+        project_id = project.id
+
+    today = datetime.utcnow().date()
+    r = await client.post(
+        "/v2/sprints",
+        json={
+            "project_id": project_id,
+            "name": "S1",
+            "start_date": (today - timedelta(days=2)).isoformat(),
+            "end_date": (today + timedelta(days=7)).isoformat(),
+        },
+        headers=headers,
+    )
+    assert r.status_code == 201, r.text
+    sprint_id = r.json()["id"]
+
+    ids = []
+    for title, hours in (("a", 5.0), ("b", 3.0), ("c", None)):
+        r = await client.post(
+            "/v2/tasks",
+            json={"project_id": project_id, "sprint_id": sprint_id, "title": title, "estimate_hours": hours},
+            headers=headers,
+        )
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["id"])
+
+    r = await client.patch(f"/v2/tasks/{ids[0]}", json={"status": "DONE"}, headers=headers)
+    assert r.status_code == 200, r.text
+    r = await client.patch(f"/v2/tasks/{ids[1]}", json={"estimate_hours": 4.0}, headers=headers)
+    assert r.status_code == 200, r.text
+    r = await client.post(
+        "/v2/tasks/batch-move", json={"moves": [{"id": ids[2], "status": "IN_PROGRESS"}, {"id": ids[1], "status": "DONE"}]},
+        headers=headers,
+    )
+    assert r.status_code == 200, r.text
+
+    r = await client.get(f"/v2/sprints/{sprint_id}/burndown", headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["day"][-1] == today.isoformat() and len(body["day"]) == 3
+    # Un seul snapshot (aujourd'hui), reporté sur les jours précédents
+    assert body["scope_hours"] == [9.0] * 3 and body["scope_tasks"] == [3] * 3
+    assert body["remaining_hours"][-1] == 0.0 and body["remaining_tasks"][-1] == 1
+    assert body["ideal_hours"][0] == 9.0 and body["ideal_hours"][-1] < 9.0
+
+    r = await client.get("/v2/sprints/nope/burndown", headers=headers)
+    assert r.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_velocity_from_last_snapshot_of_closed_sprints(client: AsyncClient):
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    import app.database as database
+    from app.models import Project, Sprint, SprintSnapshotDaily
+
+    day0 = datetime(2024, 1, 1)
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.flush()
+        s1 = Sprint(project_id=project.id, name="S1", start_date=day0, end_date=day0 + timedelta(days=13))
+        s2 = Sprint(project_id=project.id, name="S2", start_date=day0 + timedelta(days=14), end_date=day0 + timedelta(days=27))
+        db.add_all([s1, s2])
+        await db.flush()
+        for sprint, day, rem_h, rem_n in (
+            (s1, 0, 20.0, 4),
+            (s1, 13, 5.0, 1),
+            (s1, 20, 0.0, 0),  # après la fin du sprint: ignoré
+            (s2, 14, 30.0, 5),
+            (s2, 25, 12.0, 2),
+        ):
+            db.add(
+                SprintSnapshotDaily(
+                    sprint_id=sprint.id,
+                    day=day0 + timedelta(days=day),
+                    scope_hours=20.0 if sprint is s1 else 30.0,
+                    scope_tasks=4 if sprint is s1 else 5,
+                    remaining_hours=rem_h,
+                    remaining_tasks=rem_n,
+                )
+            )
+        await db.commit()
+        project_id = project.id
+
+    r = await client.get(f"/v2/projects/{project_id}/velocity", headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert [s["name"] for s in body["sprints"]] == ["S1", "S2"]
+    assert [s["completed_hours"] for s in body["sprints"]] == [15.0, 18.0]
+    assert [s["completed_tasks"] for s in body["sprints"]] == [3, 3]
+    assert body["average_completed_hours"] == 16.5
+
+    r = await client.get(f"/v2/projects/{project_id}/velocity", params={"limit": 1}, headers=headers)
+    assert [s["name"] for s in r.json()["sprints"]] == ["S2"]
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+async def _seed_sprint() -> tuple[str, list[str]]:
+    import app.database as database
+    from app.models import (
+        CalendarEntry,
+        CalendarEventType,
+        Project,
+        Sprint,
+        Task,
+        TaskAssignee,
+        User,
+        UserRole,
+    )
+
+    async with database.SessionLocal() as db:
+        users = [
+            User(first_name=name, last_name="Ops", email=f"{name.lower()}@devops.example.com", hashed_password="x", role=UserRole.USER)
+            for name in ("Alice", "Bob")
+        ]
+        project = Project(key="OPS", name="Ops")
+        db.add_all([project, *users])
+        await db.flush()
+        # Lundi 1er -> dimanche 7 janvier 2024: 5 jours ouvrés
+        sprint = Sprint(project_id=project.id, name="S1", start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 7, 23, 59))
+        db.add(sprint)
+        await db.flush()
+        tasks = [
+            Task(project_id=project.id, sprint_id=sprint.id, title="a", estimate_hours=8.0),
+            Task(project_id=project.id, sprint_id=sprint.id, title="b", estimate_hours=6.0),
+            Task(project_id=project.id, sprint_id=sprint.id, title="c", estimate_hours=4.0),
+        ]
+        db.add_all(tasks)
+        await db.flush()
+        alice, bob = users
+        db.add_all(
+            [
+                TaskAssignee(task_id=tasks[0].id, user_id=alice.id),
+                TaskAssignee(task_id=tasks[1].id, user_id=alice.id),
+                TaskAssignee(task_id=tasks[1].id, user_id=bob.id),
+                # Demi-journée pour Alice, journée entière + vendredis récurrents pour Bob
+                CalendarEntry(
+                    title="RDV", owner_id=alice.id, event_type=CalendarEventType.VACATION,
+                    start=datetime(2024, 1, 3, 9), end=datetime(2024, 1, 3, 13),
+                ),
+                CalendarEntry(
+                    title="Congé", owner_id=bob.id, event_type=CalendarEventType.VACATION, all_day=True,
+                    start=datetime(2024, 1, 2), end=datetime(2024, 1, 3),
+                ),
+                CalendarEntry(
+                    title="Temps partiel", owner_id=bob.id, event_type=CalendarEventType.VACATION,
+                    start=datetime(2023, 12, 1, 9), end=datetime(2023, 12, 1, 17), rrule="FREQ=WEEKLY",
+                ),
+                # Autre type d'entrée: ignorée
+                CalendarEntry(
+                    title="Maintenance", owner_id=bob.id, event_type=CalendarEventType.MAINTENANCE,
+                    start=datetime(2024, 1, 4, 9), end=datetime(2024, 1, 4, 17),
+                ),
+            ]
+        )
+        await db.commit()
+        return sprint.id, [alice.id, bob.id]
+
+
+@pytest.mark.anyio
+async def test_capacity_matrix_and_cache_invalidation(client: AsyncClient):
+    from app.v2.services.capacity import cache
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    sprint_id, (alice, bob) = await _seed_sprint()
+    cache.invalidate()
+
+    r = await client.get(f"/v2/sprints/{sprint_id}/capacity", headers=headers)
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["days"][0] == "2024-01-01" and len(body["days"]) == 7
+    assert body["assignees"]["user_id"] == [alice, bob]
+    assert body["assignees"]["assigned_hours"] == [11.0, 3.0]
+    assert body["available"][0] == [8.0, 8.0, 4.0, 8.0, 8.0, 0.0, 0.0]
+    assert body["available"][1] == [8.0, 0.0, 8.0, 8.0, 0.0, 0.0, 0.0]
+    assert body["assignees"]["available_hours"] == [36.0, 24.0]
+    assert body["assignees"]["balance_hours"] == [25.0, 21.0]
+    assert body["unassigned_hours"] == 4.0
+
+    loads = cache.loads
+    r = await client.get(f"/v2/sprints/{sprint_id}/capacity", headers=headers)
+    assert r.json() == body and cache.loads == loads
+
+    # Nouvelle absence: l'événement calendrier invalide le cache
+    r = await client.post(
+        "/v2/calendar/events",
+        json={
+            "title": "Congé",
+            "start": "2024-01-04T00:00:00",
+            "end": "2024-01-05T00:00:00",
+            "all_day": True,
+            "event_type": "VACATION",
+            "owner_id": alice,
+        },
+        headers=headers,
+    )
+    assert r.status_code == 201, r.text
+    r = await client.get(f"/v2/sprints/{sprint_id}/capacity", headers=headers)
+    assert cache.loads == loads + 1
+    assert r.json()["assignees"]["available_hours"] == [28.0, 24.0]
+
+    r = await client.get("/v2/sprints/nope/capacity", headers=headers)
+    assert r.status_code == 404
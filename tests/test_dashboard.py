@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+@pytest.mark.anyio
+async def test_dashboard_is_coalesced_and_invalidated(client: AsyncClient, monkeypatch):
+    import app.v2.services.dashboard as dashboard
+    from app.v2.services.cache import SingleFlightCache
+
+    cache = SingleFlightCache(ttl_seconds=60)
+    monkeypatch.setattr(dashboard, "cache", cache)
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    responses = await asyncio.gather(*[client.get("/v2/dashboard", headers=headers) for _ in range(20)])
+    assert all(r.status_code == 200 for r in responses)
+    assert cache.loads == 1
+    body = responses[0].json()
+    assert body["tickets"] == []
+    assert body["pipeline"]["status"] == "unknown"
+
+    # Une écriture publie un événement qui invalide le cache
+    r = await client.post("/v2/tickets", json={"title": "Disque plein", "severity": "P2"}, headers=headers)
+    assert r.status_code == 201
+    r = await client.get("/v2/dashboard", headers=headers)
+    assert cache.loads == 2
+    assert [t["title"] for t in r.json()["tickets"]] == ["Disque plein"]
+
+
+@pytest.mark.anyio
+async def test_singleflight_shares_one_load():
+    from app.v2.services.cache import SingleFlightCache
+
+    cache = SingleFlightCache(ttl_seconds=0)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*[cache.get_or_load("k", loader) for _ in range(50)])
+    assert results == [1] * 50
+    # TTL nul: pas de mise en cache, seulement la coalescence
+    assert await cache.get_or_load("k", loader) == 2
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await cache.get_or_load("x", failing)
+
+
+@pytest.mark.anyio
+async def test_singleflight_leader_cancellation_does_not_fail_followers():
+    from app.v2.services.cache import SingleFlightCache
+
+    cache = SingleFlightCache(ttl_seconds=60)
+    started = asyncio.Event()
+
+    async def loader():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    leader = asyncio.ensure_future(cache.get_or_load("k", loader))
+    await started.wait()
+    follower = asyncio.ensure_future(cache.get_or_load("k", loader))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    # Seul l'appelant annulé voit l'annulation; le chargement va au bout et est mis en cache
+    assert await follower == "ok"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert cache.loads == 1
+    assert await cache.get_or_load("k", loader) == "ok" and cache.loads == 1
+
+
+@pytest.mark.anyio
+async def test_singleflight_invalidate_detaches_inflight_load():
+    from app.v2.services.cache import SingleFlightCache
+
+    cache = SingleFlightCache(ttl_seconds=60)
+    value = "avant"
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_loader():
+        seen = value
+        started.set()
+        await release.wait()
+        return seen
+
+    async def loader():
+        return value
+
+    stale = asyncio.ensure_future(cache.get_or_load("k", slow_loader))
+    await started.wait()
+    # Écriture pendant le chargement: l'appel suivant ne rejoint pas l'ancien chargement
+    value = "après"
+    cache.invalidate()
+    assert await asyncio.wait_for(cache.get_or_load("k", loader), timeout=2) == "après"
+    release.set()
+    assert await stale == "avant"
+    assert await cache.get_or_load("k", loader) == "après" and cache.loads == 2
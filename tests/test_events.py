@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+@pytest.mark.anyio
+async def test_writes_publish_change_events(client: AsyncClient, monkeypatch):
+    import app.v2.routers.tasks as tasks_router
+    import app.v2.routers.tickets as tickets_router
+    from app.v2.services.events import EventBus
+
+    bus = EventBus()
+    monkeypatch.setattr(tickets_router, "bus", bus)
+    monkeypatch.setattr(tasks_router, "bus", bus)
+    tickets_only = bus.subscribe(["tickets"])
+    everything = bus.subscribe()
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    r = await client.post("/v2/tickets", json={"title": "Disque plein"}, headers=headers)
+    ticket_id = r.json()["id"]
+    from app.database import SessionLocal
+    from app.models import Project
+
+    async with SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.commit()
+        project_id = project.id
+    r = await client.post("/v2/tasks", json={"project_id": project_id, "title": "Rotation des logs"}, headers=headers)
+    assert r.status_code == 201, r.text
+
+    assert tickets_only.queue.qsize() == 1
+    ev = tickets_only.queue.get_nowait()
+    assert ev["topic"] == "tickets"
+    assert ev["data"] == {"action": "created", "id": ticket_id, "project_id": None}
+    assert [everything.queue.get_nowait()["topic"] for _ in range(2)] == ["tickets", "tasks"]
+
+
+@pytest.mark.anyio
+async def test_batch_move_publishes_one_event_per_project(client: AsyncClient, monkeypatch):
+    import app.v2.routers.tasks as tasks_router
+    from app.database import SessionLocal
+    from app.models import Project
+    from app.v2.services.events import EventBus
+
+    bus = EventBus()
+    monkeypatch.setattr(tasks_router, "bus", bus)
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    async with SessionLocal() as db:
+        projects = [Project(key="OPS", name="Ops"), Project(key="NET", name="Net")]
+        db.add_all(projects)
+        await db.commit()
+        project_ids = [p.id for p in projects]
+    ids = []
+    for project_id in project_ids:
+        for i in range(2):
+            r = await client.post("/v2/tasks", json={"project_id": project_id, "title": f"t{i}"}, headers=headers)
+            ids.append(r.json()["id"])
+
+    sub = bus.subscribe(["tasks"])
+    moves = [{"id": tid, "status": "IN_PROGRESS"} for tid in ids]
+    r = await client.post("/v2/tasks/batch-move", json={"moves": moves}, headers=headers)
+    assert r.status_code == 200, r.text
+    events = [sub.queue.get_nowait()["data"] for _ in range(sub.queue.qsize())]
+    assert sorted(events, key=lambda d: project_ids.index(d["project_id"])) == [
+        {"action": "moved", "ids": ids[:2], "project_id": project_ids[0]},
+        {"action": "moved", "ids": ids[2:], "project_id": project_ids[1]},
+    ]
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_gets_resync_and_stream_format():
+    from app.v2.services.events import EventBus, sse_stream
+
+    bus = EventBus(queue_size=3)
+    slow = bus.subscribe(["tasks"])
+    for i in range(10):
+        bus.publish("tasks", {"action": "updated", "id": str(i)})
+    # File pleine: les événements en retard sont remplacés par un resync
+    assert slow.queue.qsize() <= 3
+    topics = [slow.queue.get_nowait()["topic"] for _ in range(slow.queue.qsize())]
+    assert "resync" in topics
+    bus.unsubscribe(slow)
+
+    async def connected() -> bool:
+        return False
+
+    stream = sse_stream(bus, ["tasks"], connected, heartbeat_seconds=0.01)
+    # Pas de souscription tant que le flux n'est pas itéré
+    assert bus.subscribers == 0
+    assert await stream.__anext__() == "retry: 5000\n\n"
+    assert bus.subscribers == 1
+    assert await stream.__anext__() == ": ping\n\n"
+    bus.publish("tasks", {"action": "created", "id": "t1"})
+    chunk = await stream.__anext__()
+    assert "event: tasks\n" in chunk
+    assert 'data: {"action": "created", "id": "t1"}' in chunk
+    await stream.aclose()
+    assert bus.subscribers == 0
+
+
+@pytest.mark.anyio
+async def test_stream_rejects_unknown_topics(client: AsyncClient):
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    r = await client.get("/v2/events/stream", params={"topics": "tickets,nope"}, headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 422
+    r = await client.get("/v2/events/stream")
+    assert r.status_code in (401, 403)
@@ -0,0 +1,110 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+@pytest.mark.anyio
+async def test_ticket_notification_goes_through_outbox(client: AsyncClient, monkeypatch):
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+
+    create = await client.post(
+        "/v2/tickets",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"title": "Prod down", "severity": "P0", "source": "MANUAL"},
+    )
+    assert create.status_code == 201, create.text
+
+    from sqlalchemy import select
+    from app.database import SessionLocal
+    from app.models import OutboxMessage, OutboxStatus
+    from app.v2.services import outbox
+
+    # Ticket non P0: pas d'escalade, rien dans l'outbox
+    r = await client.post(
+        "/v2/tickets",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"title": "Log verbeux", "severity": "P3", "source": "MANUAL"},
+    )
+    assert r.status_code == 201, r.text
+
+    async with SessionLocal() as db:
+        res = await db.execute(select(OutboxMessage))
+        rows = list(res.scalars().all())
+    assert sorted(r.channel for r in rows) == ["email", "slack"]
+    assert all(r.status == OutboxStatus.PENDING for r in rows)
+
+    delivered: list[dict] = []
+
+    async def ok_sender(payload: dict) -> None:
+        delivered.append(payload)
+
+    async def failing_sender(payload: dict) -> None:
+        raise RuntimeError("smtp down")
+
+    monkeypatch.setitem(outbox._SENDERS, "slack", ok_sender)
+    monkeypatch.setitem(outbox._SENDERS, "email", failing_sender)
+
+    dispatcher = outbox.OutboxDispatcher(max_attempts=2, base_backoff_seconds=0)
+    assert await dispatcher.run_once() == 2
+    assert delivered == [{"text": "[P0] Prod down"}]
+
+    # Second (et dernier) essai pour l'email -> dead-letter
+    assert await dispatcher.run_once() == 1
+    assert await dispatcher.run_once() == 0
+
+    async with SessionLocal() as db:
+        res = await db.execute(select(OutboxMessage))
+        by_channel = {r.channel: r for r in res.scalars().all()}
+    assert by_channel["slack"].status == OutboxStatus.SENT
+    assert by_channel["email"].status == OutboxStatus.DEAD
+    assert by_channel["email"].last_error == "smtp down"
+
+    metrics = await client.get("/v2/outbox/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert metrics.status_code == 200, metrics.text
+    assert metrics.json()["depth"]["email"]["DEAD"] == 1
+
+
+@pytest.mark.anyio
+async def test_slack_digest_does_not_hold_outbox_slots(client: AsyncClient, monkeypatch):
+    import json
+
+    import httpx
+    from sqlalchemy import select
+
+    import app.database as database
+    import app.v2.services.notify as notify
+    import app.v2.services.slack as slack
+    from app.models import OutboxMessage, OutboxStatus
+    from app.v2.services import outbox
+
+    calls: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        return httpx.Response(200, text="ok")
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(slack, "get_http_client", lambda: http)
+    monkeypatch.setattr(notify, "coalescer", slack.SlackCoalescer(window_seconds=0.2, min_interval_seconds=0))
+    monkeypatch.setenv("SLACK_WEBHOOK_URL", "https://hooks.slack.test/T/B/X")
+    monkeypatch.setenv("OUTBOX_CONCURRENCY_SLACK", "1")
+
+    async with database.SessionLocal() as db:
+        for i in range(10):
+            outbox.enqueue(db, "slack", {"text": f"alerte {i}"})
+        await db.commit()
+
+    # Un seul créneau d'envoi: les 10 messages partent pourtant dans un seul digest
+    dispatcher = outbox.OutboxDispatcher()
+    assert await dispatcher.run_once() == 10
+    await http.aclose()
+    assert len(calls) == 1 and calls[0]["text"].startswith("*10 notifications*")
+
+    async with database.SessionLocal() as db:
+        res = await db.execute(select(OutboxMessage.status))
+        assert set(res.scalars().all()) == {OutboxStatus.SENT}
@@ -0,0 +1,246 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+def _pipeline_hook(pid: int, status: str, ref: str = "main", builds: list | None = None) -> dict:
+    return {
+        "object_kind": "pipeline",
+        "object_attributes": {
+            "id": pid,
+            "ref": ref,
+            "status": status,
+            "sha": "abc123",
+            "source": "push",
+            "created_at": "2026-10-19 10:00:00 UTC",
+            "finished_at": "2026-10-19 10:05:00 UTC" if status in ("success", "failed") else None,
+            "duration": 300 if status in ("success", "failed") else None,
+        },
+        "project": {"id": 42, "path_with_namespace": "ops/api", "web_url": "https://gitlab.example.com/ops/api"},
+        "builds": builds or [],
+    }
+
+
+def _job_hook(pid: int, job_id: int, name: str, status: str) -> dict:
+    return {
+        "object_kind": "build",
+        "ref": "main",
+        "build_id": job_id,
+        "build_name": name,
+        "build_stage": "test",
+        "build_status": status,
+        "build_duration": 12.5,
+        "pipeline_id": pid,
+        "project_id": 42,
+        "project_name": "Ops / api",
+        "project": {"id": 42, "path_with_namespace": "ops/api"},
+    }
+
+
+@pytest.fixture
+def pipeline_state(monkeypatch):
+    import app.v2.routers.pipeline as pipeline_router
+    import app.v2.services.dashboard as dashboard
+    from app.v2.services.pipeline_ingest import LatestStatus, PipelineWriter
+
+    latest = LatestStatus()
+    writer = PipelineWriter(flush_interval_ms=10)
+    monkeypatch.setattr(pipeline_router, "latest_status", latest)
+    monkeypatch.setattr(pipeline_router, "writer", writer)
+    monkeypatch.setattr(dashboard, "latest_status", latest)
+    monkeypatch.setenv("GITLAB_WEBHOOK_TOKEN", "gl-secret")
+    return latest, writer
+
+
+@pytest.mark.anyio
+async def test_webhook_requires_token(client: AsyncClient, pipeline_state):
+    r = await client.post("/v2/pipeline/webhook", json=_pipeline_hook(1, "running"))
+    assert r.status_code == 401
+    r = await client.post("/v2/pipeline/webhook", json=_pipeline_hook(1, "running"), headers={"X-Gitlab-Token": "nope"})
+    assert r.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_webhook_upserts_one_row_per_pipeline(client: AsyncClient, pipeline_state):
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models import PipelineEvent
+
+    latest, _ = pipeline_state
+    headers = {"X-Gitlab-Token": "gl-secret"}
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    auth = {"Authorization": f"Bearer {token}"}
+    r = await client.post("/v2/projects", json={"name": "API", "gitlab_project": "ops/api"}, headers=auth)
+    assert r.status_code == 201, r.text
+    project_id = r.json()["id"]
+
+    await client.post("/v2/pipeline/webhook", json=_pipeline_hook(100, "running"), headers=headers)
+    await client.post("/v2/pipeline/webhook", json=_job_hook(100, 1, "unit", "failed"), headers=headers)
+    await client.post("/v2/pipeline/webhook", json=_job_hook(100, 2, "unit", "success"), headers=headers)
+    await client.post(
+        "/v2/pipeline/webhook",
+        json=_pipeline_hook(100, "success", builds=[{"id": 3, "name": "lint", "stage": "test", "status": "success", "duration": 3}]),
+        headers=headers,
+    )
+    # Livraison en retard: "running" ne doit pas écraser "success"
+    await client.post("/v2/pipeline/webhook", json=_pipeline_hook(100, "running"), headers=headers)
+
+    async with SessionLocal() as db:
+        rows = list((await db.execute(select(PipelineEvent))).scalars().all())
+    assert len(rows) == 1
+    row = rows[0]
+    assert row.pipeline_id == "100"
+    assert row.status == "success"
+    assert row.project_id == project_id
+    assert row.duration_seconds == 300
+    assert row.url == "https://gitlab.example.com/ops/api/-/pipelines/100"
+    assert {j["name"]: j["status"] for j in row.payload["jobs"].values() if j["name"] == "lint"} == {"lint": "success"}
+    assert sorted(j["status"] for j in row.payload["jobs"].values() if j["name"] == "unit") == ["failed", "success"]
+
+    assert latest.get("ops/api", "main")["status"] == "success"
+    r = await client.get("/v2/pipeline/status", params={"project": "ops/api", "ref": "main"}, headers=auth)
+    assert r.json()["status"] == "success"
+
+
+@pytest.mark.anyio
+async def test_webhook_burst_is_coalesced(client: AsyncClient, pipeline_state):
+    from sqlalchemy import event, func, select
+    from app.database import SessionLocal, engine
+    from app.models import PipelineEvent
+
+    _, writer = pipeline_state
+    headers = {"X-Gitlab-Token": "gl-secret"}
+    writer.start()
+
+    statements: list[str] = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO PIPELINE_EVENTS"):
+            statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _count)
+    try:
+        hooks = [_job_hook(200 + (i % 10), 1000 + i, f"job-{i}", "success") for i in range(300)]
+        hooks += [_pipeline_hook(200 + i, "success", ref=f"feature-{i}") for i in range(10)]
+        responses = await asyncio.gather(*[client.post("/v2/pipeline/webhook", json=h, headers=headers) for h in hooks])
+        assert all(r.status_code == 202 for r in responses)
+        await writer.stop()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _count)
+
+    async with SessionLocal() as db:
+        count = (await db.execute(select(func.count()).select_from(PipelineEvent))).scalar_one()
+        jobs = sum(len(p["jobs"]) for p in (await db.execute(select(PipelineEvent.payload))).scalars().all())
+    assert count == 10
+    assert jobs == 300
+    assert len(statements) < 20  # écritures par lot, pas une par livraison
+
+
+def test_histogram_quantiles():
+    from app.v2.services.pipeline_stats import bucket_value, duration_bucket, histogram_quantiles
+
+    hist: dict[int, int] = {}
+    for d in [60] * 50 + [600] * 45 + [3600] * 5:
+        b = duration_bucket(d)
+        hist[b] = hist.get(b, 0) + 1
+    q = histogram_quantiles(hist, (0.5, 0.95, 0.99))
+    assert q[0.5] == pytest.approx(60, rel=0.2)
+    assert q[0.95] == pytest.approx(600, rel=0.2)
+    assert q[0.99] == pytest.approx(3600, rel=0.2)
+    assert histogram_quantiles({}, (0.5,)) == {0.5: None}
+    assert bucket_value(duration_bucket(1)) == 1.0
+
+
+@pytest.mark.anyio
+async def test_pipeline_stats_from_rollups(client: AsyncClient, pipeline_state):
+    headers = {"X-Gitlab-Token": "gl-secret"}
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    auth = {"Authorization": f"Bearer {token}"}
+
+    from datetime import datetime
+
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+
+    def hook(pid, status, ref, duration, builds):
+        h = _pipeline_hook(pid, status, ref=ref, builds=builds)
+        h["object_attributes"]["created_at"] = f"{today} 08:00:00 UTC"
+        h["object_attributes"]["duration"] = duration
+        return h
+
+    unit_flaky = [
+        {"id": 1, "name": "unit", "stage": "test", "status": "failed"},
+        {"id": 2, "name": "unit", "stage": "test", "status": "success"},
+    ]
+    for i in range(8):
+        await client.post("/v2/pipeline/webhook", json=hook(300 + i, "success", "main", 120, unit_flaky if i < 2 else []), headers=headers)
+    for i in range(2):
+        await client.post("/v2/pipeline/webhook", json=hook(310 + i, "success", "main", 1200, []), headers=headers)
+    await client.post(
+        "/v2/pipeline/webhook",
+        json=hook(320, "failed", "dev", 50, [{"id": 5, "name": "unit", "stage": "test", "status": "failed"}]),
+        headers=headers,
+    )
+    # Pipeline relancé: l'échec devient succès, les rollups sont corrigés (pas de double comptage)
+    await client.post("/v2/pipeline/webhook", json=hook(321, "failed", "dev", 40, []), headers=headers)
+    await client.post("/v2/pipeline/webhook", json=hook(321, "success", "dev", 40, []), headers=headers)
+
+    r = await client.get("/v2/pipeline/stats", params={"project": "ops/api"}, headers=auth)
+    assert r.status_code == 200, r.text
+    s = r.json()
+    assert s["pipelines"] == 12
+    assert (s["success"], s["failed"]) == (11, 1)
+    assert s["duration"]["p50_seconds"] == pytest.approx(120, rel=0.2)
+    assert s["duration"]["p95_seconds"] == pytest.approx(1200, rel=0.2)
+    by_ref = {x["ref"]: x for x in s["by_ref"]}
+    assert by_ref["main"]["failure_rate"] == 0
+    assert by_ref["dev"]["failure_rate"] == 0.5
+    assert s["flaky_jobs"] == [{"project": "ops/api", "job": "unit", "runs": 3, "failed": 1, "flaky": 2, "flaky_rate": 2 / 3}]
+
+    r = await client.get("/v2/pipeline/stats", params={"project": "ops/api", "ref": "dev"}, headers=auth)
+    assert r.json()["pipelines"] == 2
+
+    # Reconstruction au démarrage: sans effet si les rollups existent déjà
+    from app.database import SessionLocal
+    from app.v2.services.pipeline_stats import rebuild_pipeline_stats
+
+    async with SessionLocal() as db:
+        assert await rebuild_pipeline_stats(db) == 0
+
+
+@pytest.mark.anyio
+async def test_stop_during_flush_keeps_the_batch(client: AsyncClient, pipeline_state):
+    from sqlalchemy import func, select
+
+    import app.database as database
+    from app.models import PipelineEvent
+
+    _, writer = pipeline_state
+    headers = {"X-Gitlab-Token": "gl-secret"}
+    real_write = writer._write
+    writing = asyncio.Event()
+
+    async def slow_write(pending):
+        if not writing.is_set():
+            # Premier lot: bloqué jusqu'à l'annulation par stop()
+            writing.set()
+            await asyncio.sleep(60)
+        await real_write(pending)
+
+    writer._write = slow_write
+    writer.start()
+    for i in range(5):
+        r = await client.post("/v2/pipeline/webhook", json=_pipeline_hook(300 + i, "success"), headers=headers)
+        assert r.status_code == 202
+    await asyncio.wait_for(writing.wait(), timeout=5)
+    await writer.stop()
+
+    async with database.SessionLocal() as db:
+        count = (await db.execute(select(func.count()).select_from(PipelineEvent))).scalar_one()
+    assert count == 5
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+@pytest.mark.anyio
+async def test_projects_list_with_counts_and_cache(client: AsyncClient):
+    import app.database as database
+    from app.models import (
+        Alert,
+        AlertStatus,
+        PipelineEvent,
+        Priority,
+        Project,
+        Sprint,
+        Task,
+        TaskStatus,
+    )
+    from app.v2.services.project_overview import cache
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    now = datetime.utcnow()
+
+    async with database.SessionLocal() as db:
+        ops = Project(key="OPS", name="Ops", created_at=now - timedelta(days=1))
+        dev = Project(key="DEV", name="Dev", created_at=now - timedelta(days=2))
+        db.add_all([ops, dev])
+        await db.flush()
+        db.add_all(
+            [
+                Task(project_id=ops.id, title="a", status=TaskStatus.TODO),
+                Task(project_id=ops.id, title="b", status=TaskStatus.TODO),
+                Task(project_id=ops.id, title="c", status=TaskStatus.IN_PROGRESS),
+                Task(project_id=ops.id, title="d", status=TaskStatus.DONE),
+                Alert(project_id=ops.id, title="disk", severity=Priority.P1),
+                Alert(project_id=ops.id, title="cpu", severity=Priority.P1),
+                Alert(project_id=ops.id, title="old", severity=Priority.P0, status=AlertStatus.RESOLVED),
+                Sprint(project_id=ops.id, name="passé", start_date=now - timedelta(days=30), end_date=now - timedelta(days=16)),
+                Sprint(project_id=ops.id, name="en cours", start_date=now - timedelta(days=2), end_date=now + timedelta(days=12)),
+                PipelineEvent(project_id=ops.id, pipeline_id="1", status="failed", ref="main", created_at=now - timedelta(hours=2)),
+                PipelineEvent(project_id=ops.id, pipeline_id="2", status="success", ref="main", created_at=now - timedelta(hours=1)),
+            ]
+        )
+        await db.commit()
+        ops_id, dev_id = ops.id, dev.id
+
+    cache.invalidate()
+    r = await client.get("/v2/projects", headers=headers)
+    assert r.status_code == 200, r.text
+    by_id = {p["id"]: p for p in r.json()}
+    assert [p["id"] for p in r.json()][:2] == [ops_id, dev_id]
+    ops_row, dev_row = by_id[ops_id], by_id[dev_id]
+    assert ops_row["key"] == "OPS"
+    assert ops_row["open_tasks"] == {"TODO": 2, "IN_PROGRESS": 1}
+    assert ops_row["open_alerts"] == {"P0": 0, "P1": 2, "P2": 0, "P3": 0}
+    assert ops_row["active_sprint"]["name"] == "en cours"
+    assert ops_row["pipeline"]["status"] == "success"
+    assert dev_row["open_tasks"] == {"TODO": 0, "IN_PROGRESS": 0}
+    assert dev_row["active_sprint"] is None and dev_row["pipeline"] is None
+
+    # Lecture suivante servie par le cache; une écriture de tâche l'invalide
+    loads = cache.loads
+    r = await client.get("/v2/projects", headers=headers)
+    assert cache.loads == loads
+    r = await client.post("/v2/tasks", json={"project_id": dev_id, "title": "new"}, headers=headers)
+    assert r.status_code == 201, r.text
+    r = await client.get("/v2/projects", headers=headers)
+    assert cache.loads == loads + 1
+    assert {p["id"]: p for p in r.json()}[dev_id]["open_tasks"]["TODO"] == 1
+
+    # Ingestion d'alertes sans projet, commentaires: pas d'invalidation
+    from app.v2.services.events import bus
+
+    loads = cache.loads
+    bus.publish("tickets", {"action": "ingested", "firing": 3, "resolved": 0})
+    bus.publish("tasks", {"action": "commented", "id": "x", "project_id": dev_id})
+    r = await client.get("/v2/projects", headers=headers)
+    assert cache.loads == loads
+
+    # Création de projet: visible immédiatement
+    r = await client.post("/v2/projects", json={"name": "API"}, headers=headers)
+    assert r.status_code == 201, r.text
+    r = await client.get("/v2/projects", headers=headers)
+    assert r.json()[0]["name"] == "API"
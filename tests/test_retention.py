@@ -0,0 +1,108 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, select
+
+import app.database as database
+from app.models import Alert, AlertSource, AlertStatus, PipelineEvent, Priority, TicketEvent
+from app.v2.services.audit_diff import expand_json, is_compressed
+from app.v2.services.retention import run_alert_retention, run_pipeline_retention
+
+
+def _read_archives(path):
+    lines = []
+    for f in path.glob("*.ndjson.gz"):
+        with gzip.open(f, "rt", encoding="utf-8") as fh:
+            lines.extend(json.loads(line) for line in fh)
+    return lines
+
+
+async def _seed_alerts():
+    old = datetime.utcnow() - timedelta(days=60)
+    payload = {"labels": {"alertname": "DiskFull", "instance": "db-1"}, "annotations": {"summary": "x" * 400}}
+    async with database.SessionLocal() as db:
+        rows = [
+            Alert(id="old-resolved", title="Disk full", severity=Priority.P2, status=AlertStatus.RESOLVED,
+                  source=AlertSource.PROMETHEUS, payload=payload, created_at=old, resolved_at=old),
+            Alert(id="old-ticket", title="Disk full", severity=Priority.P2, status=AlertStatus.RESOLVED,
+                  source=AlertSource.MANUAL, payload=payload, created_at=old, resolved_at=old),
+            Alert(id="old-open", title="Disk full", severity=Priority.P2, status=AlertStatus.OPEN,
+                  source=AlertSource.PROMETHEUS, payload=payload, created_at=old),
+            Alert(id="recent", title="Disk full", severity=Priority.P2, status=AlertStatus.RESOLVED,
+                  source=AlertSource.PROMETHEUS, payload=payload, created_at=datetime.utcnow()),
+        ]
+        db.add_all(rows)
+        db.add(TicketEvent(ticket_id="old-ticket", action="ticket.update", created_at=old))
+        await db.commit()
+    return payload
+
+
+@pytest.mark.anyio
+async def test_alert_compaction_keeps_rows_and_payload_readable(test_app, monkeypatch):
+    payload = await _seed_alerts()
+    monkeypatch.setenv("ALERT_COMPACT_DAYS", "30")
+
+    out = await run_alert_retention()
+    assert out == {"alerts_compacted": 2, "alerts": 0}
+
+    async with database.SessionLocal() as db:
+        rows = {a.id: a for a in (await db.execute(select(Alert))).scalars().all()}
+    assert len(rows) == 4
+    for aid in ("old-resolved", "old-ticket"):
+        assert rows[aid].compacted_at is not None
+        assert is_compressed(rows[aid].payload)
+        assert expand_json(rows[aid].payload) == payload
+    # Ouvertes ou récentes: intactes
+    assert rows["old-open"].compacted_at is None and rows["old-open"].payload == payload
+    assert rows["recent"].compacted_at is None
+
+    # Deuxième passage: rien à refaire
+    assert (await run_alert_retention())["alerts_compacted"] == 0
+
+
+@pytest.mark.anyio
+async def test_alert_archive_skips_tickets_with_history(test_app, tmp_path, monkeypatch):
+    payload = await _seed_alerts()
+    monkeypatch.setenv("ALERT_COMPACT_DAYS", "30")
+    monkeypatch.setenv("ALERT_RETENTION_DAYS", "45")
+
+    out = await run_alert_retention(archive_dir=str(tmp_path))
+    assert out["alerts"] == 1
+
+    async with database.SessionLocal() as db:
+        ids = set((await db.execute(select(Alert.id))).scalars().all())
+    assert ids == {"old-ticket", "old-open", "recent"}
+
+    lines = _read_archives(tmp_path / "alerts")
+    assert [r["id"] for r in lines] == ["old-resolved"]
+    # Archive décompressée
+    assert lines[0]["payload"] == payload
+
+
+@pytest.mark.anyio
+async def test_pipeline_retention_only_touches_finished_pipelines(test_app, tmp_path, monkeypatch):
+    old = datetime.utcnow() - timedelta(days=100)
+    jobs = {str(i): {"name": f"job-{i}", "status": "success"} for i in range(20)}
+    async with database.SessionLocal() as db:
+        for i, st in enumerate(("success", "failed", "running")):
+            db.add(PipelineEvent(pipeline_id=str(i), status=st, ref="main", payload={"jobs": jobs}, created_at=old))
+        db.add(PipelineEvent(pipeline_id="9", status="success", ref="main", payload={"jobs": jobs}, created_at=datetime.utcnow()))
+        await db.commit()
+
+    monkeypatch.setenv("PIPELINE_COMPACT_DAYS", "30")
+    out = await run_pipeline_retention(archive_dir=str(tmp_path))
+    assert out == {"pipeline_events_compacted": 2, "pipeline_events": 0}
+
+    monkeypatch.setenv("PIPELINE_RETENTION_DAYS", "90")
+    out = await run_pipeline_retention(archive_dir=str(tmp_path))
+    assert out["pipeline_events"] == 2
+
+    async with database.SessionLocal() as db:
+        left = set((await db.execute(select(PipelineEvent.pipeline_id))).scalars().all())
+        assert (await db.execute(select(func.count()).select_from(PipelineEvent))).scalar_one() == 2
+    assert left == {"2", "9"}
+    lines = _read_archives(tmp_path / "pipeline_events")
+    assert sorted(r["pipeline_id"] for r in lines) == ["0", "1"]
+    assert all(r["payload"]["jobs"] == jobs for r in lines)
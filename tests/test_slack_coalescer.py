@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+
+@pytest.mark.anyio
+async def test_slack_messages_are_coalesced_and_retried_on_429(monkeypatch):
+    import app.v2.services.slack as slack
+
+    calls: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content))
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, text="ok")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(slack, "get_http_client", lambda: client)
+
+    coalescer = slack.SlackCoalescer(window_seconds=0.05, min_interval_seconds=0)
+    url = "https://hooks.slack.test/T/B/X"
+    await asyncio.gather(
+        coalescer.post(url, "disk full on web-01"),
+        coalescer.post(url, "disk full on web-01"),
+        coalescer.post(url, "cpu high on db-01"),
+    )
+    await client.aclose()
+
+    # 1er essai refusé (429) puis un seul digest
+    assert len(calls) == 2
+    assert calls[0] == calls[1]
+    text = calls[1]["text"]
+    assert text.startswith("*3 notifications*")
+    assert "disk full on web-01 (×2)" in text
+    assert "cpu high on db-01" in text
+
+
+@pytest.mark.anyio
+async def test_slack_coalescer_propagates_errors(monkeypatch):
+    import app.v2.services.slack as slack
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(500)))
+    monkeypatch.setattr(slack, "get_http_client", lambda: client)
+
+    coalescer = slack.SlackCoalescer(window_seconds=0.01, min_interval_seconds=0)
+    with pytest.raises(httpx.HTTPStatusError):
+        await coalescer.post("https://hooks.slack.test/T/B/X", "boom")
+    await client.aclose()
@@ -0,0 +1,169 @@
+import random
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+def test_critical_path_and_slack():
+    from app.v2.services.dependencies import CycleError, ProjectGraph
+
+    g = ProjectGraph()
+    for tid, h in {"a": 2, "b": 4, "c": 1, "d": 3, "e": 1}.items():
+        g.upsert_task(tid, h, "TODO")
+    # a -> b -> d, a -> c -> d, e indépendante
+    for task, dep in (("b", "a"), ("c", "a"), ("d", "b"), ("d", "c")):
+        g.check_edge(task, dep)
+        g.add_edge(task, dep)
+
+    cp = g.critical_path()
+    assert cp["duration_hours"] == 9
+    assert cp["path"] == ["a", "b", "d"]
+    slack = dict(zip(cp["order"], cp["slack"]))
+    assert slack == {"a": 0, "b": 0, "c": 3, "d": 0, "e": 8}
+    assert cp["order"].index("a") < cp["order"].index("b") < cp["order"].index("d")
+
+    with pytest.raises(CycleError):
+        g.check_edge("a", "d")
+    with pytest.raises(CycleError):
+        g.check_edge("a", "a")
+
+    # Tâche terminée: ne compte plus dans le travail restant
+    g.set_status("b", "DONE")
+    cp = g.critical_path()
+    assert cp["duration_hours"] == 6 and cp["path"] == ["a", "c", "d"]
+
+
+def test_large_graph_is_linear():
+    from app.v2.services.dependencies import ProjectGraph
+
+    random.seed(3)
+    g = ProjectGraph()
+    n = 20000
+    for i in range(n):
+        g.upsert_task(f"t{i:05d}", random.randint(1, 8), "TODO")
+    # Arêtes vers des tâches d'indice inférieur: DAG garanti
+    for i in range(1, n):
+        for j in random.sample(range(max(0, i - 50), i), k=min(2, i)):
+            g.add_edge(f"t{i:05d}", f"t{j:05d}")
+    cp = g.critical_path()
+    assert len(cp["order"]) == n and not cp["cycle"]
+    assert cp["path"] and min(cp["slack"]) == 0
+    assert g.critical_path() is cp  # mémorisé tant que le graphe ne change pas
+
+
+@pytest.mark.anyio
+async def test_dependency_routes_and_critical_path(client: AsyncClient, monkeypatch):
+    import app.database as database
+    import app.v2.routers.projects as projects_router
+    import app.v2.routers.tasks as tasks_router
+    from app.models import Project
+    from app.v2.services.dependencies import GraphCache
+
+    cache = GraphCache()
+    monkeypatch.setattr(tasks_router, "graphs", cache)
+    monkeypatch.setattr(projects_router, "graphs", cache)
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.commit()
+
+    ids = {}
+    for title, hours in (("build", 3), ("deploy", 2), ("docs", 1)):
+        r = await client.post(
+            "/v2/tasks", json={"project_id": project.id, "title": title, "estimate_hours": hours}, headers=headers
+        )
+        ids[title] = r.json()["id"]
+
+    r = await client.post(f"/v2/tasks/{ids['deploy']}/dependencies", json={"depends_on_id": ids["build"]}, headers=headers)
+    assert r.status_code == 201, r.text
+    created = r.json()
+    # Arête déjà présente: 200, rien de créé
+    r = await client.post(f"/v2/tasks/{ids['deploy']}/dependencies", json={"depends_on_id": ids["build"]}, headers=headers)
+    assert r.status_code == 200 and r.json() == created
+    r = await client.post(f"/v2/tasks/{ids['build']}/dependencies", json={"depends_on_id": ids["deploy"]}, headers=headers)
+    assert r.status_code == 409
+
+    r = await client.get(f"/v2/projects/{project.id}/critical-path", headers=headers)
+    assert r.status_code == 200, r.text
+    assert r.json()["duration_hours"] == 5
+    assert r.json()["path"] == [ids["build"], ids["deploy"]]
+
+    # Mise à jour incrémentale: pas de rechargement du graphe
+    r = await client.patch(f"/v2/tasks/{ids['docs']}", json={"estimate_hours": 10}, headers=headers)
+    r = await client.get(f"/v2/projects/{project.id}/critical-path", headers=headers)
+    assert r.json()["duration_hours"] == 10 and r.json()["path"] == [ids["docs"]]
+    r = await client.delete(f"/v2/tasks/{ids['deploy']}/dependencies/{ids['build']}", headers=headers)
+    assert r.status_code == 204
+    r = await client.post(f"/v2/tasks/{ids['build']}/dependencies", json={"depends_on_id": ids["deploy"]}, headers=headers)
+    assert r.status_code == 201
+    assert cache.loads == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_crossed_dependencies_cannot_form_a_cycle(client: AsyncClient, monkeypatch):
+    import asyncio
+
+    import app.database as database
+    import app.v2.routers.tasks as tasks_router
+    from app.models import Project
+    from app.v2.services.dependencies import GraphCache
+
+    monkeypatch.setattr(tasks_router, "graphs", GraphCache())
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.commit()
+
+    a, b = [
+        (await client.post("/v2/tasks", json={"project_id": project.id, "title": t}, headers=headers)).json()["id"]
+        for t in ("a", "b")
+    ]
+    responses = await asyncio.gather(
+        client.post(f"/v2/tasks/{a}/dependencies", json={"depends_on_id": b}, headers=headers),
+        client.post(f"/v2/tasks/{b}/dependencies", json={"depends_on_id": a}, headers=headers),
+    )
+    assert sorted(r.status_code for r in responses) == [201, 409]
+
+
+@pytest.mark.anyio
+async def test_cycle_check_sees_edges_missing_from_the_cached_graph(client: AsyncClient, monkeypatch):
+    import app.database as database
+    import app.v2.routers.tasks as tasks_router
+    from app.models import Project, TaskDependency
+    from app.v2.services.dependencies import GraphCache
+
+    cache = GraphCache()
+    monkeypatch.setattr(tasks_router, "graphs", cache)
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.commit()
+
+    a, b, c = [
+        (await client.post("/v2/tasks", json={"project_id": project.id, "title": t}, headers=headers)).json()["id"]
+        for t in ("a", "b", "c")
+    ]
+    r = await client.post(f"/v2/tasks/{b}/dependencies", json={"depends_on_id": a}, headers=headers)
+    assert r.status_code == 201
+    # Arête c bloquée par b posée par une autre instance, événement pas encore reçu
+    async with database.SessionLocal() as db:
+        db.add(TaskDependency(task_id=c, depends_on_id=b, project_id=project.id))
+        await db.commit()
+    assert cache.peek(project.id) is not None
+
+    r = await client.post(f"/v2/tasks/{a}/dependencies", json={"depends_on_id": c}, headers=headers)
+    assert r.status_code == 409
+    assert cache.peek(project.id) is None
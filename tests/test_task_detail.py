@@ -0,0 +1,130 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+async def _seed_users(n: int) -> list[str]:
+    import app.database as database
+    from app.models import User, UserRole
+
+    async with database.SessionLocal() as db:
+        users = [
+            User(first_name=f"Dev{i}", last_name="Ops", email=f"dev{i}@devops.example.com", hashed_password="x", role=UserRole.USER)
+            for i in range(n)
+        ]
+        db.add_all(users)
+        await db.commit()
+        return [u.id for u in users]
+
+
+async def _task(client: AsyncClient, headers: dict) -> tuple[str, str]:
+    import app.database as database
+    from app.models import Project
+
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.commit()
+    r = await client.post("/v2/tasks", json={"project_id": project.id, "title": "Rotation des logs"}, headers=headers)
+    assert r.status_code == 201, r.text
+    return project.id, r.json()["id"]
+
+
+@pytest.mark.anyio
+async def test_task_detail_with_assignees_and_paged_comments(client: AsyncClient):
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    users = await _seed_users(3)
+    _, task_id = await _task(client, headers)
+
+    r = await client.put(f"/v2/tasks/{task_id}/assignees", json={"user_ids": users[:2]}, headers=headers)
+    assert r.status_code == 200, r.text
+    assert {a["user"]["email"] for a in r.json()} == {"dev0@devops.example.com", "dev1@devops.example.com"}
+    r = await client.put(f"/v2/tasks/{task_id}/assignees", json={"user_ids": [users[1], users[2]]}, headers=headers)
+    assert {a["user_id"] for a in r.json()} == {users[1], users[2]}
+    r = await client.put(f"/v2/tasks/{task_id}/assignees", json={"user_ids": ["nope"]}, headers=headers)
+    assert r.status_code == 422
+
+    for i in range(5):
+        r = await client.post(f"/v2/tasks/{task_id}/comments", json={"body": f"note {i}"}, headers=headers)
+        assert r.status_code == 201, r.text
+
+    r = await client.get(f"/v2/tasks/{task_id}", params={"comments_limit": 2}, headers=headers)
+    assert r.status_code == 200, r.text
+    detail = r.json()
+    assert detail["title"] == "Rotation des logs"
+    assert len(detail["assignees"]) == 2
+    assert [c["body"] for c in detail["comments"]["items"]] == ["note 0", "note 1"]
+    assert detail["comments"]["items"][0]["user"]["email"] == "admin@devops.example.com"
+
+    bodies = [c["body"] for c in detail["comments"]["items"]]
+    cursor = detail["comments"]["next_cursor"]
+    while cursor:
+        r = await client.get(f"/v2/tasks/{task_id}/comments", params={"cursor": cursor, "limit": 2}, headers=headers)
+        bodies += [c["body"] for c in r.json()["items"]]
+        cursor = r.json()["next_cursor"]
+    assert bodies == [f"note {i}" for i in range(5)]
+
+    r = await client.get("/v2/tasks/unknown", headers=headers)
+    assert r.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_my_tasks_lists_only_assigned_tasks(client: AsyncClient):
+    import app.database as database
+    from app.models import User
+    from sqlalchemy import select
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id, task_id = await _task(client, headers)
+    r = await client.post("/v2/tasks", json={"project_id": project_id, "title": "Autre"}, headers=headers)
+    assert r.status_code == 201
+
+    async with database.SessionLocal() as db:
+        admin_id = (await db.execute(select(User.id).where(User.email == "admin@devops.example.com"))).scalar_one()
+    r = await client.put(f"/v2/tasks/{task_id}/assignees", json={"user_ids": [admin_id]}, headers=headers)
+    assert r.status_code == 200
+
+    r = await client.get("/v2/tasks/mine", headers=headers)
+    assert r.status_code == 200, r.text
+    assert [t["id"] for t in r.json()["items"]] == [task_id]
+    assert r.json()["next_cursor"] is None
+    r = await client.get("/v2/tasks/mine", params={"status_": "DONE"}, headers=headers)
+    assert r.json()["items"] == []
+
+
+def test_parse_mentions():
+    from app.v2.services.mentions import parse_mentions
+
+    body = "Ping @Dev0.Ops et @dev1@devops.example.com. Voir foo@bar.com, @carol, puis @dev0.ops."
+    assert parse_mentions(body) == ["dev0.ops", "dev1@devops.example.com", "carol"]
+
+
+@pytest.mark.anyio
+async def test_comment_mentions_resolve_and_queue_notifications(client: AsyncClient):
+    import app.database as database
+    from app.models import OutboxMessage
+    from sqlalchemy import select
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    users = await _seed_users(3)
+    _, task_id = await _task(client, headers)
+
+    body = "@Dev0.Ops @dev2@DEVOPS.example.com @inconnu.personne @admin@devops.example.com: merci de relire"
+    r = await client.post(f"/v2/tasks/{task_id}/comments", json={"body": body}, headers=headers)
+    assert r.status_code == 201, r.text
+    # L'auteur est résolu mais pas notifié
+    assert len(r.json()["mentions"]) == 3
+    assert {users[0], users[2]} <= set(r.json()["mentions"])
+
+    async with database.SessionLocal() as db:
+        res = await db.execute(select(OutboxMessage).where(OutboxMessage.channel == "email"))
+        sent_to = sorted(m.payload["to"] for m in res.scalars().all())
+    assert sent_to == ["dev0@devops.example.com", "dev2@devops.example.com"]
@@ -0,0 +1,205 @@
+import random
+
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+async def _project() -> str:
+    import app.database as database
+    from app.models import Project
+
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.commit()
+        return project.id
+
+
+def test_rank_between_always_finds_a_key():
+    from app.v2.services.ranking import rank_between, spread_ranks
+
+    random.seed(7)
+    keys = [rank_between(None, None)]
+    for _ in range(2000):
+        i = random.randint(0, len(keys))
+        lo = keys[i - 1] if i > 0 else None
+        hi = keys[i] if i < len(keys) else None
+        k = rank_between(lo, hi)
+        assert (lo is None or lo < k) and (hi is None or k < hi)
+        keys.insert(i, k)
+    assert keys == sorted(keys)
+
+    spread = spread_ranks(5000)
+    assert spread == sorted(spread) and len(set(spread)) == 5000
+    assert max(len(k) for k in spread) <= 4
+    with pytest.raises(ValueError):
+        rank_between("b", "b")
+
+
+def test_rank_between_stays_short_at_column_ends():
+    from app.v2.services.ranking import rank_between
+
+    # Ajouts répétés en fin de colonne (create_task) et en tête: pas de renumérotation
+    keys = [rank_between(None, None)]
+    for _ in range(1000):
+        keys.append(rank_between(keys[-1], None))
+        keys.insert(0, rank_between(None, keys[0]))
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    assert max(len(k) for k in keys) <= 4
+    assert not any(k.endswith("0") for k in keys)
+
+
+@pytest.mark.anyio
+async def test_kanban_move_rewrites_only_the_moved_task(client: AsyncClient):
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = await _project()
+
+    ids = []
+    for title in ("a", "b", "c", "d"):
+        r = await client.post("/v2/tasks", json={"project_id": project_id, "title": title}, headers=headers)
+        assert r.status_code == 201, r.text
+        ids.append(r.json()["id"])
+
+    r = await client.get("/v2/tasks", params={"project_id": project_id}, headers=headers)
+    before = {t["id"]: t["rank"] for t in r.json()}
+    assert [t["title"] for t in r.json()] == ["a", "b", "c", "d"]
+
+    # "d" glissé entre "a" et "b"
+    r = await client.patch(f"/v2/tasks/{ids[3]}", json={"after_id": ids[0], "before_id": ids[1]}, headers=headers)
+    assert r.status_code == 200, r.text
+    r = await client.get("/v2/tasks", params={"project_id": project_id}, headers=headers)
+    assert [t["title"] for t in r.json()] == ["a", "d", "b", "c"]
+    after = {t["id"]: t["rank"] for t in r.json()}
+    assert [i for i in ids if after[i] != before[i]] == [ids[3]]
+
+    # Changement de colonne sans voisin: fin de la colonne cible
+    r = await client.patch(f"/v2/tasks/{ids[0]}", json={"status": "IN_PROGRESS"}, headers=headers)
+    assert r.status_code == 200
+    r = await client.patch(f"/v2/tasks/{ids[2]}", json={"status": "IN_PROGRESS", "before_id": ids[0]}, headers=headers)
+    assert r.status_code == 200
+    r = await client.get("/v2/tasks", params={"project_id": project_id, "status_": "IN_PROGRESS"}, headers=headers)
+    assert [t["title"] for t in r.json()] == ["c", "a"]
+
+    # Voisin d'une autre colonne
+    r = await client.patch(f"/v2/tasks/{ids[1]}", json={"after_id": ids[0]}, headers=headers)
+    assert r.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_backfill_and_rebalance_keep_column_order(test_app):
+    import app.database as database
+    from app.models import Task, TaskStatus
+    from app.v2.services.ranking import backfill_task_ranks, place_rank, rebalance_column
+    from sqlalchemy import select
+
+    project_id = await _project()
+    async with database.SessionLocal() as db:
+        for pos in (3, 1, 2):
+            db.add(Task(project_id=project_id, title=f"t{pos}", status=TaskStatus.TODO, position=pos))
+        await db.commit()
+        assert await backfill_task_ranks(db) == 3
+
+        res = await db.execute(select(Task.title).where(Task.project_id == project_id).order_by(Task.rank))
+        assert list(res.scalars().all()) == ["t1", "t2", "t3"]
+
+        # Insertions répétées au même endroit: rangs longs, puis renumérotation
+        first = (await db.execute(select(Task).where(Task.title == "t1"))).scalar_one()
+        for i in range(60):
+            t = Task(project_id=project_id, title=f"n{i}", status=TaskStatus.TODO)
+            t.rank = await place_rank(db, project_id, TaskStatus.TODO, after_id=first.id)
+            db.add(t)
+            await db.flush()
+        await db.commit()
+        res = await db.execute(select(Task.title, Task.rank).where(Task.project_id == project_id).order_by(Task.rank))
+        order = [t for t, _ in res.all()]
+        assert order[0] == "t1" and order[1] == "n59" and order[-2:] == ["t2", "t3"]
+
+        await rebalance_column(db, project_id, TaskStatus.TODO)
+        await db.commit()
+        res = await db.execute(select(Task.title, Task.rank).where(Task.project_id == project_id).order_by(Task.rank))
+        rows = res.all()
+        assert [t for t, _ in rows] == order
+        assert max(len(r) for _, r in rows) <= 3
+
+
+@pytest.mark.anyio
+async def test_periodic_rebalance_only_scans_recently_updated_tasks(test_app):
+    import app.database as database
+    from app.models import Task, TaskStatus
+    from app.v2.services.ranking import MAX_RANK_LENGTH, RankRebalancer, columns_to_rebalance
+    from datetime import datetime, timedelta
+
+    project_id = await _project()
+    long_rank = "h" * (MAX_RANK_LENGTH + 1)
+    old = datetime.utcnow() - timedelta(hours=1)
+    async with database.SessionLocal() as db:
+        db.add(Task(project_id=project_id, title="old", status=TaskStatus.DONE, rank=long_rank, updated_at=old))
+        await db.commit()
+
+    rebalancer = RankRebalancer()
+    # Tâche non modifiée depuis la dernière passe: ignorée (reste au démarrage)
+    assert await rebalancer.run_once() == 0
+
+    async with database.SessionLocal() as db:
+        db.add(Task(project_id=project_id, title="new", status=TaskStatus.TODO, rank=long_rank))
+        await db.commit()
+        assert await columns_to_rebalance(db, since=datetime.utcnow() - timedelta(minutes=1)) == [
+            (project_id, TaskStatus.TODO)
+        ]
+        assert len(await columns_to_rebalance(db)) == 2
+    assert await rebalancer.run_once() == 1
+    async with database.SessionLocal() as db:
+        assert await columns_to_rebalance(db) == [(project_id, TaskStatus.DONE)]
+
+
+@pytest.mark.anyio
+async def test_batch_move_applies_all_moves_in_one_transaction(client: AsyncClient):
+    import app.database as database
+    from app.models import AuditLog
+    from sqlalchemy import func, select
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    project_id = await _project()
+
+    ids = []
+    for i in range(6):
+        r = await client.post("/v2/tasks", json={"project_id": project_id, "title": f"t{i}"}, headers=headers)
+        ids.append(r.json()["id"])
+
+    moves = [
+        # Sélection multiple vers IN_PROGRESS, conservée dans l'ordre de la liste
+        {"id": ids[4], "status": "IN_PROGRESS"},
+        {"id": ids[1], "status": "IN_PROGRESS"},
+        {"id": ids[2], "status": "IN_PROGRESS", "before_id": ids[4]},
+        # Réordonnancement dans TODO
+        {"id": ids[5], "before_id": ids[0]},
+    ]
+    r = await client.post("/v2/tasks/batch-move", json={"moves": moves}, headers=headers)
+    assert r.status_code == 200, r.text
+    items = r.json()["items"]
+    assert [i["id"] for i in items] == [ids[4], ids[1], ids[2], ids[5]]
+    assert all(i["rank"] for i in items)
+
+    r = await client.get("/v2/tasks", params={"project_id": project_id, "status_": "IN_PROGRESS"}, headers=headers)
+    assert [t["title"] for t in r.json()] == ["t2", "t4", "t1"]
+    r = await client.get("/v2/tasks", params={"project_id": project_id, "status_": "TODO"}, headers=headers)
+    assert [t["title"] for t in r.json()] == ["t5", "t0", "t3"]
+
+    async with database.SessionLocal() as db:
+        res = await db.execute(select(func.count()).select_from(AuditLog).where(AuditLog.action == "task.move"))
+        assert res.scalar_one() == 4
+
+    # Un voisin invalide annule tout le lot
+    bad = [{"id": ids[0], "status": "DONE"}, {"id": ids[3], "after_id": ids[1]}]
+    r = await client.post("/v2/tasks/batch-move", json={"moves": bad}, headers=headers)
+    assert r.status_code == 422
+    r = await client.get("/v2/tasks", params={"project_id": project_id, "status_": "DONE"}, headers=headers)
+    assert r.json() == []
@@ -60,3 +60,73 @@ async def test_ticket_update_writes_audit(client: AsyncClient):
     actions = [e.action for e in entries]
     assert "ticket.create" in actions
     assert "ticket.update" in actions
+
+
+@pytest.mark.anyio
+async def test_ticket_update_appends_history_and_sets_columns(client: AsyncClient):
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    create = await client.post("/v2/tickets", headers=headers, json={"title": "Disk low", "payload": {"path": "/data"}})
+    assert create.status_code == 201, create.text
+    ticket_id = create.json()["id"]
+
+    for i in range(3):
+        upd = await client.patch(
+            f"/v2/tickets/{ticket_id}",
+            headers=headers,
+            json={"workflow_status": "IN_PROGRESS", "assigned_to": "admin@devops.example.com", "note": f"n{i}"},
+        )
+        assert upd.status_code == 200, upd.text
+    body = upd.json()
+    assert body["workflow_status"] == "IN_PROGRESS"
+    assert body["assigned_to"] == "admin@devops.example.com"
+
+    hist = await client.get(f"/v2/tickets/{ticket_id}/history", headers=headers)
+    assert hist.status_code == 200
+    assert [h["note"] for h in hist.json()] == ["n2", "n1", "n0"]
+
+    mine = await client.get("/v2/tickets", headers=headers, params={"mine": True, "status_": "OPEN"})
+    assert [t["id"] for t in mine.json()] == [ticket_id]
+
+    from sqlalchemy import select
+    from app.models import Alert
+    from app.database import SessionLocal
+
+    async with SessionLocal() as db:
+        ticket = (await db.execute(select(Alert).where(Alert.id == ticket_id))).scalar_one()
+    assert ticket.payload == {"path": "/data"}
+
+
+@pytest.mark.anyio
+async def test_backfill_moves_payload_metadata_to_columns(test_app):
+    from sqlalchemy import select
+    from app.database import SessionLocal, engine
+    from app.db_migrations import backfill_ticket_columns
+    from app.models import Alert, TicketEvent
+
+    async with SessionLocal() as db:
+        db.add(
+            Alert(
+                id="legacy-1",
+                title="Legacy",
+                payload={
+                    "path": "/var",
+                    "workflow_status": "IN_PROGRESS",
+                    "assigned_to": "ops@example.com",
+                    "history": [{"at": "2026-01-01T10:00:00", "action": "ticket.update", "note": "old"}],
+                },
+            )
+        )
+        await db.commit()
+
+    assert await backfill_ticket_columns(engine) == 1
+    assert await backfill_ticket_columns(engine) == 0
+
+    async with SessionLocal() as db:
+        alert = (await db.execute(select(Alert).where(Alert.id == "legacy-1"))).scalar_one()
+        events = list((await db.execute(select(TicketEvent).where(TicketEvent.ticket_id == "legacy-1"))).scalars().all())
+    assert alert.workflow_status == "IN_PROGRESS"
+    assert alert.assigned_to == "ops@example.com"
+    assert alert.payload == {"path": "/var"}
+    assert [e.note for e in events] == ["old"]
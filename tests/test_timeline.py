@@ -0,0 +1,73 @@
+import pytest
+from httpx import AsyncClient
+
+
+async def login(client: AsyncClient, email: str, password: str) -> str:
+    r = await client.post("/auth/login", json={"email": email, "password": password})
+    assert r.status_code == 200, r.text
+    return r.json()["access_token"]
+
+
+def test_pack_rows_uses_minimum_rows():
+    from app.v2.services.timeline import _pack_rows
+
+    rows, count = _pack_rows([(0, 10, 0), (2, 5, 1), (5, 8, 2), (10, 12, 3), (3, 11, 4)])
+    assert count == 3
+    assert len({rows[0], rows[1], rows[4]}) == 3 and rows[2] == rows[1]
+
+
+@pytest.mark.anyio
+async def test_project_timeline_is_columnar(client: AsyncClient, monkeypatch):
+    from datetime import datetime, timedelta
+
+    import app.database as database
+    import app.v2.routers.tasks as tasks_router
+    import app.v2.services.timeline as timeline_service
+    from app.models import Project, Sprint
+    from app.v2.services.dependencies import GraphCache
+
+    cache = GraphCache()
+    monkeypatch.setattr(tasks_router, "graphs", cache)
+    monkeypatch.setattr(timeline_service, "graphs", cache)
+
+    token = await login(client, "admin@devops.example.com", "Admin@123456")
+    headers = {"Authorization": f"Bearer {token}"}
+    now = datetime.utcnow().replace(microsecond=0)
+    async with database.SessionLocal() as db:
+        project = Project(key="OPS", name="Ops")
+        db.add(project)
+        await db.flush()
+        sprint = Sprint(project_id=project.id, name="S1", start_date=now, end_date=now + timedelta(days=14))
+        db.add(sprint)
+        await db.commit()
+
+    ids = {}
+    for title, hours, sprint_id in (("build", 8, sprint.id), ("deploy", 16, sprint.id), ("docs", 4, None)):
+        r = await client.post(
+            "/v2/tasks",
+            json={"project_id": project.id, "title": title, "estimate_hours": hours, "sprint_id": sprint_id},
+            headers=headers,
+        )
+        ids[title] = r.json()["id"]
+    await client.post(f"/v2/tasks/{ids['deploy']}/dependencies", json={"depends_on_id": ids["build"]}, headers=headers)
+
+    r = await client.get(f"/v2/projects/{project.id}/timeline", headers=headers)
+    assert r.status_code == 200, r.text
+    tl = r.json()
+    assert tl["lanes"]["key"] == [sprint.id, None]
+    bars = tl["bars"]
+    assert len({len(v) for v in bars.values()}) == 1 and len(bars["task_id"]) == 3
+    at = {tid: i for i, tid in enumerate(bars["task_id"])}
+    b, d = at[ids["build"]], at[ids["deploy"]]
+    # deploy commence quand build finit (8h de travail = 1 jour), sur la même ligne du couloir S1
+    assert bars["end"][b] == bars["start"][d] == 24
+    assert bars["end"][d] - bars["start"][d] == 48
+    assert bars["lane"][b] == bars["lane"][d] == 0 and bars["row"][b] == bars["row"][d]
+    assert bars["critical"][b] == bars["critical"][d] == 1
+    assert tl["edges"] == {"from": [b], "to": [d]}
+
+    r = await client.get(f"/v2/projects/{project.id}/timeline", params={"group_by": "assignee"}, headers=headers)
+    assert r.status_code == 200
+    assert r.json()["lanes"]["key"] == [None]
+    r = await client.get(f"/v2/projects/{project.id}/timeline", params={"group_by": "color"}, headers=headers)
+    assert r.status_code == 422